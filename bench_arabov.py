@@ -0,0 +1,757 @@
+"""Бенчмарки для модуля oop_arabov.
+
+Запуск:
+    python bench_arabov.py memory [-n 100000]
+    python bench_arabov.py snapshot [-n 100000]
+    python bench_arabov.py permissions [-n 100000]
+    python bench_arabov.py approvals [-n 100000]
+    python bench_arabov.py enrollment [-n 100000]
+    python bench_arabov.py reports [-n 100000]
+    python bench_arabov.py metrics [-n 100000] [-o metrics.prom]
+    python bench_arabov.py timetable [-n 20000]
+    python bench_arabov.py materials [-n 100000]
+    python bench_arabov.py notifications [-n 100000]
+    python bench_arabov.py suite [-n 100000] [--seed 0] [--repeat 3] [-o results.json]
+    python bench_arabov.py compare base.json new.json [--threshold 0.1]
+"""
+import argparse
+import asyncio
+from collections import Counter
+import contextlib
+import gc
+from itertools import accumulate
+import json
+import os
+import platform
+import random
+import sys
+import tempfile
+import time
+import timeit
+import tracemalloc
+
+import oop_arabov as univ
+
+
+#Память на экземпляр (задание: __slots__ для иерархии Person)
+
+class _DictStudent:
+    """Раскладка Student до перехода на __slots__: __dict__ и контейнеры в каждом объекте"""
+
+    def __init__(self, person_id, name, age, email, student_id):
+        self._Person__person_id = person_id
+        self._Person__name = name
+        self._Person__age = age
+        self._Person__email = email
+        self._Student__student_id = student_id
+        self._Student__courses = []
+        self._Student__grades = {}
+
+
+class _DictTeacher:
+    """Раскладка Teacher до перехода на __slots__"""
+
+    def __init__(self, person_id, name, age, email, teacher_id):
+        self._Person__person_id = person_id
+        self._Person__name = name
+        self._Person__age = age
+        self._Person__email = email
+        self._Teacher__teacher_id = teacher_id
+        self._Teacher__subjects = []
+
+
+def bytes_per_instance(factory, n: int) -> float:
+    """Средний прирост памяти (tracemalloc) на один созданный объект"""
+    gc.collect()
+    tracemalloc.start()
+    try:
+        start = tracemalloc.get_traced_memory()[0]
+        objects = [factory(i) for i in range(n)]
+        used = tracemalloc.get_traced_memory()[0] - start
+    finally:
+        tracemalloc.stop()
+    return (used - sys.getsizeof(objects)) / n
+
+
+def bench_memory(n: int = 100000) -> dict:
+    """Сравнивает байты на экземпляр до и после перехода на __slots__"""
+    name, email = "Иванов Иван", "ivanov@univ.ru"
+    cases = {
+        'Student': (lambda i: _DictStudent(i, name, 20, email, i),
+                    lambda i: univ.Student(i, name, 20, email, i)),
+        'Teacher': (lambda i: _DictTeacher(i, name, 45, email, i),
+                    lambda i: univ.Teacher(i, name, 45, email, i)),
+    }
+    results = {}
+    with univ.quiet_construction():
+        for cls_name, (before, after) in cases.items():
+            results[cls_name] = {
+                'before': bytes_per_instance(before, n),
+                'after': bytes_per_instance(after, n),
+            }
+    return results
+
+
+#Снимки: JSON против бинарного формата с mmap
+
+def _timed(func, *args):
+    start = time.perf_counter()
+    result = func(*args)
+    return time.perf_counter() - start, result
+
+
+def _snapshot_dataset(n: int, courses_count: int = 50):
+    teachers = [univ.Teacher(i, f"Преподаватель {i}", 45, f"t{i}@univ.ru", i)
+                for i in range(courses_count)]
+    courses = [univ.Courses(i, f"Курс {i}", teachers[i]) for i in range(courses_count)]
+    students = []
+    for i in range(n):
+        student = univ.Student(courses_count + i, f"Студент {i}", 18 + i % 10, f"s{i}@univ.ru", i)
+        for k in range(3):
+            course = courses[(i + k * 7) % courses_count]
+            student.set_grade(1 + (i + k) % 5, course.get_course_name())
+            course.add_student(student)
+        students.append(student)
+    return students, teachers, courses
+
+
+def bench_snapshot(n: int = 100000) -> dict:
+    """Время сохранения и загрузки: JSON против бинарного снимка"""
+    with univ.quiet_construction():
+        students, teachers, courses = _snapshot_dataset(n)
+    results = {}
+    with tempfile.TemporaryDirectory() as tmp:
+        for fmt in ('.json', univ.SNAPSHOT_SUFFIX):
+            filename = os.path.join(tmp, 'university' + fmt)
+            save, _ = _timed(univ.save_system_data, students, teachers, courses, filename)
+            snapshot = None
+            if fmt == univ.SNAPSHOT_SUFFIX:
+                # ленивое открытие: объекты создаются при обращении
+                load, snapshot = _timed(univ.open_snapshot, filename)
+                loaded, loaded_courses = snapshot.students, snapshot.courses
+            else:
+                load, (loaded, _, loaded_courses) = _timed(univ.load_system_data, filename)
+            first, _ = _timed(lambda: loaded[len(loaded) // 2].get_grades())
+            people, _ = _timed(list, loaded)
+            linked, _ = _timed(list, loaded_courses)
+            results[fmt.lstrip('.')] = {
+                'size_bytes': os.path.getsize(filename),
+                'save_s': save,
+                'open_s': load,
+                'first_access_s': first,
+                'materialize_all_s': load + people + linked,
+            }
+            del loaded, loaded_courses
+            if snapshot is not None:
+                snapshot.close()
+            gc.collect()
+    return results
+
+
+#Накладные расходы check_permissions
+
+class _Principal:
+    def __init__(self, role):
+        self._role = role
+
+    def get_role(self):
+        return self._role
+
+
+class _Guarded:
+    def plain(self, value):
+        return value
+
+    @univ.check_permissions(["teacher", "admin"])
+    def guarded(self, value):
+        return value
+
+
+def bench_permissions(n: int = 100000) -> dict:
+    """Время вызова метода с декоратором check_permissions и без него (нс на вызов)"""
+    obj = _Guarded()
+    with univ.acting_as(_Principal("Преподаватель")):
+        plain = min(timeit.repeat(lambda: obj.plain(1), number=n, repeat=5)) / n
+        guarded = min(timeit.repeat(lambda: obj.guarded(1), number=n, repeat=5)) / n
+    return {
+        'plain_ns': plain * 1e9,
+        'guarded_ns': guarded * 1e9,
+        'overhead_ns': (guarded - plain) * 1e9,
+    }
+
+
+#Пропускная способность асинхронного согласования оценок
+
+def bench_approvals(n: int = 10000, latency: float = 0.01, concurrency: int = 64) -> dict:
+    """Заявок в секунду через AsyncGradeApprovalPipeline с имитацией согласующих"""
+    with univ.quiet_construction():
+        students = [univ.Student(i, "Студент", 20, "s@univ.ru", i) for i in range(n)]
+    for i, student in enumerate(students):
+        student.set_grade(1 + i % 5, "Математика")
+    chain = univ.TeacherHandler()
+    chain.set_next(univ.DepartmentHeadHandler()).set_next(univ.DeanHandler())
+    approvers = {level: univ.SimulatedApprover(latency, latency, seed=i)
+                 for i, level in enumerate(('teacher', 'department_head', 'dean'))}
+
+    async def run():
+        async with univ.AsyncGradeApprovalPipeline(chain, approvers, concurrency=concurrency,
+                                                   queue_size=4 * concurrency, timeout=10 * latency) as pipeline:
+            return await asyncio.gather(*(
+                student.change_grade_async("Математика", 1 + (i * 3) % 5, None, pipeline)
+                for i, student in enumerate(students)))
+
+    elapsed, outcomes = _timed(asyncio.run, run())
+    return {
+        'requests': n,
+        'elapsed_s': elapsed,
+        'requests_per_s': n / elapsed,
+        'approved': sum(outcome.approved for outcome in outcomes),
+        'approver_calls': {level: approver.calls for level, approver in approvers.items()},
+    }
+
+
+#Нагрузочная проверка параллельной записи на курсы
+
+class _NullLogSink(univ.LogSink):
+    def write(self, line: str):
+        pass
+
+
+@contextlib.contextmanager
+def _silenced():
+    """Без вывода print, журнала log_action и логов конструкторов"""
+    previous_sink = univ.set_log_sink("info_about_logs.txt", _NullLogSink())
+    try:
+        with open(os.devnull, "w", encoding="utf-8") as devnull, contextlib.redirect_stdout(devnull), \
+                univ.quiet_construction():
+            yield
+    finally:
+        univ.set_log_sink("info_about_logs.txt", previous_sink)
+
+
+class _YieldingOfflineEnrollment(univ.OfflineEnrollmentProcess):
+    """Отдает GIL между проверкой мест и регистрацией, расширяя окно гонки"""
+
+    def _check_course_availability(self, course) -> bool:
+        available = super()._check_course_availability(course)
+        time.sleep(0)
+        return available
+
+
+def stress_enrollment(n: int = 20000, workers: int = 64, courses_count: int = 4,
+                      process_cls=_YieldingOfflineEnrollment) -> dict:
+    """Записывает n студентов на courses_count курсов из workers потоков.
+
+    Заявок заведомо больше, чем мест. Проверяет, что ни один курс не
+    переполнен, записанные и ожидающие не пересекаются и каждая заявка
+    учтена ровно один раз. В 'violations' - список нарушений (пустой при успехе).
+    """
+    with univ.quiet_construction():
+        teachers = [univ.Teacher(i, f"Преподаватель {i}", 45, f"t{i}@univ.ru", i)
+                    for i in range(courses_count)]
+        courses = [univ.Courses(i, f"Курс {i}", teachers[i]) for i in range(courses_count)]
+        students = [univ.Student(courses_count + i, f"Студент {i}", 18 + i % 10, f"s{i}@univ.ru", i)
+                    for i in range(n)]
+    pairs = [(student, courses[i % courses_count]) for i, student in enumerate(students)]
+    process = process_cls(waitlist=True, principal=teachers[0])
+    driver = univ.ConcurrentEnrollment(process, max_workers=workers)
+
+    switch_interval = sys.getswitchinterval()
+    # частое переключение потоков делает гонку check-then-act вероятной
+    sys.setswitchinterval(1e-6)
+    try:
+        with _silenced():
+            elapsed, results = _timed(driver.run, pairs)
+    finally:
+        sys.setswitchinterval(switch_interval)
+
+    violations = []
+    limit = process.course_limit
+    for course in courses:
+        roster = course.get_roster()
+        waiting = course.get_waitlist()
+        if len(roster) > limit:
+            violations.append(f"{course.get_course_name()}: записано {len(roster)} при лимите {limit}")
+        if any(student in roster for student in waiting):
+            violations.append(f"{course.get_course_name()}: студент одновременно записан и ожидает")
+        expected = min(limit, n // courses_count + (course.get_course_id() < n % courses_count))
+        if len(roster) != expected:
+            violations.append(f"{course.get_course_name()}: записано {len(roster)}, ожидалось {expected}")
+    enrolled = sum(result.success for result in results)
+    waitlisted = sum(result.reason == process.WAITLISTED for result in results)
+    if enrolled + waitlisted != n:
+        violations.append(f"учтено заявок {enrolled + waitlisted} из {n}")
+    if enrolled != sum(len(course.get_students()) for course in courses):
+        violations.append("число успешных заявок не совпадает с составом курсов")
+    return {
+        'requests': n,
+        'workers': workers,
+        'elapsed_s': elapsed,
+        'enrolled': enrolled,
+        'waitlisted': waitlisted,
+        'violations': violations,
+    }
+
+
+#Отчеты по курсам: последовательно против пула процессов
+
+def bench_reports(n: int = 20000, students_per_course: int = 30) -> dict:
+    """Время generate_reports для n курсов в одном процессе и в пуле процессов"""
+    with univ.quiet_construction():
+        teacher = univ.Teacher(0, "Преподаватель", 45, "t@univ.ru", 0)
+        students = [univ.Student(1 + i, f"Студент {i}", 20, f"s{i}@univ.ru", i)
+                    for i in range(students_per_course * 10)]
+        courses = []
+        for i in range(n):
+            course = univ.Courses(i, f"Курс {i}", teacher)
+            for k in range(students_per_course):
+                course.add_student(students[(i + k * 10) % len(students)])
+            courses.append(course)
+    results = {}
+    serial, _ = _timed(univ.generate_reports, courses, None, 1)
+    parallel, _ = _timed(univ.generate_reports, courses)
+    results['serial_s'], results['parallel_s'] = serial, parallel
+    with tempfile.TemporaryDirectory() as tmp:
+        results['files_parallel_s'], _ = _timed(univ.generate_reports, courses, tmp)
+    results['courses'] = n
+    return results
+
+
+def bench_metrics(n: int = 20000, prometheus_file=None) -> dict:
+    """Цена замеров: try_enroll и change_grade через цепочку без метрик и с ними"""
+    with univ.quiet_construction():
+        teacher = univ.Teacher(0, "Преподаватель", 45, "t@univ.ru", 0)
+        students = [univ.Student(1 + i, f"Студент {i}", 20, f"s{i}@univ.ru", i) for i in range(n)]
+    chain = univ.TeacherHandler()
+    chain.set_next(univ.DepartmentHeadHandler()).set_next(univ.DeanHandler())
+    process = univ.StandardEnrollment(principal=teacher)
+    limit = process.course_limit
+
+    def enroll():
+        with univ.quiet_construction():
+            courses = [univ.Courses(i, f"Курс {i}", teacher) for i in range(-(-n // limit))]
+        for i, student in enumerate(students):
+            process.try_enroll(student, courses[i // limit])
+
+    def change_grades():
+        for i, student in enumerate(students):
+            student.set_grade(1 + i % 5, "Курс 0")
+            student.change_grade("Курс 0", 5 - i % 5, teacher, chain)
+
+    results = {'requests': n}
+    with _silenced():
+        results['enroll_off_s'], _ = _timed(enroll)
+        results['chain_off_s'], _ = _timed(change_grades)
+        exporter = univ.InMemoryMetricsExporter()
+        exporters = [exporter] + ([univ.PrometheusFileExporter(prometheus_file)] if prometheus_file else [])
+        with univ.collect_metrics(univ.MetricsRegistry(exporters=exporters)) as registry:
+            results['enroll_on_s'], _ = _timed(enroll)
+            results['chain_on_s'], _ = _timed(change_grades)
+        registry.export()
+    results['snapshot'] = exporter.last
+    return results
+
+
+@contextlib.contextmanager
+def _scratch_material_store(root=None):
+    """Временное хранилище материалов, чтобы не писать в каталог по умолчанию"""
+    with contextlib.ExitStack() as stack:
+        if root is None:
+            root = stack.enter_context(tempfile.TemporaryDirectory())
+        store = univ.MaterialStore(os.path.join(root, 'materials'))
+        previous = univ.set_material_store(store)
+        stack.callback(univ.set_material_store, previous)
+        yield store
+
+
+def bench_materials(n: int = 20000, lecture_kb: int = 20, lectures_per_course: int = 3) -> dict:
+    """Материалы по ссылкам: размер хранилища и снимка, память курсов, чтение через кэш.
+
+    Курсы используют общий пул из n // 10 текстов (типовые программы),
+    поэтому одинаковые тексты хранятся один раз.
+    """
+    pool = [f"Лекция {i}\n" + "Текст лекции. " * (lecture_kb * 1024 // 26) for i in range(max(1, n // 10))]
+    sizes = [len(lecture.encode('utf-8')) for lecture in pool]
+    rng = random.Random(0)
+    results = {'courses': n}
+    with tempfile.TemporaryDirectory() as tmp, _scratch_material_store(tmp) as store, _silenced():
+        teacher = univ.Teacher(0, "Преподаватель", 45, "t@univ.ru", 0)
+        tracemalloc.start()
+        start = time.perf_counter()
+        courses = []
+        inline_bytes = 0
+        for i in range(n):
+            course = univ.Courses(i, f"Курс {i}", teacher)
+            for number in rng.sample(range(len(pool)), min(lectures_per_course, len(pool))):
+                course.add_material(pool[number])
+                inline_bytes += sizes[number]
+            courses.append(course)
+        results['add_s'] = time.perf_counter() - start
+        results['courses_memory_bytes'] = tracemalloc.get_traced_memory()[0]
+        tracemalloc.stop()
+        blobs = [os.path.join(directory, name) for directory, _, names in os.walk(store.root) for name in names]
+        results['blobs'] = len(blobs)
+        results['store_bytes'] = sum(map(os.path.getsize, blobs))
+        results['inline_bytes'] = inline_bytes
+        filename = os.path.join(tmp, 'university' + univ.SNAPSHOT_SUFFIX)
+        univ.save_system_data([], [teacher], courses, filename)
+        results['snapshot_bytes'] = os.path.getsize(filename)
+        sample = rng.sample(courses, min(1000, n))
+        results['read_cold_s'], _ = _timed(lambda: [course.get_lectures() for course in sample])
+        results['read_warm_s'], _ = _timed(lambda: [course.get_lectures() for course in sample])
+        results['cache'] = store.cache_info()
+    return results
+
+
+def bench_notifications(n: int = 20000, latency: float = 0.005) -> dict:
+    """Запись с печатью уведомлений и с outbox; пропускная способность отправки.
+
+    Транспорт в память с задержкой latency на пачку изображает почтовый
+    сервер; FileTransport - локальная замена SMTP с записью в файл.
+    """
+    with univ.quiet_construction():
+        teacher = univ.Teacher(0, "Преподаватель", 45, "t@univ.ru", 0)
+        students = [univ.Student(1 + i, f"Студент {i}", 20, f"s{i}@univ.ru", i) for i in range(n)]
+    process = univ.OnlineEnrollmentProcess(principal=teacher)
+    limit = process.course_limit
+
+    def enroll():
+        with univ.quiet_construction():
+            courses = [univ.Courses(i, f"Курс {i}", teacher) for i in range(-(-n // limit))]
+        for i, student in enumerate(students):
+            process.try_enroll(student, courses[i // limit])
+
+    results = {'requests': n}
+    with _silenced():
+        results['enroll_print_s'], _ = _timed(enroll)
+        outbox = univ.NotificationOutbox()
+        previous = univ.set_notification_outbox(outbox)
+        try:
+            results['enroll_outbox_s'], _ = _timed(enroll)
+        finally:
+            univ.set_notification_outbox(previous)
+    pending = outbox.drain()
+    results['queued'] = len(pending)
+    for concurrency in (1, 8):
+        outbox.enqueue_many(pending)
+        transport = univ.MemoryTransport(latency=latency)
+        dispatcher = univ.NotificationDispatcher(outbox, transport, batch_size=100, concurrency=concurrency)
+        elapsed, _ = _timed(dispatcher.send_pending)
+        results[f'memory_c{concurrency}_per_s'] = len(transport.sent) / elapsed
+    with tempfile.TemporaryDirectory() as tmp:
+        outbox.enqueue_many(pending)
+        transport = univ.FileTransport(os.path.join(tmp, 'mail.txt'))
+        dispatcher = univ.NotificationDispatcher(outbox, transport, batch_size=500)
+        elapsed, sent = _timed(dispatcher.send_pending)
+        results['file_per_s'] = sent / elapsed
+    return results
+
+
+#Набор бенчмарков горячих путей и генератор синтетического университета
+
+_LAST_NAMES = ["Иванов", "Петров", "Сидоров", "Смирнов", "Кузнецов", "Попов", "Васильев", "Соколов",
+               "Михайлов", "Новиков", "Федоров", "Морозов", "Волков", "Алексеев", "Лебедев", "Козлов"]
+_FIRST_NAMES = ["Иван", "Анна", "Сергей", "Мария", "Дмитрий", "Елена", "Алексей", "Ольга",
+                "Павел", "Наталья", "Андрей", "Татьяна", "Михаил", "Ирина", "Никита", "Юлия"]
+_SUBJECTS = ["Математика", "Физика", "Информатика", "История", "Философия", "Химия", "Биология",
+             "Экономика", "Право", "Английский язык", "Статистика", "Алгоритмы"]
+_DAYS = ["Пн", "Вт", "Ср", "Чт", "Пт", "Сб"]
+# Распределение оценок: чаще 4, реже 2 и 1
+_GRADE_WEIGHTS = {1: 0.02, 2: 0.08, 3: 0.25, 4: 0.40, 5: 0.25}
+
+
+def generate_university(students: int = 10000, teachers: int = 200, courses: int = 500,
+                        seed: int = 0, courses_per_student=(2, 6), grades: bool = True):
+    """Синтетический университет, воспроизводимый по seed.
+
+    Популярность курсов убывает по закону Ципфа, каждый студент записан
+    на courses_per_student курсов (равномерно в диапазоне), оценки
+    распределены по _GRADE_WEIGHTS, у курса одно-два занятия в неделю.
+    grades=False - без оценок: GradeStore хранит плотную матрицу
+    студенты × курсы, и для десятков тысяч курсов она не нужна.
+    Возвращает (students, teachers, courses).
+    """
+    rng = random.Random(seed)
+    teacher_list = univ.PersonFactory.create_many('Teacher', {
+        'person_id': range(teachers),
+        'name': [f"{rng.choice(_LAST_NAMES)} {rng.choice(_FIRST_NAMES)}" for _ in range(teachers)],
+        'age': [rng.randint(28, 70) for _ in range(teachers)],
+        'email': [f"teacher{i}@univ.ru" for i in range(teachers)],
+        'teacher_id': range(teachers),
+        'subjects': [rng.sample(_SUBJECTS, 2) for _ in range(teachers)],
+    })
+    course_names = [f"{_SUBJECTS[i % len(_SUBJECTS)]} {i}" for i in range(courses)]
+    # накопленные веса считаются один раз, а не в каждом rng.choices
+    popularity = list(accumulate(1 / (rank + 1) ** 0.8 for rank in range(courses)))
+    grade_values, grade_weights = list(_GRADE_WEIGHTS), list(_GRADE_WEIGHTS.values())
+    enrolled = [[] for _ in range(courses)]
+    records = []
+    for i in range(students):
+        person_id = teachers + i
+        wanted = min(courses, rng.randint(*courses_per_student))
+        chosen = set()
+        while len(chosen) < wanted:
+            chosen.update(rng.choices(range(courses), cum_weights=popularity, k=wanted - len(chosen)))
+        chosen = sorted(chosen)
+        for course in chosen:
+            enrolled[course].append(person_id)
+        chosen_grades = rng.choices(grade_values, grade_weights, k=len(chosen)) if grades else []
+        records.append((person_id, f"{rng.choice(_LAST_NAMES)} {rng.choice(_FIRST_NAMES)}",
+                        rng.randint(17, 30), f"student{i}@univ.ru", i,
+                        [course_names[course] for course in chosen],
+                        {course_names[course]: grade for course, grade in zip(chosen, chosen_grades)}))
+    student_list = univ.PersonFactory.create_many('Student', records)
+    identity_map = univ.IdentityMap(teacher_list + student_list)
+    course_list = univ.Courses.from_ref_dict_many([{
+        'courses_id': i,
+        'course_name': course_names[i],
+        'teacher_id': i % teachers,
+        'student_ids': enrolled[i],
+        'schedule': {day: rng.randint(9, 18) for day in rng.sample(_DAYS, rng.randint(1, 2))},
+        'materials': [f"Лекция {k + 1}" for k in range(rng.randint(1, 4))],
+    } for i in range(courses)], identity_map)
+    return student_list, teacher_list, course_list
+
+
+def bench_timetable(n: int = 20000, seed: int = 0) -> dict:
+    """Проверка расписания семестра из n курсов (5n студентов) и проверки при записи"""
+    with _silenced(), _scratch_material_store():
+        students, teachers, courses = generate_university(5 * n, max(1, n // 50), n, seed, grades=False)
+    rng = random.Random(seed)
+    rooms = {course.get_course_id(): f"Ауд. {rng.randrange(max(1, n // 20))}" for course in courses}
+    results = {'courses': n, 'students': len(students)}
+    results['validate_s'], conflicts = _timed(univ.find_schedule_conflicts, courses, rooms)
+    results['conflicts'] = dict(sorted(Counter(conflict.kind for conflict in conflicts).items()))
+    results['index_s'], timetable = _timed(univ.Timetable.from_courses, courses, rooms)
+    pairs = [(rng.choice(students), rng.choice(courses)) for _ in range(min(n, 100000))]
+    elapsed, _ = _timed(lambda: [timetable.student_conflicts(student, course) for student, course in pairs])
+    results['check_us'] = elapsed / len(pairs) * 1e6
+    return results
+
+
+def _measure(run, setup=None, repeat: int = 3) -> float:
+    """Лучшее время run(*setup()) из repeat запусков (подготовка не входит в замер)"""
+    best = float('inf')
+    for _ in range(repeat):
+        args = setup() if setup is not None else ()
+        gc.collect()
+        start = time.perf_counter()
+        run(*args)
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def _suite_cases(students, teachers, courses, seed: int, tmp: str):
+    """Пары (имя, (ops, run, setup)) для run_suite"""
+    n, k = len(students), len(courses)
+    rng = random.Random(seed)
+    base_id = 10 * (n + len(teachers)) + 1
+
+    def construct(cls):
+        def run():
+            for i in range(n):
+                cls(base_id + i, "Иванов Иван", 20, "ivanov@univ.ru", i)
+        return run
+    yield 'construct_student', (n, construct(univ.Student), None)
+    yield 'construct_teacher', (n, construct(univ.Teacher), None)
+    columns = {'person_id': range(base_id, base_id + n), 'name': ["Иванов Иван"] * n, 'age': [20] * n,
+               'email': ["ivanov@univ.ru"] * n, 'student_id': range(n)}
+    yield 'create_many_student', (n, lambda: univ.PersonFactory.create_many('Student', columns), None)
+
+    # запись через каждый EnrollmentProcess: свежие курсы, заявок не больше лимита
+    for process_cls in (univ.OnlineEnrollmentProcess, univ.OfflineEnrollmentProcess, univ.StandardEnrollment):
+        limit = process_cls.course_limit
+        count = min(n, k * limit)
+
+        def setup(limit=limit, count=count, process_cls=process_cls):
+            fresh = [univ.Courses(base_id + i, f"Запись {i}", teachers[i % len(teachers)])
+                     for i in range(-(-count // limit))]
+            return process_cls(principal=teachers[0]), [(students[i], fresh[i // limit]) for i in range(count)]
+
+        def run(process, pairs):
+            for student, course in pairs:
+                process.enroll_student(student, course)
+        yield f'enroll_{process_cls.__name__}', (count, run, setup)
+
+    # change_grade через цепочку: разница оценок 1..4, чтобы работали все звенья
+    chain = univ.TeacherHandler()
+    chain.set_next(univ.DepartmentHeadHandler()).set_next(univ.DeanHandler())
+    teacher_of = {course.get_course_name(): course.get_course_teacher() for course in courses}
+    graded = [(student, course_name, rng.randint(1, 5), teacher_of[course_name])
+              for student in students for course_name in student.get_courses()[:1]]
+
+    def change_grades():
+        for student, course_name, grade, teacher in graded:
+            student.change_grade(course_name, grade, teacher, chain)
+    yield 'change_grade_chain', (len(graded), change_grades, None)
+
+    for suffix in ('.json', '.jsonl', univ.SNAPSHOT_SUFFIX):
+        filename = os.path.join(tmp, 'university' + suffix)
+
+        def load(filename=filename):
+            univ.load_system_data(filename)
+        yield f'save{suffix.replace(".", "_")}', (n, lambda filename=filename: univ.save_system_data(
+            students, teachers, courses, filename), None)
+        yield f'load{suffix.replace(".", "_")}', (n, load, None)
+
+    yield 'validate_term', (k, lambda: univ.find_schedule_conflicts(courses), None)
+    yield 'generate_report', (k, lambda: [course.generate_report() for course in courses], None)
+    yield 'generate_reports_pool', (k, lambda: univ.generate_reports(courses), None)
+
+
+def run_suite(students: int = 10000, seed: int = 0, repeat: int = 3, cases=None) -> dict:
+    """Запускает набор бенчмарков; результат - словарь, готовый для json.dump.
+
+    Размер университета задается числом студентов: преподавателей в 50 раз,
+    курсов в 20 раз меньше. cases - имена случаев (по умолчанию все).
+    """
+    teachers, courses = max(1, students // 50), max(1, students // 20)
+    results = {}
+    with _silenced(), tempfile.TemporaryDirectory() as tmp, _scratch_material_store(tmp):
+        generated, university = _timed(generate_university, students, teachers, courses, seed)
+        for name, (ops, run, setup) in _suite_cases(*university, seed, tmp):
+            if cases is not None and name not in cases:
+                continue
+            seconds = _measure(run, setup, repeat)
+            results[name] = {'seconds': seconds, 'ops': ops, 'ops_per_s': ops / seconds if seconds else None}
+    return {
+        'format': 'university-bench',
+        'version': 1,
+        'meta': {
+            'python': platform.python_version(),
+            'platform': platform.platform(),
+            'timestamp': time.strftime("%Y-%m-%dT%H:%M:%S"),
+            'generate_s': generated,
+        },
+        'params': {'students': students, 'teachers': teachers, 'courses': courses,
+                   'seed': seed, 'repeat': repeat},
+        'results': results,
+    }
+
+
+def compare_results(base: dict, new: dict, threshold: float = 0.10) -> list:
+    """Сравнивает два прогона run_suite по времени каждого случая.
+
+    Возвращает словари name/base_s/new_s/ratio/status, где status -
+    'regression' (медленнее более чем на threshold), 'improvement'
+    (быстрее на столько же), 'ok', а также 'added'/'removed'.
+    """
+    if base.get('params') != new.get('params'):
+        print("Внимание: прогоны сделаны с разными параметрами", file=sys.stderr)
+    rows = []
+    for name in sorted(base['results'].keys() | new['results'].keys()):
+        old, cur = base['results'].get(name), new['results'].get(name)
+        if old is None or cur is None:
+            rows.append({'name': name, 'base_s': old and old['seconds'], 'new_s': cur and cur['seconds'],
+                         'ratio': None, 'status': 'added' if old is None else 'removed'})
+            continue
+        ratio = cur['seconds'] / old['seconds'] if old['seconds'] else float('inf')
+        if ratio > 1 + threshold:
+            status = 'regression'
+        elif ratio < 1 / (1 + threshold):
+            status = 'improvement'
+        else:
+            status = 'ok'
+        rows.append({'name': name, 'base_s': old['seconds'], 'new_s': cur['seconds'],
+                     'ratio': ratio, 'status': status})
+    return rows
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('bench', choices=['memory', 'snapshot', 'permissions', 'approvals', 'enrollment',
+                                          'reports', 'metrics', 'timetable', 'materials', 'notifications',
+                                          'suite', 'compare'])
+    parser.add_argument('files', nargs='*', help="для compare: базовый и новый JSON с результатами")
+    parser.add_argument('-n', type=int, default=100000, help="количество объектов")
+    parser.add_argument('-o', '--output', help="suite: файл для результатов в JSON (по умолчанию - stdout); "
+                                               "metrics: файл для метрик в формате Prometheus")
+    parser.add_argument('--seed', type=int, default=0, help="suite, timetable: seed генератора данных")
+    parser.add_argument('--repeat', type=int, default=3, help="suite: повторов на случай")
+    parser.add_argument('--threshold', type=float, default=0.10,
+                        help="compare: допустимое замедление (доля), больше - регрессия")
+    args = parser.parse_args(argv)
+
+    if args.bench == 'memory':
+        for cls_name, sizes in bench_memory(args.n).items():
+            print(f"{cls_name}: до {sizes['before']:.0f} Б, после {sizes['after']:.0f} Б "
+                  f"на экземпляр ({sizes['before'] / sizes['after']:.1f}x)")
+    elif args.bench == 'snapshot':
+        for fmt, stats in bench_snapshot(args.n).items():
+            print(f"{fmt}: {stats['size_bytes'] / 2 ** 20:.1f} МБ, сохранение {stats['save_s']:.3f} с, "
+                  f"открытие {stats['open_s']:.4f} с, первый доступ {stats['first_access_s']:.4f} с, "
+                  f"полная загрузка {stats['materialize_all_s']:.3f} с")
+    elif args.bench == 'permissions':
+        stats = bench_permissions(args.n)
+        print(f"без декоратора {stats['plain_ns']:.0f} нс, с check_permissions {stats['guarded_ns']:.0f} нс, "
+              f"накладные расходы {stats['overhead_ns']:.0f} нс на вызов")
+    elif args.bench == 'approvals':
+        stats = bench_approvals(args.n)
+        print(f"{stats['requests']} заявок за {stats['elapsed_s']:.2f} с ({stats['requests_per_s']:.0f} в секунду), "
+              f"одобрено {stats['approved']}, вызовы согласующих {stats['approver_calls']}")
+    elif args.bench == 'enrollment':
+        stats = stress_enrollment(args.n)
+        print(f"{stats['requests']} заявок в {stats['workers']} потоков за {stats['elapsed_s']:.2f} с: "
+              f"записано {stats['enrolled']}, в листе ожидания {stats['waitlisted']}")
+        for violation in stats['violations']:
+            print(f"НАРУШЕНИЕ: {violation}")
+        if stats['violations']:
+            sys.exit(1)
+    elif args.bench == 'reports':
+        stats = bench_reports(args.n)
+        print(f"{stats['courses']} отчетов: в одном процессе {stats['serial_s']:.2f} с, "
+              f"в пуле процессов {stats['parallel_s']:.2f} с, в файлы {stats['files_parallel_s']:.2f} с")
+    elif args.bench == 'metrics':
+        stats = bench_metrics(args.n, args.output)
+        print(f"{stats['requests']} заявок на запись: без метрик {stats['enroll_off_s']:.3f} с, "
+              f"с метриками {stats['enroll_on_s']:.3f} с")
+        print(f"{stats['requests']} изменений оценок через цепочку: без метрик {stats['chain_off_s']:.3f} с, "
+              f"с метриками {stats['chain_on_s']:.3f} с")
+        for item in stats['snapshot']['counters'].get('grade_chain_approvals_total', []):
+            print(f"одобрено звеном {item['labels']['level']}: {item['value']}")
+    elif args.bench == 'timetable':
+        stats = bench_timetable(args.n, args.seed)
+        print(f"{stats['courses']} курсов, {stats['students']} студентов: проверка семестра "
+              f"{stats['validate_s']:.2f} с, конфликты {stats['conflicts']}")
+        print(f"построение индексов {stats['index_s']:.2f} с, проверка записи {stats['check_us']:.1f} мкс")
+    elif args.bench == 'materials':
+        stats = bench_materials(args.n)
+        print(f"{stats['courses']} курсов: {stats['blobs']} текстов в хранилище, "
+              f"{stats['store_bytes'] / 2**20:.1f} МБ (в курсах было бы {stats['inline_bytes'] / 2**20:.1f} МБ)")
+        print(f"память курсов {stats['courses_memory_bytes'] / 2**20:.1f} МБ, "
+              f"снимок {stats['snapshot_bytes'] / 2**20:.1f} МБ, добавление {stats['add_s']:.2f} с")
+        print(f"чтение лекций 1000 курсов: первое {stats['read_cold_s']:.3f} с, "
+              f"повторное {stats['read_warm_s']:.3f} с, кэш {stats['cache']}")
+    elif args.bench == 'notifications':
+        stats = bench_notifications(args.n)
+        print(f"{stats['requests']} заявок: с печатью уведомлений {stats['enroll_print_s']:.2f} с, "
+              f"с outbox {stats['enroll_outbox_s']:.2f} с, в очереди {stats['queued']}")
+        print(f"отправка (писем/с): 1 пачка за раз {stats['memory_c1_per_s']:.0f}, "
+              f"8 пачек {stats['memory_c8_per_s']:.0f}, в файл {stats['file_per_s']:.0f}")
+    elif args.bench == 'suite':
+        report = run_suite(args.n, args.seed, args.repeat)
+        if args.output:
+            with open(args.output, 'w', encoding='utf-8') as f:
+                json.dump(report, f, ensure_ascii=False, indent=2)
+            for name, stats in report['results'].items():
+                print(f"{name}: {stats['seconds']:.4f} с, {stats['ops_per_s']:.0f} оп/с")
+        else:
+            json.dump(report, sys.stdout, ensure_ascii=False, indent=2)
+            print()
+    elif args.bench == 'compare':
+        if len(args.files) != 2:
+            parser.error("compare: нужны два файла - базовый и новый")
+        with open(args.files[0], encoding='utf-8') as f:
+            base = json.load(f)
+        with open(args.files[1], encoding='utf-8') as f:
+            new = json.load(f)
+        rows = compare_results(base, new, args.threshold)
+        for row in rows:
+            ratio = f"{row['ratio']:.2f}x" if row['ratio'] is not None else "-"
+            print(f"{row['status']:>11}  {row['name']:<32} {ratio}")
+        if any(row['status'] == 'regression' for row in rows):
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -1,65 +1,591 @@
-from abc import ABC, abstractmethod
-import datetime
+from abc import ABC, ABCMeta, abstractmethod
+from array import array
+import asyncio
+import atexit
+from bisect import bisect_left, bisect_right
+from collections import Counter, OrderedDict, deque
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from contextlib import contextmanager, nullcontext
+from contextvars import ContextVar
+from enum import IntFlag
+from functools import wraps
+import gc
+import hashlib
+from heapq import nlargest
+from itertools import chain, compress, groupby, islice, repeat
 import json
-from typing import Dict, List
+import mmap
+from operator import contains, methodcaller
+import os
+import queue
+import random
+import shutil
+import sqlite3
+import struct
+import tempfile
+import threading
+import time
+from typing import Dict, List, NamedTuple, Optional
+import zlib
 import logging
+from statistics import fmean, median
 
-# Настройка логирования
-logging.basicConfig(
-    level=logging.INFO,
-    format='%(asctime)s - %(levelname)s - %(message)s',
-    handlers=[
-        logging.FileHandler('university.log'),
-        logging.StreamHandler()
-    ]
-)
+try:
+    import numpy as np
+except ImportError:  # numpy необязателен: агрегаты считаются на чистом Python
+    np = None
+
+# Настройка логирования: при импорте обработчики не устанавливаются,
+# приложение вызывает configure_logging() само (см. main)
+logger = logging.getLogger(__name__)
+logger.addHandler(logging.NullHandler())
+
+
+def configure_logging(level=logging.INFO, log_file: str = 'university.log'):
+    """Подключает обработчики логирования: файл и консоль"""
+    logging.basicConfig(
+        level=level,
+        format='%(asctime)s - %(levelname)s - %(message)s',
+        handlers=[
+            logging.FileHandler(log_file),
+            logging.StreamHandler()
+        ]
+    )
+
+
+# Логирование создания объектов (Person, Student, Teacher, Courses).
+# Сообщение форматируется только если уровень INFO включен у logger.
+_construction_logging = True
+
+
+def set_construction_logging(enabled: bool) -> bool:
+    """Включает/выключает логирование конструкторов, возвращает прежнее значение"""
+    global _construction_logging
+    previous = _construction_logging
+    _construction_logging = enabled
+    return previous
+
+
+@contextmanager
+def quiet_construction():
+    """Контекст массовой загрузки: конструкторы ничего не логируют"""
+    previous = set_construction_logging(False)
+    try:
+        yield
+    finally:
+        set_construction_logging(previous)
+
+
+# Отслеживание изменений: сеттеры и мутаторы вызывают слушателей
+# listener(obj, op, args). Пока слушателей нет, проверка стоит одно
+# обращение к списку.
+_change_listeners: list = []
+
+
+def add_change_listener(listener):
+    _change_listeners.append(listener)
+
+
+def remove_change_listener(listener):
+    if listener in _change_listeners:
+        _change_listeners.remove(listener)
+
+
+def _emit_change(obj, op: str, *args):
+    for listener in list(_change_listeners):
+        listener(obj, op, args)
+
+
+@contextmanager
+def suspend_change_tracking():
+    """Временно отключает всех слушателей (например, при воспроизведении журнала)"""
+    saved = _change_listeners[:]
+    _change_listeners.clear()
+    try:
+        yield
+    finally:
+        _change_listeners[:] = saved
+
+
+#Метрики: счетчики и гистограммы задержек
+#
+# Инструментированный код читает _metrics один раз за вызов; пока реестр
+# не подключен (set_metrics/collect_metrics), каждая точка замера стоит
+# одной проверки на None.
+
+# Верхние границы корзин гистограмм задержек, секунды
+LATENCY_BUCKETS = (1e-6, 5e-6, 1e-5, 5e-5, 1e-4, 5e-4, 1e-3, 5e-3, 1e-2, 5e-2, 0.1, 0.5, 1.0, 5.0)
+
+# Описания встроенных метрик: имя -> (тип, имена меток, описание)
+METRIC_DESCRIPTIONS = {
+    'enrollment_step_seconds': ('histogram', ('process', 'step'),
+                                "Время шагов шаблонного метода записи на курс"),
+    'enrollment_requests_total': ('counter', ('process', 'result'),
+                                  "Заявки на запись по итогу"),
+    'grade_chain_hops_total': ('counter', ('level',),
+                               "Заявки на изменение оценки, дошедшие до звена цепочки"),
+    'grade_chain_approvals_total': ('counter', ('level',),
+                                    "Заявки на изменение оценки по одобрившему звену"),
+    'grade_chain_seconds': ('histogram', ('level',),
+                            "Время прохождения цепочки по одобрившему звену"),
+    'notifications_total': ('counter', ('result',),
+                            "Письма с уведомлениями: отправлено, повторено, не отправлено, вытеснено из очереди"),
+}
+
+
+class Histogram:
+    """Гистограмма с фиксированными корзинами (le - верхняя граница включительно)"""
+
+    __slots__ = ('buckets', 'counts', 'sum', 'count')
+
+    def __init__(self, buckets=LATENCY_BUCKETS):
+        self.buckets = tuple(buckets)
+        self.counts = [0] * (len(self.buckets) + 1)  # последняя корзина - +Inf
+        self.sum = 0.0
+        self.count = 0
+
+    def observe(self, value: float):
+        self.counts[bisect_left(self.buckets, value)] += 1
+        self.sum += value
+        self.count += 1
+
+    def cumulative(self) -> list:
+        """Пары (le, число значений <= le), последняя - (inf, count)"""
+        total, result = 0, []
+        for bound, count in zip(self.buckets + (float('inf'),), self.counts):
+            total += count
+            result.append((bound, total))
+        return result
+
+
+class MetricsRegistry:
+    """Реестр метрик процесса.
+
+    Счетчики и гистограммы адресуются именем и кортежем значений меток
+    в порядке имен из METRIC_DESCRIPTIONS (или describe()). Обновления
+    потокобезопасны. export() передает снимок подключенным экспортерам.
+    """
+
+    def __init__(self, buckets=LATENCY_BUCKETS, exporters=()):
+        self.buckets = tuple(buckets)
+        self.exporters = list(exporters)
+        self.descriptions = dict(METRIC_DESCRIPTIONS)
+        self._counters: Dict[str, Dict[tuple, float]] = {}
+        self._histograms: Dict[str, Dict[tuple, Histogram]] = {}
+        self._lock = threading.Lock()
+
+    def describe(self, name: str, kind: str, labelnames=(), help: str = ""):
+        self.descriptions[name] = (kind, tuple(labelnames), help)
+
+    def inc(self, name: str, labels: tuple = (), value: float = 1):
+        with self._lock:
+            series = self._counters.setdefault(name, {})
+            series[labels] = series.get(labels, 0) + value
+
+    def observe(self, name: str, labels: tuple, value: float):
+        with self._lock:
+            series = self._histograms.setdefault(name, {})
+            histogram = series.get(labels)
+            if histogram is None:
+                histogram = series[labels] = Histogram(self.buckets)
+            histogram.observe(value)
+
+    def lap(self, name: str, labels: tuple, start: float) -> float:
+        """Записывает время от start до текущего момента, возвращает текущий момент"""
+        now = time.perf_counter()
+        self.observe(name, labels, now - start)
+        return now
+
+    def reset(self):
+        with self._lock:
+            self._counters.clear()
+            self._histograms.clear()
+
+    def _labels(self, name: str, values: tuple) -> Dict[str, str]:
+        labelnames = self.descriptions.get(name, (None, ()))[1]
+        return {(labelnames[i] if i < len(labelnames) else f"label{i}"): str(value)
+                for i, value in enumerate(values)}
+
+    def snapshot(self) -> dict:
+        """Копия всех значений в виде словарей (годится для json.dump)"""
+        with self._lock:
+            counters = {name: [{'labels': self._labels(name, labels), 'value': value}
+                               for labels, value in series.items()]
+                        for name, series in self._counters.items()}
+            histograms = {name: [{'labels': self._labels(name, labels),
+                                  'buckets': histogram.cumulative(),
+                                  'sum': histogram.sum,
+                                  'count': histogram.count}
+                                 for labels, histogram in series.items()]
+                          for name, series in self._histograms.items()}
+        return {
+            'timestamp': time.time(),
+            'help': {name: description[2] for name, description in self.descriptions.items()},
+            'counters': counters,
+            'histograms': histograms,
+        }
+
+    def export(self) -> dict:
+        snapshot = self.snapshot()
+        for exporter in self.exporters:
+            exporter.export(snapshot)
+        return snapshot
+
+
+class MetricsExporter(ABC):
+    """Базовый получатель снимков метрик (MetricsRegistry.snapshot())"""
+
+    @abstractmethod
+    def export(self, snapshot: dict):
+        pass
+
+
+class InMemoryMetricsExporter(MetricsExporter):
+    """Хранит последний снимок в памяти процесса"""
+
+    def __init__(self):
+        self.last: Optional[dict] = None
+
+    def export(self, snapshot: dict):
+        self.last = snapshot
+
+
+def _prometheus_escape(text: str) -> str:
+    return text.replace('\\', '\\\\').replace('\n', '\\n').replace('"', '\\"')
+
+
+def _prometheus_labels(labels: Dict[str, str], extra: str = "") -> str:
+    parts = [f'{name}="{_prometheus_escape(value)}"' for name, value in labels.items()]
+    if extra:
+        parts.append(extra)
+    return "{" + ",".join(parts) + "}" if parts else ""
+
+
+def format_prometheus(snapshot: dict) -> str:
+    """Снимок метрик в текстовом формате Prometheus (exposition format 0.0.4)"""
+    lines = []
+    for kind, families in (('counter', snapshot['counters']), ('histogram', snapshot['histograms'])):
+        for name, series in sorted(families.items()):
+            help_text = snapshot['help'].get(name, "")
+            if help_text:
+                lines.append(f"# HELP {name} {_prometheus_escape(help_text)}")
+            lines.append(f"# TYPE {name} {kind}")
+            for item in series:
+                labels = item['labels']
+                if kind == 'counter':
+                    lines.append(f"{name}{_prometheus_labels(labels)} {item['value']}")
+                    continue
+                for bound, count in item['buckets']:
+                    le = 'le="+Inf"' if bound == float('inf') else f'le="{float(bound)!r}"'
+                    lines.append(f"{name}_bucket{_prometheus_labels(labels, le)} {count}")
+                lines.append(f"{name}_sum{_prometheus_labels(labels)} {item['sum']!r}")
+                lines.append(f"{name}_count{_prometheus_labels(labels)} {item['count']}")
+    return "\n".join(lines) + "\n"
+
+
+class PrometheusFileExporter(MetricsExporter):
+    """Записывает снимок в файл в формате Prometheus (для textfile collector).
+
+    Файл заменяется атомарно, так что сборщик не видит его наполовину записанным.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+
+    def export(self, snapshot: dict):
+        tmp_path = f"{self.path}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as file:
+            file.write(format_prometheus(snapshot))
+        os.replace(tmp_path, self.path)
+
+
+_metrics: Optional[MetricsRegistry] = None
+
+
+def get_metrics() -> Optional[MetricsRegistry]:
+    return _metrics
+
+
+def set_metrics(registry: Optional[MetricsRegistry]) -> Optional[MetricsRegistry]:
+    """Подключает реестр метрик (None - выключает замеры), возвращает прежний"""
+    global _metrics
+    previous = _metrics
+    _metrics = registry
+    return previous
+
+
+@contextmanager
+def collect_metrics(registry: Optional[MetricsRegistry] = None):
+    """Контекст с включенными метриками; отдает используемый реестр"""
+    registry = registry if registry is not None else MetricsRegistry()
+    previous = set_metrics(registry)
+    try:
+        yield registry
+    finally:
+        set_metrics(previous)
 
 
 #исключение и декораторы 
 class PermissionDeniedError(Exception):
     """Исключение при отсутствии прав доступа"""
-    pass
+    def __init__(self, action: str, role: str):
+        self.action = action
+        self.role = role
+        super().__init__(f"Роль '{role}' не имеет прав для выполнения: {action}")
+
+
+class Role(IntFlag):
+    """Роли участников; набор разрешенных ролей - битовая маска"""
+    NONE = 0
+    STUDENT = 1
+    TEACHER = 2
+    ADMIN = 4
+
+
+# Названия ролей (в том числе локализованные, как их возвращает get_role())
+ROLE_ALIASES = {
+    'student': Role.STUDENT, 'студент': Role.STUDENT,
+    'teacher': Role.TEACHER, 'преподаватель': Role.TEACHER,
+    'admin': Role.ADMIN, 'администратор': Role.ADMIN,
+}
+_normalized_roles: Dict[object, Role] = {}
+
+
+def normalize_role(role) -> Role:
+    """Приводит название роли к Role (неизвестные роли - Role.NONE); результат кэшируется"""
+    normalized = _normalized_roles.get(role)
+    if normalized is None:
+        if isinstance(role, Role):
+            normalized = role
+        elif isinstance(role, str):
+            normalized = ROLE_ALIASES.get(role.strip().lower(), Role.NONE)
+        else:
+            normalized = Role.NONE
+        _normalized_roles[role] = normalized
+    return normalized
+
+
+# Участник, от имени которого выполняются действия (см. acting_as)
+_acting_principal: ContextVar = ContextVar('acting_principal', default=None)
+
+
+@contextmanager
+def acting_as(principal):
+    """Выполняет блок от имени principal (объект с get_role(), например Teacher).
+
+    Значение хранится в ContextVar: у каждого потока и задачи asyncio свое.
+    """
+    token = _acting_principal.set(principal)
+    try:
+        yield principal
+    finally:
+        _acting_principal.reset(token)
+
+
+def get_acting_principal():
+    return _acting_principal.get()
+
 
 def check_permissions(allowed_roles):
+    """Декоратор проверки роли участника, заданного через acting_as().
+
+    Разрешенные роли компилируются в маску при декорировании, а решение
+    для каждого значения get_role() кэшируется, так что повторный вызов
+    стоит одного поиска в словаре. Без участника вызов запрещен.
+    """
+    allowed_mask = Role.NONE
+    for role in allowed_roles:
+        allowed_mask |= normalize_role(role)
+
     def decorator(func):
+        decisions: Dict[object, bool] = {}
+
+        @wraps(func)
         def wrapper(self, *args, **kwargs):
-            if not hasattr(self, 'get_role'):
-                raise PermissionDeniedError("Объект не имеет метода get_role()")
-            
-            user_role = self.get_role().lower()
-            if user_role not in [role.lower() for role in allowed_roles]:
-                raise PermissionDeniedError(f"Роль {user_role} не имеет доступа")
-            
+            get_role = getattr(_acting_principal.get(), 'get_role', None)
+            if get_role is None:
+                raise PermissionDeniedError(func.__name__, "не задана")
+            user_role = get_role()
+            allowed = decisions.get(user_role)
+            if allowed is None:
+                allowed = decisions[user_role] = bool(normalize_role(user_role) & allowed_mask)
+            if not allowed:
+                raise PermissionDeniedError(func.__name__, user_role)
             return func(self, *args, **kwargs)
+
+        wrapper.allowed_roles = allowed_mask
         return wrapper
     return decorator
 
-class InvalidPersonError(Exception):
-    def __init__(self, field_name: str, message: str):
+class InvalidPersonError(ValueError):
+    def __init__(self, field_name: str, message: str, errors=None):
         self.field_name = field_name
         self.message = message
+        # все найденные ошибки: (номер записи в пакете или None, поле, сообщение)
+        self.errors = errors if errors is not None else [(None, field_name, message)]
         super().__init__(f"Некорректные данные в поле {field_name}: {message}")
 
-class PermissionDeniedError(Exception):
-    def __init__(self, action: str, role: str):
-        super().__init__(f"Роль '{role}' не имеет прав для выполнения: {action}")
+    @classmethod
+    def from_errors(cls, errors) -> "InvalidPersonError":
+        """Одно исключение на весь пакет; в сообщении - первая ошибка"""
+        index, field_name, message = errors[0]
+        return cls(field_name, f"ошибок в пакете: {len(errors)}, первая - запись {index}: {message}", errors)
+
+
+class InvalidPersonTypeError(InvalidPersonError, TypeError):
+    """Значение поля неверного типа (ловится и как TypeError, как до схемы полей)"""
+
 
 class CourseNotFoundError(Exception):
     def __init__(self, course_name: str):
         super().__init__(f"Курс '{course_name}' не найден")
 
+#Схема полей Person: из нее PersonMeta собирает валидаторы класса
+
+class Field:
+    """Описание поля: тип значения и ограничения.
+
+    min/max - границы значения, contains - обязательная подстрока,
+    items - схема элементов списка (для словаря - ключей), values - схема
+    значений словаря. init=False - поля нет среди аргументов конструктора.
+    default - значение для пакетной загрузки, если поле не передано
+    (None - поле обязательно); загрузчики его только читают.
+    """
+
+    __slots__ = ('type', 'message', 'min', 'max', 'contains', 'items', 'values', 'init', 'default',
+                 'exclude_bool', 'check')
+
+    def __init__(self, type_, message: str = "", *, min=None, max=None, contains=None,
+                 items: "Field" = None, values: "Field" = None, init: bool = True, default=None):
+        self.type = type_
+        self.message = message
+        self.min = min
+        self.max = max
+        self.contains = contains
+        self.items = items
+        self.values = values
+        self.init = init
+        self.default = default
+        # bool - подкласс int, но True/False не принимаются как число
+        types = type_ if isinstance(type_, tuple) else (type_,)
+        self.exclude_bool = int in types and bool not in types
+        namespace = {}
+        exec(f"def check(value):\n    return {self.expression('value', namespace)}\n", namespace)
+        self.check = namespace['check']
+
+    def expression(self, var: str, namespace: Dict) -> str:
+        """Условие на Python для значения var; нужные объекты кладутся в namespace"""
+        type_name = f"_type{len(namespace)}"
+        namespace[type_name] = self.type
+        parts = [f"isinstance({var}, {type_name})"]
+        if self.exclude_bool:
+            parts.append(f"not isinstance({var}, bool)")
+        if self.min is not None:
+            parts.append(f"{var} >= {self.min!r}")
+        if self.max is not None:
+            parts.append(f"{var} <= {self.max!r}")
+        if self.contains is not None:
+            parts.append(f"{self.contains!r} in {var}")
+        if self.items is not None:
+            parts.append(f"all({self.items.expression(var + '_i', namespace)} for {var}_i in {var})")
+        if self.values is not None:
+            parts.append(f"all({self.values.expression(var + '_v', namespace)} for {var}_v in {var}.values())")
+        return " and ".join(parts)
+
+    def type_ok(self, value) -> bool:
+        return isinstance(value, self.type) and not (self.exclude_bool and isinstance(value, bool))
+
+    def column_ok(self, column: list) -> bool:
+        """Проверка колонки значений целиком (циклы выполняются в C)"""
+        if not all(map(isinstance, column, repeat(self.type))):
+            return False
+        if self.exclude_bool and any(map(isinstance, column, repeat(bool))):
+            return False
+        if self.min is not None and column and min(column) < self.min:
+            return False
+        if self.max is not None and column and max(column) > self.max:
+            return False
+        if self.contains is not None and not all(map(contains, column, repeat(self.contains))):
+            return False
+        if self.items is not None and not self.items.column_ok(list(chain.from_iterable(column))):
+            return False
+        if self.values is not None and not self.values.column_ok(
+                list(chain.from_iterable(map(dict.values, column)))):
+            return False
+        return True
+
+
+# Значение обязательного поля, которого нет в словаре пакета
+_MISSING_FIELD = object()
+MISSING_FIELD_MESSAGE = "нет поля"
+
+
+def _compile_schema(cls_name: str, schema: Dict[str, Field]) -> Dict:
+    """Собирает из схемы функции проверки одной записи, пакета и аргументов конструктора"""
+    namespace = {'InvalidPersonError': InvalidPersonError, '_MISSING_FIELD': _MISSING_FIELD,
+                 '_message_missing': MISSING_FIELD_MESSAGE}
+    conditions = []
+    for field_name, field in schema.items():
+        message_name = f"_message_{field_name}"
+        namespace[message_name] = field.message
+        conditions.append((field_name, message_name, field.expression(field_name, namespace)))
+    fields = ", ".join(schema)
+    init_fields = ", ".join(name for name, field in schema.items() if field.init)
+    raise_checks = "".join(f"    if not ({condition}):\n"
+                           f"        raise InvalidPersonError({name!r}, {message})\n"
+                           for name, message, condition in conditions)
+    init_checks = "".join(f"    if not ({condition}):\n"
+                          f"        raise InvalidPersonError({name!r}, {message})\n"
+                          for name, message, condition in conditions if schema[name].init)
+    collect_checks = "".join(f"    if {name} is _MISSING_FIELD:\n"
+                             f"        errors.append((index, {name!r}, _message_missing))\n"
+                             f"    elif not ({condition}):\n"
+                             f"        errors.append((index, {name!r}, {message}))\n"
+                             for name, message, condition in conditions)
+    source = (f"def validate_record({fields}):\n{raise_checks}    pass\n"
+              f"def validate_init({init_fields}, *args, **kwargs):\n{init_checks}    pass\n"
+              f"def collect_errors(errors, index, {fields}):\n{collect_checks}    pass\n")
+    exec(compile(source, f"<schema {cls_name}>", "exec"), namespace)
+    return {name: namespace[name] for name in ('validate_record', 'validate_init', 'collect_errors')}
+
+
 #Метаклассы
 
-class PersonMeta(type):
+
+class PersonMeta(ABCMeta):
 
     registry={}
+    # Пакетные конструкторы по имени типа: словари формата to_dict -> объекты
+    builders={}
 
     def __new__(cls, name_cls, bases, atributes):
         new_class=super().__new__(cls, name_cls,bases, atributes)
         if name_cls!="Person":
             PersonMeta.registry[name_cls]=new_class
+            PersonMeta.builders[name_cls]=new_class.from_dict_many
+
+        # схема класса: поля предков и собственные fields
+        schema = {}
+        for base in reversed(bases):
+            schema.update(getattr(base, 'schema', {}))
+        schema.update(atributes.get('fields', {}))
+        new_class.schema = schema
+        new_class._record_fields = tuple(schema)
+        if schema:
+            compiled = _compile_schema(name_cls, schema)
+            new_class._validate_record = staticmethod(compiled['validate_record'])
+            new_class._validate_init = staticmethod(compiled['validate_init'])
+            new_class._collect_errors = staticmethod(compiled['collect_errors'])
     
         return new_class
+
+    def __call__(cls, *args, **kwargs):
+        cls._validate_init(*args, **kwargs)
+        instance = super().__call__(*args, **kwargs)
+        if _change_listeners:
+            _emit_change(instance, 'created')
+        return instance
+
     @staticmethod
     def created_by_type(name: str, *args, **kwargs):
         cls=PersonMeta.registry.get(name)
@@ -80,24 +606,35 @@ DeanHandler - одобряет любые изменения в оценке
 """
 
 class Grade_Change_Chain(ABC):
+    # Максимальная разница оценок, которую звено одобряет само (None - любая)
+    threshold = None
+    level = None
+
     def __init__(self):
-        self._next_step=None
+        self._next=None
 
     def set_next(self, new_next):
         self._next=new_next
         return self._next
+
     
     @abstractmethod
     def handle_request(self, request):
         if self._next:
+            route = request.get('route')
+            if route is not None:
+                route.append(self._next.level)
             return self._next.handle_request(request)
         return None  
 
 
     
 class TeacherHandler(Grade_Change_Chain):
+    threshold = 1
+    level = 'teacher'
+
     def handle_request(self, request):
-        if abs(request['new_grade'] - request['old_grade']) <= 1:
+        if abs(request['new_grade'] - request['old_grade']) <= self.threshold:
             print(f"Преподаватель {request['teacher'].get_name()} одобрил изменение оценки "
                   f"с {request['old_grade']} на {request['new_grade']}")
             return True
@@ -106,8 +643,11 @@ class TeacherHandler(Grade_Change_Chain):
             return super().handle_request(request)
 
 class DepartmentHeadHandler(Grade_Change_Chain):
+    threshold = 2
+    level = 'department_head'
+
     def handle_request(self, request):
-        if abs(request['new_grade'] - request['old_grade']) <= 2:
+        if abs(request['new_grade'] - request['old_grade']) <= self.threshold:
             print(f"Заведующий кафедрой одобрил изменение оценки "
                   f"с {request['old_grade']} на {request['new_grade']}")
             return True
@@ -116,19 +656,616 @@ class DepartmentHeadHandler(Grade_Change_Chain):
             return super().handle_request(request)
 
 class DeanHandler(Grade_Change_Chain):
+    level = 'dean'
+
     def handle_request(self, request):
         print(f"Декан одобрил изменение оценки "
               f"с {request['old_grade']} на {request['new_grade']}")
         return True
     
 
+def handle_grade_request(handler, request):
+    """Вход в цепочку: handler.handle_request, при включенных метриках - с замером.
 
-
+    Путь заявки собирается в request['route'] (уровни пройденных звеньев),
+    одобрившим считается последнее звено пути.
+    """
+    metrics = _metrics
+    if metrics is None:
+        return handler.handle_request(request)
+    route = request['route'] = [getattr(handler, 'level', None)]
+    start = time.perf_counter()
+    approved = handler.handle_request(request)
+    elapsed = time.perf_counter() - start
+    level = str(route[-1]) if approved else GradeApprovalEngine.REJECTED
+    for hop in route:
+        metrics.inc('grade_chain_hops_total', (str(hop),))
+    metrics.inc('grade_chain_approvals_total', (level,))
+    metrics.observe('grade_chain_seconds', (level,), elapsed)
+    return approved
     
+
+class GradeChange(NamedTuple):
+    """Заявка на изменение оценки для пакетной обработки"""
+    student: object
+    course: str
+    old_grade: Optional[int]
+    new_grade: int
+
+
+class GradeApprovalEngine:
+    """Цепочка обработчиков, скомпилированная в таблицу порогов.
+
+    Звено i одобряет заявку, если |new - old| <= threshold_i и ни одно
+    звено раньше ее не одобрило. По префиксному максимуму порогов это
+    первое звено, у которого максимум не меньше разницы, поэтому уровень
+    для всего пакета находится одним двоичным поиском (numpy.searchsorted,
+    если numpy установлен). Одобренные изменения записываются в хранилище
+    оценок пакетно, без печати на каждом шаге.
+    """
+
+    REJECTED = 'rejected'
+    NOT_FOUND = 'not_found'
+
+    def __init__(self, chain: Grade_Change_Chain):
+        self.levels: List[str] = []
+        self.thresholds: List[float] = []
+        handler, seen = chain, set()
+        while handler is not None and id(handler) not in seen:
+            seen.add(id(handler))
+            threshold = handler.threshold if handler.threshold is not None else float('inf')
+            self.levels.append(handler.level)
+            self.thresholds.append(threshold)
+            if threshold == float('inf'):
+                break
+            handler = handler._next
+        # префиксный максимум: неубывающая таблица для двоичного поиска
+        self._table = []
+        for threshold in self.thresholds:
+            self._table.append(max(threshold, self._table[-1]) if self._table else threshold)
+
+    def approval_levels(self, diffs) -> List[int]:
+        """Номер одобрившего звена для каждой разницы (len(levels) - отклонено)"""
+        if np is not None:
+            return np.searchsorted(np.asarray(self._table), np.abs(np.asarray(diffs, dtype=float)),
+                                   side='left').tolist()
+        table = self._table
+        return [bisect_left(table, abs(diff)) for diff in diffs]
+
+    def evaluate(self, requests) -> Dict[str, List[GradeChange]]:
+        """Распределяет заявки (student, course, new_grade) по одобрившим уровням"""
+        groups: Dict[str, List[GradeChange]] = {level: [] for level in self.levels}
+        groups[self.REJECTED] = []
+        groups[self.NOT_FOUND] = []
+        changes, diffs = [], []
+        for student, course, new_grade in requests:
+            old_grade = student.get_grade(course)
+            if old_grade is None:
+                groups[self.NOT_FOUND].append(GradeChange(student, course, None, new_grade))
+                continue
+            changes.append(GradeChange(student, course, old_grade, new_grade))
+            diffs.append(new_grade - old_grade)
+        for change, level in zip(changes, self.approval_levels(diffs)):
+            groups[self.levels[level] if level < len(self.levels) else self.REJECTED].append(change)
+        return groups
+
+    def process(self, requests) -> Dict[str, List[GradeChange]]:
+        """evaluate() и пакетная запись всех одобренных изменений"""
+        groups = self.evaluate(requests)
+        approved = [change for level in self.levels for change in groups[level]]
+        Student.set_grades_many((change.student, change.course, change.new_grade) for change in approved)
+        metrics = _metrics
+        if metrics is not None:
+            self._record_metrics(metrics, groups)
+        return groups
+
+    def _record_metrics(self, metrics: "MetricsRegistry", groups):
+        """Счетчики пакета как при поштучном проходе по цепочке"""
+        # до звена i доходят заявки, одобренные на нем и дальше, и отклоненные
+        reached = len(groups[self.REJECTED])
+        if reached:
+            metrics.inc('grade_chain_approvals_total', (self.REJECTED,), reached)
+        for level in reversed(self.levels):
+            approved = len(groups[level])
+            reached += approved
+            if approved:
+                metrics.inc('grade_chain_approvals_total', (level,), approved)
+            if reached:
+                metrics.inc('grade_chain_hops_total', (level,), reached)
+
+
+class ApprovalOutcome(NamedTuple):
+    """Итог асинхронного согласования изменения оценки"""
+    approved: bool
+    level: Optional[str]
+    reason: Optional[str] = None
+
+
+async def _approve_immediately(request) -> bool:
+    return True
+
+
+class SimulatedApprover:
+    """Локальный имитатор согласующего (человек или внешняя система).
+
+    Отвечает через latency + случайная добавка до jitter секунд и одобряет
+    заявку с вероятностью approve_rate. Считает вызовы для замеров.
+    """
+
+    def __init__(self, latency: float = 0.01, jitter: float = 0.0,
+                 approve_rate: float = 1.0, seed: Optional[int] = None):
+        self.latency = latency
+        self.jitter = jitter
+        self.approve_rate = approve_rate
+        self.calls = 0
+        self._random = random.Random(seed)
+
+    async def __call__(self, request) -> bool:
+        self.calls += 1
+        await asyncio.sleep(self.latency + self._random.uniform(0, self.jitter))
+        return self._random.random() < self.approve_rate
+
+
+class AsyncGradeApprovalPipeline:
+    """Асинхронная версия цепочки согласования изменений оценок.
+
+    Каждое звено цепочки - стадия со своей ограниченной очередью,
+    несколькими воркерами (concurrency) и таймаутом на ответ согласующего.
+    Заявка, которую стадия не может одобрить по порогу, переходит в
+    очередь следующей стадии; заполненная очередь приостанавливает
+    отправителя (backpressure). approvers - словарь уровень ->
+    async-функция(request) -> bool; по умолчанию звено одобряет сразу.
+
+        async with AsyncGradeApprovalPipeline(chain, approvers) as pipeline:
+            outcome = await student.change_grade_async("Математика", 5, teacher, pipeline)
+    """
+
+    def __init__(self, chain: Grade_Change_Chain, approvers: Optional[Dict[str, object]] = None,
+                 concurrency=4, queue_size: int = 100, timeout: Optional[float] = None):
+        engine = GradeApprovalEngine(chain)
+        approvers = approvers or {}
+        self.levels = engine.levels
+        self._thresholds = engine.thresholds
+        self._approvers = [approvers.get(level, _approve_immediately) for level in self.levels]
+        self._concurrency = [concurrency.get(level, 1) if isinstance(concurrency, dict) else concurrency
+                             for level in self.levels]
+        self.queue_size = queue_size
+        self.timeout = timeout
+        self._queues: List[asyncio.Queue] = []
+        self._workers: List[asyncio.Task] = []
+
+    async def start(self):
+        self._queues = [asyncio.Queue(maxsize=self.queue_size) for _ in self.levels]
+        self._workers = [asyncio.create_task(self._worker(index))
+                         for index, count in enumerate(self._concurrency) for _ in range(count)]
+
+    async def stop(self):
+        """Дожидается обработки всех заявок и останавливает воркеры"""
+        for queue_ in self._queues:
+            await queue_.join()
+        for worker in self._workers:
+            worker.cancel()
+        await asyncio.gather(*self._workers, return_exceptions=True)
+        self._workers = []
+
+    async def __aenter__(self):
+        await self.start()
+        return self
+
+    async def __aexit__(self, *exc):
+        await self.stop()
+
+    async def submit(self, student, course_name: str, new_grade: int, teacher=None) -> asyncio.Future:
+        """Ставит заявку в очередь первой стадии и возвращает future с ApprovalOutcome.
+
+        До start() и после stop() заявку некому обработать: RuntimeError.
+        """
+        if not self._workers:
+            raise RuntimeError("Конвейер согласования не запущен: вызовите start() или используйте async with")
+        old_grade = student.get_grade(course_name)
+        if old_grade is None:
+            raise CourseNotFoundError(course_name)
+        request = {
+            'student': student,
+            'course': course_name,
+            'old_grade': old_grade,
+            'new_grade': new_grade,
+            'teacher': teacher
+        }
+        future = asyncio.get_running_loop().create_future()
+        await self._queues[0].put((request, future))
+        return future
+
+    async def change_grade(self, student, course_name: str, new_grade: int, teacher=None) -> ApprovalOutcome:
+        """Согласует изменение и при одобрении записывает новую оценку"""
+        outcome = await (await self.submit(student, course_name, new_grade, teacher))
+        if outcome.approved:
+            type(student).set_grades_many([(student, course_name, new_grade)])
+        return outcome
+
+    async def _worker(self, index: int):
+        queue_ = self._queues[index]
+        level, threshold, approver = self.levels[index], self._thresholds[index], self._approvers[index]
+        while True:
+            request, future = await queue_.get()
+            try:
+                if abs(request['new_grade'] - request['old_grade']) <= threshold:
+                    try:
+                        approved = await asyncio.wait_for(approver(request), self.timeout)
+                    except asyncio.TimeoutError:
+                        outcome = ApprovalOutcome(False, level, 'timeout')
+                    else:
+                        outcome = ApprovalOutcome(bool(approved), level, None if approved else 'denied')
+                elif index + 1 < len(self._queues):
+                    await self._queues[index + 1].put((request, future))
+                    continue
+                else:
+                    outcome = ApprovalOutcome(False, None, 'no_approver')
+                if not future.done():
+                    future.set_result(outcome)
+            except Exception as e:
+                if not future.done():
+                    future.set_exception(e)
+            finally:
+                queue_.task_done()
+
+
+#Колоночное хранилище оценок
+
+class GradeStore:
+    """Колоночное хранилище оценок: матрица студенты × курсы.
+
+    Каждый курс получает целочисленный id (интернирование названий) и
+    колонку array('h'), где индекс - номер строки студента. Отсутствующая
+    оценка хранится как MISSING. Колонки растут лениво, поэтому колонка
+    может быть короче числа строк. Агрегаты по курсам и студентам
+    считаются по колонкам целиком (через numpy, если он установлен).
+    """
+
+    MISSING = -32768
+
+    def __init__(self):
+        self._course_ids: Dict[str, int] = {}
+        self._course_names: List[str] = []
+        self._columns: List[array] = []
+        self._row_keys: list = []
+        # ключ -> строка его текущего владельца; _live[row] == 0 у строк,
+        # которые вытеснены повторной загрузкой или освобождены
+        self._rows: Dict[object, int] = {}
+        self._live = bytearray()
+        self._free: List[int] = []
+        # строки, освобожденные финализаторами (release_row_later): забираются
+        # под блокировкой при следующем обращении к хранилищу
+        self._pending_free: deque = deque()
+        self._lock = threading.Lock()
+
+    #строки и курсы
+    def add_row(self, key) -> int:
+        """Регистрирует студента (по identity_key) и возвращает номер строки"""
+        return self.add_rows((key,))[0]
+
+    def add_rows(self, keys) -> List[int]:
+        """Регистрирует пачку студентов, возвращает номера их строк.
+
+        Каждый вызов выделяет новые строки. Если у ключа уже есть строка
+        (тот же студент загружен повторно), ключ переходит к новой строке,
+        а старая выпадает из агрегатов и освобождается вместе со своим
+        объектом (release_row).
+        """
+        keys = keys if isinstance(keys, list) else list(keys)
+        with self._lock:
+            self._reclaim_locked()
+            first = len(self._row_keys)
+            if not self._free and self._rows.keys().isdisjoint(keys):
+                # частый случай - загрузка новых студентов: строки подряд
+                rows = range(first, first + len(keys))
+                known = len(self._rows)
+                self._row_keys.extend(keys)
+                self._live.extend(repeat(1, len(keys)))
+                self._rows.update(zip(keys, rows))
+                if len(self._rows) - known == len(keys):
+                    return list(rows)
+                # повторы внутри пачки: живой остается последняя строка ключа
+                for key, row in zip(keys, rows):
+                    if self._rows[key] != row:
+                        self._live[row] = 0
+                return list(rows)
+            rows = []
+            for key in keys:
+                old = self._rows.get(key)
+                if old is not None:
+                    self._live[old] = 0
+                if self._free:
+                    row = self._free.pop()
+                    self._row_keys[row] = key
+                    self._live[row] = 1
+                else:
+                    row = len(self._row_keys)
+                    self._row_keys.append(key)
+                    self._live.append(1)
+                self._rows[key] = row
+                rows.append(row)
+            return rows
+
+    def release_row(self, row: int, course_names=()):
+        """Освобождает строку удаленного студента для повторного использования.
+
+        course_names - курсы студента: оценки хранятся только по ним,
+        поэтому стирать остальные колонки не нужно.
+        """
+        with self._lock:
+            self._reclaim_locked()
+            self._release_locked(row, course_names)
+
+    def release_row_later(self, row: int, course_names=()):
+        """Освобождение строки из финализатора (Student.__del__).
+
+        Блокировку не берет: сборщик мусора может вызвать финализатор в
+        потоке, который уже держит ее внутри add_rows. Строка ставится в
+        очередь и освобождается при следующем обращении к хранилищу.
+        """
+        self._pending_free.append((row, course_names))
+
+    def _reclaim(self):
+        if self._pending_free:
+            with self._lock:
+                self._reclaim_locked()
+
+    def _reclaim_locked(self):
+        pending = self._pending_free
+        while pending:
+            self._release_locked(*pending.popleft())
+
+    def _release_locked(self, row: int, course_names):
+        for course_name in course_names:
+            course_id = self._course_ids.get(course_name)
+            if course_id is not None:
+                column = self._columns[course_id]
+                if row < len(column):
+                    column[row] = self.MISSING
+        key = self._row_keys[row]
+        if self._rows.get(key) == row:
+            del self._rows[key]
+        self._row_keys[row] = None
+        self._live[row] = 0
+        self._free.append(row)
+
+    def row_key(self, row: int):
+        return self._row_keys[row]
+
+    def row_of(self, key) -> Optional[int]:
+        """Текущая строка студента с ключом key или None"""
+        self._reclaim()
+        return self._rows.get(key)
+
+    def __len__(self) -> int:
+        """Число студентов, чьи оценки входят в агрегаты"""
+        self._reclaim()
+        return len(self._rows)
+
+    def course_id(self, course_name: str, create: bool = False) -> Optional[int]:
+        """Целочисленный id курса; с create=True заводит новую колонку"""
+        course_id = self._course_ids.get(course_name)
+        if course_id is None and create:
+            course_id = self._course_ids[course_name] = len(self._course_names)
+            self._course_names.append(course_name)
+            self._columns.append(array('h'))
+        return course_id
+
+    def course_names(self) -> List[str]:
+        return list(self._course_names)
+
+    #запись и чтение
+    def set(self, row: int, course_name: str, grade: int):
+        self._put(self._columns[self.course_id(course_name, create=True)], row, grade)
+
+    def set_many(self, rows, course_names, grades):
+        """Пакетная запись: три параллельные последовательности"""
+        grades = grades if isinstance(grades, list) else list(grades)
+        if grades and not (self.MISSING < min(grades) and max(grades) <= 32767):
+            bad = next(grade for grade in grades if not self.MISSING < grade <= 32767)
+            raise ValueError(f"Оценка {bad} вне диапазона хранилища")
+        column_of = {}
+        for row, course_name, grade in zip(rows, course_names, grades):
+            column = column_of.get(course_name)
+            if column is None:
+                column = column_of[course_name] = self._columns[self.course_id(course_name, create=True)]
+            size = len(column)
+            if row < size:
+                column[row] = grade
+            else:
+                # строки обычно идут подряд: дописываем в конец колонки
+                if row > size:
+                    column.extend(repeat(self.MISSING, row - size))
+                column.append(grade)
+
+    def _put(self, column: array, row: int, grade: int):
+        if not self.MISSING < grade <= 32767:
+            raise ValueError(f"Оценка {grade} вне диапазона хранилища")
+        if row >= len(column):
+            column.extend(repeat(self.MISSING, row + 1 - len(column)))
+        column[row] = grade
+
+    def get(self, row: int, course_name: str, default=None):
+        course_id = self._course_ids.get(course_name)
+        if course_id is None:
+            return default
+        column = self._columns[course_id]
+        if row >= len(column) or column[row] == self.MISSING:
+            return default
+        return column[row]
+
+    def row_grades(self, row: int, course_names) -> Dict[str, int]:
+        """Оценки строки по заданным курсам (курсы без оценки пропускаются)"""
+        grades = {}
+        for course_name in course_names:
+            grade = self.get(row, course_name)
+            if grade is not None:
+                grades[course_name] = grade
+        return grades
+
+    #агрегаты
+    def course_grades(self, course_name: str):
+        """Все оценки курса (numpy-массив или список)"""
+        course_id = self._course_ids.get(course_name)
+        if course_id is None:
+            raise CourseNotFoundError(course_name)
+        self._reclaim()
+        column = self._columns[course_id]
+        stale = self._live.find(0, 0, len(column)) >= 0
+        if np is not None:
+            values = np.frombuffer(column, dtype=np.int16).copy() if column else np.empty(0, np.int16)
+            present = values != self.MISSING
+            if stale:
+                present &= self._live_mask(len(values))
+            return values[present]
+        if stale:
+            return [grade for grade, live in zip(column, self._live) if live and grade != self.MISSING]
+        return [grade for grade in column if grade != self.MISSING]
+
+    def _live_mask(self, size: int):
+        return np.frombuffer(bytes(self._live[:size]), dtype=np.bool_)
+
+    def course_mean(self, course_name: str) -> Optional[float]:
+        values = self.course_grades(course_name)
+        if len(values) == 0:
+            return None
+        return float(values.mean()) if np is not None else fmean(values)
+
+    def course_median(self, course_name: str) -> Optional[float]:
+        values = self.course_grades(course_name)
+        if len(values) == 0:
+            return None
+        return float(np.median(values)) if np is not None else float(median(values))
+
+    def course_histogram(self, course_name: str) -> Dict[int, int]:
+        """Распределение оценок курса: оценка -> количество"""
+        values = self.course_grades(course_name)
+        if np is not None:
+            grades, counts = np.unique(values, return_counts=True)
+            return dict(zip(grades.tolist(), counts.tolist()))
+        return dict(sorted(Counter(values).items()))
+
+    def _sums_and_counts(self):
+        self._reclaim()
+        rows = len(self._row_keys)
+        if np is not None:
+            sums = np.zeros(rows, dtype=np.int64)
+            counts = np.zeros(rows, dtype=np.int64)
+            for column in self._columns:
+                if not column:
+                    continue
+                values = np.frombuffer(column, dtype=np.int16).copy()
+                present = values != self.MISSING
+                sums[:len(values)] += np.where(present, values, 0)
+                counts[:len(values)] += present
+            if self._live.find(0) >= 0:
+                counts[~self._live_mask(rows)] = 0
+            return sums, counts
+        sums = [0] * rows
+        counts = [0] * rows
+        for column in self._columns:
+            for row, grade in enumerate(column):
+                if grade != self.MISSING:
+                    sums[row] += grade
+                    counts[row] += 1
+        for row in compress(range(rows), map((0).__eq__, self._live)):
+            counts[row] = 0
+        return sums, counts
+
+    def gpa(self, row: int) -> Optional[float]:
+        """Средний балл одной строки по всем курсам"""
+        grades = [column[row] for column in self._columns
+                  if row < len(column) and column[row] != self.MISSING]
+        return fmean(grades) if grades else None
+
+    def gpa_all(self) -> Dict[object, float]:
+        """Средний балл всех студентов, у которых есть оценки: key -> GPA"""
+        sums, counts = self._sums_and_counts()
+        if np is not None:
+            rows = np.nonzero(counts)[0]
+            values = (sums[rows] / counts[rows]).tolist()
+            return {self._row_keys[row]: gpa for row, gpa in zip(rows.tolist(), values)}
+        return {self._row_keys[row]: sums[row] / counts[row]
+                for row in range(len(counts)) if counts[row]}
+
+    def top_k(self, k: int) -> List[tuple]:
+        """k лучших студентов по GPA: список пар (key, GPA) по убыванию"""
+        sums, counts = self._sums_and_counts()
+        if np is not None:
+            rows = np.nonzero(counts)[0]
+            gpas = sums[rows] / counts[rows]
+            if k < len(rows):
+                best = np.argpartition(-gpas, k)[:k]
+            else:
+                best = np.arange(len(rows))
+            best = best[np.argsort(-gpas[best], kind='stable')]
+            return [(self._row_keys[row], gpa) for row, gpa in zip(rows[best].tolist(), gpas[best].tolist())]
+        gpas = ((sums[row] / counts[row], row) for row in range(len(counts)) if counts[row])
+        return [(self._row_keys[row], gpa) for gpa, row in nlargest(k, gpas, key=lambda item: item[0])]
+
+
+# Хранилище для студентов, которые получают первую оценку внутри
+# grade_store_scope; вне блока - общее Student.grade_store
+_active_grade_store: Optional[GradeStore] = None
+
+
+@contextmanager
+def grade_store_scope(store: Optional[GradeStore]):
+    """Оценки студентов, созданных или загруженных в блоке, попадают в store.
+
+    Студент запоминает свое хранилище, поэтому после выхода из блока его
+    оценки по-прежнему читаются и пишутся в store. None - хранилище не меняется.
+    """
+    global _active_grade_store
+    previous = _active_grade_store
+    if store is not None:
+        _active_grade_store = store
+    try:
+        yield store
+    finally:
+        _active_grade_store = previous
+
+
+#Пакетная загрузка объектов по колонкам
+
+def _column_values(values) -> list:
+    tolist = getattr(values, 'tolist', None)
+    return tolist() if tolist is not None else list(values)
+
+
+@contextmanager
+def _gc_paused():
+    """Без сборщика циклов на время пакетной загрузки: новые объекты циклов не образуют"""
+    enabled = gc.isenabled()
+    gc.disable()
+    try:
+        yield
+    finally:
+        if enabled:
+            gc.enable()
+
+
+def _fill_slot(owner: type, slot: str, objects, values):
+    """Записывает колонку values в слот slot объектов (цикл выполняется в C)"""
+    deque(map(owner.__dict__[slot].__set__, objects, values), maxlen=0)
+
+
 #Создание абстрактного класса
 class Person(ABC, metaclass=PersonMeta):
 
      #"""Базовый класс для всех участников учебного процесса."""
+
+    # Без __dict__ у экземпляров: атрибуты хранятся в слотах
+    __slots__ = ('__person_id', '__name', '__age', '__email')
+
+    # Схема полей: PersonMeta собирает из нее валидаторы класса
+    fields = {
+        'person_id': Field(int, "ID должен быть целым числом"),
+        'name': Field(str, "Имя должно быть строкой"),
+        'age': Field(int, "Возраст должен быть положительным целым числом", min=1),
+        'email': Field(str, "Почта должна быть строкой с символом @", contains="@"),
+    }
     
     def __init__(self, person_id: int, name: str, age: int, email: str):
         """Инициализация человека.
@@ -143,29 +1280,59 @@ class Person(ABC, metaclass=PersonMeta):
         self.__name = name
         self.__age = age
         self.__email = email
-        logging.info(f"Создан человек: {name}")
+        if _construction_logging and logger.isEnabledFor(logging.INFO):
+            logger.info("Создан человек: %s", name)
     #Сеттеры 
     def set_name(self, new_name):
-        if not isinstance(new_name, str):
-            raise InvalidPersonError("name", "Имя должно быть строкой")
+        self._require("name", new_name)
         self.__name = new_name
+        if _change_listeners:
+            _emit_change(self, 'set_name', new_name)
         
     def set_age(self, new_age):
-        if not isinstance(new_age, int) or new_age <= 0:
-            raise InvalidPersonError("age", "Возраст должен быть положительным целым числом")
+        self._require("age", new_age)
         self.__age = new_age
+        if _change_listeners:
+            _emit_change(self, 'set_age', new_age)
 
     def set_email(self, new_mail):
-        if not isinstance(new_mail, str) or "@" not in new_mail:
-            raise InvalidPersonError("email", "Почта должна быть строкой с символом @")
+        self._require("email", new_mail)
         self.__email = new_mail
+        if _change_listeners:
+            _emit_change(self, 'set_email', new_mail)
 
-    #геттеры
-    def get_id(self):
-        return self.__person_id
+    @classmethod
+    def _require(cls, field_name: str, value, field: Field = None):
+        """Проверка одного значения по схеме (field - вложенная схема элемента поля)"""
+        field = field or cls.schema[field_name]
+        if not field.check(value):
+            error = InvalidPersonError if field.type_ok(value) else InvalidPersonTypeError
+            raise error(field_name, cls.schema[field_name].message)
 
-    def get_name(self):
-        return self.__name
+    @classmethod
+    def validate(cls, data: Dict):
+        """Проверяет словарь формата to_dict, выбрасывает InvalidPersonError"""
+        for name, field in cls.schema.items():
+            if field.default is None and name not in data:
+                raise InvalidPersonError(name, MISSING_FIELD_MESSAGE)
+        cls._validate_record(*(data.get(name, field.default) for name, field in cls.schema.items()))
+
+    @classmethod
+    def validate_many(cls, data):
+        """Проверяет пакет словарей целиком.
+
+        Если пакет корректен, проверка идет по колонкам; иначе собираются
+        все ошибки всех записей в одно InvalidPersonError (атрибут errors).
+        """
+        data = data if isinstance(data, list) else list(data)
+        cls._validate_columns(cls._dict_columns(data))
+
+    #геттеры
+    def get_id(self):
+        return self.__person_id
+
+    def get_name(self):
+        return self.__name
 
     def get_age(self):
         return self.__age
@@ -178,7 +1345,7 @@ class Person(ABC, metaclass=PersonMeta):
         pass
 
     def __str__(self)->str:
-        result = f"Человек: {self._name}, Возраст: {self._age}"
+        result = f"Человек: {self.__name}, Возраст: {self.__age}"
         return result
     
 
@@ -187,6 +1354,14 @@ class Person(ABC, metaclass=PersonMeta):
         if not isinstance(other, Person):
             return False
         return self.__person_id == other.get_id() and self.__email == other.get_email()
+
+    def __hash__(self) -> int:
+        """Хеш по стабильному идентификатору (согласован с __eq__)"""
+        return hash(self.identity_key())
+
+    def identity_key(self):
+        """Стабильный ключ объекта для индексов и словарей"""
+        return self.__person_id
     
     def __lt__(self, other) -> bool:
         """Сравнение по возрасту (меньше значит младше)"""
@@ -221,11 +1396,108 @@ class Person(ABC, metaclass=PersonMeta):
             age=data['age'],
             email=data['email']
         )
+
+    @classmethod
+    def from_dict_many(cls, data) -> list:
+        """Пакетная загрузка из словарей формата to_dict (см. from_columns)"""
+        data = data if isinstance(data, list) else list(data)
+        return cls._from_column_tuple(cls._dict_columns(data))
+
+    @classmethod
+    def _dict_columns(cls, data: list) -> tuple:
+        """Колонки полей схемы из списка словарей; для полей с default ключ необязателен.
+
+        Отсутствующее обязательное поле дает значение _MISSING_FIELD: оно не
+        проходит проверку колонки и попадает в ошибки как "нет поля".
+        """
+        return tuple(list(map(methodcaller('get', name, _MISSING_FIELD if field.default is None else field.default),
+                              data))
+                     for name, field in cls.schema.items())
+
+    @classmethod
+    def from_records(cls, records) -> list:
+        """Пакетная загрузка из кортежей в порядке полей схемы (см. from_columns)"""
+        records = records if isinstance(records, list) else list(records)
+        width = len(cls._record_fields)
+        if any(len(record) != width for record in records):
+            index = next(i for i, record in enumerate(records) if len(record) != width)
+            raise InvalidPersonError("record", f"Запись {index}: ожидалось полей {width}, получено {len(records[index])}")
+        columns = tuple(map(list, zip(*records))) if records else tuple([] for _ in range(width))
+        return cls._from_column_tuple(columns)
+
+    @classmethod
+    def from_columns(cls, columns: Dict) -> list:
+        """Доверенная пакетная загрузка из колонок: имя поля -> последовательность значений.
+
+        Весь пакет проверяется по схеме до создания первого объекта; при
+        ошибках InvalidPersonError.errors содержит их все. Конструктор,
+        сеттеры и их поштучные проверки не вызываются: слоты и контейнеры
+        заполняются напрямую, по колонкам. Слушатели изменений получают
+        'created' для каждого объекта, как при обычном создании.
+        """
+        missing = [name for name, field in cls.schema.items() if name not in columns and field.default is None]
+        if missing:
+            raise InvalidPersonError(missing[0], "Нет колонки в пакете")
+        size = len(columns[cls._record_fields[0]])
+        # array.array и массивы numpy отдают значения как объекты Python через tolist()
+        columns = tuple(_column_values(columns[name]) if name in columns else [field.default] * size
+                        for name, field in cls.schema.items())
+        if len(set(map(len, columns))) > 1:
+            raise InvalidPersonError("record", "Колонки пакета разной длины")
+        return cls._from_column_tuple(columns)
+
+    @classmethod
+    def _from_column_tuple(cls, columns: tuple) -> list:
+        cls._validate_columns(columns)
+        with _gc_paused():
+            people = cls._build_columns(columns)
+        if _change_listeners:
+            for person in people:
+                _emit_change(person, 'created')
+        if _construction_logging and logger.isEnabledFor(logging.INFO):
+            logger.info("Загружено объектов %s: %d", cls.__name__, len(people))
+        return people
+
+    @classmethod
+    def _validate_columns(cls, columns: tuple):
+        if all(field.column_ok(column) for field, column in zip(cls.schema.values(), columns)):
+            return
+        errors = []
+        collect = cls._collect_errors
+        for index, values in enumerate(zip(*columns)):
+            collect(errors, index, *values)
+        raise InvalidPersonError.from_errors(errors)
+
+    @classmethod
+    def _build_columns(cls, columns: tuple) -> list:
+        people = list(map(cls.__new__, repeat(cls, len(columns[0]))))
+        for slot, values in zip(('_Person__person_id', '_Person__name', '_Person__age', '_Person__email'), columns):
+            _fill_slot(Person, slot, people, values)
+        return people
    
 #/////////////////////////////////////////////////////////////////////////////////////////
 #Наследование (задание 2)
+
+# Защищает ленивое создание контейнеров при параллельной записи на курсы
+_lazy_init_lock = threading.Lock()
+
 class Student(Person):
     #"""Класс студента, наследуется от Person."""
+
+    # Оценки хранятся в колоночном хранилище, у студента - только само
+    # хранилище и номер строки в нем; список курсов создается при первой записи
+    __slots__ = ('__student_id', '__courses', '__grade_row', '__grade_store')
+
+    fields = {
+        'student_id': Field(int, "ID студента должен быть целым числом"),
+        'courses': Field((list, tuple), "Курсы должны быть списком строк", items=Field(str),
+                         init=False, default=()),
+        'grades': Field(dict, "Оценка должна быть целым числом от 1 до 5, курс - строкой",
+                        items=Field(str), values=Field(int, min=1, max=5), init=False, default={}),
+    }
+
+    # Хранилище по умолчанию; отдельное для загрузки - через grade_store_scope
+    grade_store = GradeStore()
     
     def __init__(self, person_id: int, name: str, age: int, email: str, student_id: int):
         """Инициализация студента.
@@ -239,37 +1511,88 @@ class Student(Person):
         """
         super().__init__(person_id, name, age, email)
         self.__student_id = student_id
-        self.__courses = []
-        self.__grades = {}
-        logging.info(f"Создан студент: {name}, ID: {student_id}")
-    def set_courses(self, new_courses):#?
-        for i in range(len(new_courses)-1):
-            if not isinstance(new_courses[i], str):
-             raise TypeError("Переданное значение не являетс строкой")
-            else:
-             self.__courses.append(new_courses[i])
+        self.__courses = None
+        self.__grade_row = -1
+        self.__grade_store = None
+        if _construction_logging and logger.isEnabledFor(logging.INFO):
+            logger.info("Создан студент: %s, ID: %s", name, student_id)
+    def set_courses(self, new_courses):
+        """Добавляет курсы к списку студента (уже записанные курсы пропускаются)"""
+        item = self.schema['courses'].items
+        for course_name in new_courses:
+            self._require('courses', course_name, item)
+        added = [course_name for course_name in dict.fromkeys(new_courses)
+                 if course_name not in self.get_courses()]
+        for course_name in added:
+            self._add_course(course_name)
+        if _change_listeners and added:
+            _emit_change(self, 'set_courses', added)
 
 
 
     def set_grade(self,new_grades,course_name ):
-        if not isinstance(new_grades, int ) or (new_grades <=0 and new_grades>5):
-            raise ValueError("Передали не подходящий вид оценки")
-        else:
-            if course_name not in self.__courses:
-                self.__courses.append(course_name)
-            self.__grades[course_name]=new_grades
+        grades = self.schema['grades']
+        self._require('grades', course_name, grades.items)
+        self._require('grades', new_grades, grades.values)
+        if self.__courses is None or course_name not in self.__courses:
+            self._add_course(course_name)
+        if self.__grade_row < 0:
+            store = self.grade_store if _active_grade_store is None else _active_grade_store
+            self.__grade_store = store
+            self.__grade_row = store.add_row(self.identity_key())
+        self.__grade_store.set(self.__grade_row, course_name, new_grades)
+        if _change_listeners:
+            _emit_change(self, 'set_grade', new_grades, course_name)
     
+    def _add_course(self, course_name):
+        if self.__courses is None:
+            # курсы одного студента могут записывать из разных потоков
+            with _lazy_init_lock:
+                if self.__courses is None:
+                    self.__courses = []
+        self.__courses.append(course_name)
+
     def get_st_id(self):
         return self.__student_id
     
     def get_courses(self):
-        return self.__courses
+        return self.__courses if self.__courses is not None else []
     
     def get_grades(self):
-        return self.__grades
+        if self.__grade_row < 0:
+            return {}
+        return self.__grade_store.row_grades(self.__grade_row, self.__courses)
+
+    def get_grade(self, course_name, default=None):
+        if self.__grade_row < 0:
+            return default
+        return self.__grade_store.get(self.__grade_row, course_name, default)
+
+    def get_grade_store(self) -> Optional[GradeStore]:
+        """Хранилище с оценками студента (None, пока оценок нет)"""
+        return self.__grade_store
+
+    def release_grades(self):
+        """Стирает оценки студента и освобождает его строку в хранилище"""
+        row, store = self.__grade_row, self.__grade_store
+        if row >= 0:
+            self.__grade_row = -1
+            self.__grade_store = None
+            store.release_row(row, self.get_courses())
+
+    def __del__(self):
+        # удаленный студент не должен оставлять оценки в агрегатах хранилища;
+        # блокировку хранилища здесь брать нельзя (см. release_row_later)
+        try:
+            row, store = self.__grade_row, self.__grade_store
+            if row >= 0:
+                store.release_row_later(row, self.get_courses())
+        except AttributeError:
+            # объект удален до заполнения слотов (ошибка пакетной загрузки)
+            pass
 
     def __str__(self):
-        return f" Студент {self.__name}, Курсы {self.__courses}"
+        return f" Студент {self.get_name()}, Курсы {self.get_courses()}"
 
     
     def get_role(self):
@@ -280,37 +1603,78 @@ class Student(Person):
         if not isinstance(other, Student):
             return False
         return super().__eq__(other) and self.__student_id == other.get_st_id()
+
+    __hash__ = Person.__hash__
+
+    def identity_key(self):
+        """Ключ студента: пара (person_id, student_id)"""
+        return (self.get_id(), self.__student_id)
     
     def __lt__(self, other) -> bool:
         """Сравнение студентов по количеству курсов"""
         if not isinstance(other, Student):
             raise TypeError("Можно сравнивать только объекты Student")
-        return len(self.__courses) < len(other.get_courses())
+        return len(self.get_courses()) < len(other.get_courses())
     
     def __gt__(self, other) -> bool:
         """Сравнение студентов по количеству курсов"""
         if not isinstance(other, Student):
             raise TypeError("Можно сравнивать только объекты Student")
-        return len(self.__courses) > len(other.get_courses())
+        return len(self.get_courses()) > len(other.get_courses())
     
     def change_grade(self, course_name, new_grade, teacher, handler):
-        if course_name not in self.__grades:
+        old_grade = self.get_grade(course_name)
+        if old_grade is None:
             raise CourseNotFoundError(course_name)
         
         request = {
             'student': self,
             'course': course_name,
-            'old_grade': self.__grades[course_name],
+            'old_grade': old_grade,
             'new_grade': new_grade,
             'teacher': teacher
         }
         
-        if handler.handle_request(request):
-            self.__grades[course_name] = new_grade
+        if handle_grade_request(handler, request):
+            self.__grade_store.set(self.__grade_row, course_name, new_grade)
+            if _change_listeners:
+                _emit_change(self, 'set_grade', new_grade, course_name)
             print(f"Оценка успешно изменена на {new_grade}")
         else:
             print("Изменение оценки не было одобрено")
 
+    async def change_grade_async(self, course_name, new_grade, teacher, pipeline) -> "ApprovalOutcome":
+        """Изменение оценки через AsyncGradeApprovalPipeline (без блокировки на согласовании)"""
+        return await pipeline.change_grade(self, course_name, new_grade, teacher)
+
+    @classmethod
+    def set_grades_many(cls, changes) -> int:
+        """Пакетная запись оценок: changes - тройки (student, course_name, grade)"""
+        course_names, grades, students = [], [], []
+        # строки группируются по хранилищам студентов
+        batches: Dict[GradeStore, tuple] = {}
+        grade_field = cls.schema['grades'].values
+        for student, course_name, grade in changes:
+            cls._require('grades', grade, grade_field)
+            if student.__grade_row < 0 or course_name not in student.get_courses():
+                student.set_grade(grade, course_name)
+                continue
+            batch = batches.get(student.__grade_store)
+            if batch is None:
+                batch = batches[student.__grade_store] = ([], [], [])
+            batch[0].append(student.__grade_row)
+            batch[1].append(course_name)
+            batch[2].append(grade)
+            course_names.append(course_name)
+            grades.append(grade)
+            students.append(student)
+        for store, (rows, batch_courses, batch_grades) in batches.items():
+            store.set_many(rows, batch_courses, batch_grades)
+        if _change_listeners:
+            for student, course_name, grade in zip(students, course_names, grades):
+                _emit_change(student, 'set_grade', grade, course_name)
+        return len(students)
+
 
     def to_dict(self) -> Dict:
         """Преобразует объект Student в словарь"""
@@ -333,17 +1697,54 @@ class Student(Person):
             student_id=data['student_id']
         )
         
-        for course in data['courses']:
-            student.set_courses([course])
+        student.set_courses(data['courses'])
             
         for course, grade in data['grades'].items():
             student.set_grade(grade, course)
             
         return student
+
+    @classmethod
+    def _build_columns(cls, columns: tuple) -> list:
+        students = super()._build_columns(columns)
+        student_ids, courses, grades = columns[4:]
+        _fill_slot(Student, '_Student__student_id', students, student_ids)
+        courses = [own or None for own in map(list, courses)]
+        rows = [-1] * len(students)
+        stores = [None] * len(students)
+        graded = list(compress(range(len(students)), grades))
+        if graded:
+            store = cls.grade_store if _active_grade_store is None else _active_grade_store
+            graded_rows = store.add_rows([students[index].identity_key() for index in graded])
+            graded_grades = [grades[index] for index in graded]
+            for row, index in zip(graded_rows, graded):
+                rows[index] = row
+                stores[index] = store
+                # как set_grade: курс оценки без записи добавляется в конец списка
+                own = courses[index]
+                if own is None:
+                    courses[index] = list(grades[index])
+                elif grades[index].keys() - own:
+                    own.extend(course_name for course_name in grades[index] if course_name not in own)
+            store.set_many(chain.from_iterable(map(repeat, graded_rows, map(len, graded_grades))),
+                           chain.from_iterable(graded_grades),
+                           list(chain.from_iterable(map(dict.values, graded_grades))))
+        _fill_slot(Student, '_Student__courses', students, courses)
+        _fill_slot(Student, '_Student__grade_store', students, stores)
+        _fill_slot(Student, '_Student__grade_row', students, rows)
+        return students
     
 #/////////////////////////////////////////////////////////////////////////////////////////
 class Teacher(Person):
     #"""Класс преподавателя, наследуется от Person."""
+
+    __slots__ = ('__teacher_id', '__subjects')
+
+    fields = {
+        'teacher_id': Field(int, "ID преподавателя должен быть целым числом"),
+        'subjects': Field((list, tuple), "Предметы должны быть списком строк", items=Field(str),
+                          init=False, default=()),
+    }
     
     def __init__(self, person_id: int, name: str, age: int, email: str, teacher_id: int):
         """Инициализация преподавателя.
@@ -358,13 +1759,15 @@ class Teacher(Person):
         super().__init__(person_id, name, age, email)
         self.__teacher_id = teacher_id
         self.__subjects = []
-        logging.info(f"Создан преподаватель: {name}, ID: {teacher_id}")
+        if _construction_logging and logger.isEnabledFor(logging.INFO):
+            logger.info("Создан преподаватель: %s, ID: %s", name, teacher_id)
 
 
     def set_subjects(self, new_sub):
-        if not isinstance(new_sub, str):
-            raise TypeError("Переданное значение не является строкой")
+        self._require('subjects', new_sub, self.schema['subjects'].items)
         self.__subjects.append(new_sub)
+        if _change_listeners:
+            _emit_change(self, 'set_subjects', new_sub)
 
 
     def get_subjects(self):
@@ -378,7 +1781,7 @@ class Teacher(Person):
         return "Преподаватель"
     
     def __str__(self):
-        return f" Преподаватель {self.__name}, Предметы {self.__courses}"
+        return f" Преподаватель {self.get_name()}, Предметы {self.__subjects}"
     
 
     def __eq__(self, other) -> bool:
@@ -386,6 +1789,12 @@ class Teacher(Person):
         if not isinstance(other, Teacher):
             return False
         return super().__eq__(other) and self.__teacher_id == other.get_tch_id()
+
+    __hash__ = Person.__hash__
+
+    def identity_key(self):
+        """Ключ преподавателя: пара (person_id, teacher_id)"""
+        return (self.get_id(), self.__teacher_id)
     
     def __lt__(self, other) -> bool:
         """Сравнение преподавателей по количеству предметов"""
@@ -425,6 +1834,14 @@ class Teacher(Person):
             
         return teacher
 
+    @classmethod
+    def _build_columns(cls, columns: tuple) -> list:
+        teachers = super()._build_columns(columns)
+        teacher_ids, subjects = columns[4:]
+        _fill_slot(Teacher, '_Teacher__teacher_id', teachers, teacher_ids)
+        _fill_slot(Teacher, '_Teacher__subjects', teachers, map(list, subjects))
+        return teachers
+
 #/////////////////////////////////////////////////////////////////////////////////////////
 #Интерфейсы для работы с обр. учреждением (4 задание)
     
@@ -441,34 +1858,781 @@ class Reportable(ABC):
         pass
 
 
+#Приемники лога для LoggingMixin
+
+class LogSink(ABC):
+    """Базовый приемник строк лога"""
+
+    @abstractmethod
+    def write(self, line: str):
+        pass
+
+    def flush(self):
+        pass
+
+    def close(self):
+        self.flush()
+
+
+class FileLogSink(LogSink):
+    """Синхронный приемник: открывает файл и дописывает строку на каждый вызов"""
+
+    def __init__(self, path: str):
+        self.path = path
+        self._lock = threading.Lock()
+
+    def write(self, line: str):
+        with self._lock, open(self.path, "a", encoding="utf-8") as file:
+            file.write(line)
+
+
+class BufferedLogSink(LogSink):
+    """Буферизованный асинхронный приемник лога.
+
+    Строки складываются в ограниченную очередь, фоновый поток пишет их
+    в файл пачками: по достижении flush_size строк или через
+    flush_interval секунд после первой строки в пачке. Файл открывается
+    один раз. Если очередь заполнена, write() ждет освобождения места.
+    """
+
+    _CLOSE = object()
+
+    def __init__(self, path: str, max_buffer: int = 10000,
+                 flush_size: int = 512, flush_interval: float = 1.0):
+        self.path = path
+        self.flush_size = flush_size
+        self.flush_interval = flush_interval
+        self._queue = queue.Queue(maxsize=max_buffer)
+        self._closed = False
+        # _closed меняется и проверяется под этой блокировкой: строка либо
+        # попадает в очередь до _CLOSE, либо пишется напрямую после закрытия
+        self._lock = threading.Lock()
+        self._thread = threading.Thread(target=self._run, name=f"log-sink:{path}", daemon=True)
+        self._thread.start()
+
+    def write(self, line: str):
+        with self._lock:
+            if not self._closed:
+                self._queue.put(line)
+                return
+            # после close() пишем напрямую, чтобы строки не терялись
+            with open(self.path, "a", encoding="utf-8") as file:
+                file.write(line)
+
+    def flush(self):
+        """Дожидается записи всех строк, переданных до вызова"""
+        done = threading.Event()
+        with self._lock:
+            if self._closed:
+                return
+            self._queue.put(done)
+        # событие стоит в очереди раньше _CLOSE, но фоновый поток мог упасть
+        while not done.wait(0.1):
+            if not self._thread.is_alive():
+                return
+
+    def close(self):
+        """Записывает очередь и останавливает поток; дальнейшие строки пишутся напрямую"""
+        with self._lock:
+            if self._closed:
+                return
+            self._closed = True
+            self._queue.put(self._CLOSE)
+            # до конца записи очереди прямые записи ждут, чтобы не нарушить порядок строк
+            self._thread.join()
+
+    def _run(self):
+        with open(self.path, "a", encoding="utf-8") as file:
+            batch = []
+            deadline = None
+            while True:
+                timeout = None if deadline is None else max(deadline - time.monotonic(), 0)
+                try:
+                    item = self._queue.get(timeout=timeout)
+                except queue.Empty:
+                    item = None
+
+                if isinstance(item, str):
+                    if not batch:
+                        deadline = time.monotonic() + self.flush_interval
+                    batch.append(item)
+                    if len(batch) < self.flush_size and time.monotonic() < deadline:
+                        continue
+
+                if batch:
+                    file.write("".join(batch))
+                    file.flush()
+                    batch = []
+                    deadline = None
+                if item is self._CLOSE:
+                    return
+                if isinstance(item, threading.Event):
+                    item.set()
+
+
+# Приемники по имени файла; фабрику можно заменить, например на FileLogSink
+log_sink_factory = BufferedLogSink
+_log_sinks: Dict[str, LogSink] = {}
+_log_sinks_lock = threading.Lock()
+
+
+def get_log_sink(log_file: str) -> LogSink:
+    sink = _log_sinks.get(log_file)
+    if sink is None:
+        with _log_sinks_lock:
+            sink = _log_sinks.get(log_file)
+            if sink is None:
+                sink = _log_sinks[log_file] = log_sink_factory(log_file)
+    return sink
+
+
+def set_log_sink(log_file: str, sink: Optional[LogSink]) -> Optional[LogSink]:
+    """Подключает свой приемник для файла, возвращает предыдущий (не закрывая его).
+
+    sink=None возвращает приемник по умолчанию (он создается при первой записи).
+    """
+    with _log_sinks_lock:
+        previous = _log_sinks.pop(log_file, None)
+        if sink is not None:
+            _log_sinks[log_file] = sink
+    return previous
+
+
+def flush_logs():
+    for sink in list(_log_sinks.values()):
+        sink.flush()
+
+
+def close_log_sinks():
+    with _log_sinks_lock:
+        sinks = list(_log_sinks.values())
+        _log_sinks.clear()
+    for sink in sinks:
+        sink.close()
+
+
+atexit.register(close_log_sinks)
+
+
+_timestamp_cache = (None, "")
+
+
+def _log_timestamp() -> str:
+    """Метка времени лога; форматируется не чаще раза в секунду"""
+    global _timestamp_cache
+    now = int(time.time())
+    second, text = _timestamp_cache
+    if second != now:
+        text = time.strftime("%Y-%m-%d %H:%M:%S", time.localtime(now))
+        _timestamp_cache = (now, text)
+    return text
+
+
 class LoggingMixin:
     def log_action(self, message: str, log_file: str = "info_about_logs.txt"):
-        timestamp = datetime.datetime.now().strftime("%Y-%m-%d %H:%M:%S")
-        full_message = f"[{timestamp}] {message}\n"
-        with open(log_file, "a", encoding="utf-8") as file:
-            file.write(full_message)
+        get_log_sink(log_file).write(f"[{_log_timestamp()}] {message}\n")
 
 
 class NotificationMixin:
-    def send_notification(self, message: str):
-        print(f"[NOTIFICATION] {message}")
+    """Уведомления: без outbox печатаются сразу, с outbox (set_notification_outbox)
+    только ставятся в очередь, а отправляет их NotificationDispatcher"""
+
+    def send_notification(self, message: str, recipient: Optional[str] = None):
+        outbox = _notification_outbox
+        if outbox is not None:
+            outbox.enqueue(recipient, message)
+        else:
+            print(f"[NOTIFICATION] {message}")
+
+    def notify(self, message: str, recipient: Optional[str] = None):
+        self.send_notification(message, recipient)
+
+    def notify_many(self, items):
+        """Пакет уведомлений: пары (получатель, текст)"""
+        outbox = _notification_outbox
+        if outbox is not None:
+            outbox.enqueue_many(items)
+        else:
+            print("[NOTIFICATION] " + "\n".join(f"{recipient}: {message}" for recipient, message in items))
+
+
+#Исходящие уведомления: очередь и асинхронная отправка пачками
+
+class Notification(NamedTuple):
+    recipient: Optional[str]
+    message: str
+
+
+class NotificationOutbox:
+    """Очередь исходящих уведомлений.
+
+    enqueue() только дописывает запись в deque (за O(1) под блокировкой)
+    и сразу возвращается. max_size ограничивает очередь: при переполнении
+    вытесняются самые старые записи. Их число - в dropped и в метрике
+    notifications_total{result="dropped"}; о потерях пишется предупреждение
+    в лог (при первой потере и далее на каждые max_size вытесненных).
+    """
+
+    def __init__(self, max_size: Optional[int] = None):
+        self.max_size = max_size
+        self.dropped = 0
+        self._queue = deque(maxlen=max_size)
+        self._lock = threading.Lock()
+
+    def enqueue(self, recipient: Optional[str], message: str):
+        notification = Notification(recipient, message)
+        with self._lock:
+            dropped = int(self.max_size is not None and len(self._queue) >= self.max_size)
+            self._queue.append(notification)
+            self.dropped += dropped
+            total = self.dropped
+        if dropped:
+            self._report_dropped(dropped, total)
+
+    def enqueue_many(self, items):
+        items = [Notification(recipient, message) for recipient, message in items]
+        with self._lock:
+            dropped = 0
+            if self.max_size is not None:
+                dropped = max(0, len(self._queue) + len(items) - self.max_size)
+            self._queue.extend(items)
+            self.dropped += dropped
+            total = self.dropped
+        if dropped:
+            self._report_dropped(dropped, total)
+
+    def _report_dropped(self, count: int, total: int):
+        metrics = _metrics
+        if metrics is not None:
+            metrics.inc('notifications_total', ('dropped',), count)
+        step = max(self.max_size, 1)
+        if total == count or (total - count) // step != total // step:
+            logger.warning("Очередь уведомлений переполнена (max_size=%d): вытеснено %d, всего %d",
+                           self.max_size, count, total)
+
+    def drain(self, limit: Optional[int] = None) -> List[Notification]:
+        """Забирает из очереди до limit записей в порядке постановки"""
+        with self._lock:
+            if limit is None or limit >= len(self._queue):
+                taken = list(self._queue)
+                self._queue.clear()
+                return taken
+            popleft = self._queue.popleft
+            return [popleft() for _ in range(limit)]
+
+    def __len__(self) -> int:
+        return len(self._queue)
+
+
+_notification_outbox: Optional[NotificationOutbox] = None
+
+
+def get_notification_outbox() -> Optional[NotificationOutbox]:
+    return _notification_outbox
+
+
+def set_notification_outbox(outbox: Optional[NotificationOutbox]) -> Optional[NotificationOutbox]:
+    """Подключает outbox (None - уведомления снова печатаются), возвращает прежний"""
+    global _notification_outbox
+    previous = _notification_outbox
+    _notification_outbox = outbox
+    return previous
+
+
+class NotificationTransport(ABC):
+    """Базовый транспорт: отправляет пачку писем (по одному на получателя)"""
+
+    @abstractmethod
+    async def send_batch(self, batch: List[Notification]):
+        pass
+
+    async def close(self):
+        pass
+
+
+class MemoryTransport(NotificationTransport):
+    """Транспорт в память для тестов: latency на пачку, failure_rate - доля отказов"""
+
+    def __init__(self, latency: float = 0.0, failure_rate: float = 0.0, seed: Optional[int] = None):
+        self.latency = latency
+        self.failure_rate = failure_rate
+        self.sent: List[Notification] = []
+        self.batches = 0
+        self._random = random.Random(seed)
+
+    async def send_batch(self, batch: List[Notification]):
+        if self.latency:
+            await asyncio.sleep(self.latency)
+        if self.failure_rate and self._random.random() < self.failure_rate:
+            raise ConnectionError("Транспорт временно недоступен")
+        self.sent.extend(batch)
+        self.batches += 1
+
+
+class FileTransport(NotificationTransport):
+    """Локальная замена почтового сервера: письма дописываются в файл.
+
+    Каждое письмо - блок "To: <получатель>", текст и пустая строка;
+    запись идет в отдельном потоке, чтобы не блокировать цикл событий.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self._lock = threading.Lock()
+
+    def _write(self, batch: List[Notification]):
+        data = "".join(f"To: {item.recipient}\n{item.message}\n\n" for item in batch)
+        with self._lock, open(self.path, "a", encoding="utf-8") as file:
+            file.write(data)
+
+    async def send_batch(self, batch: List[Notification]):
+        await asyncio.to_thread(self._write, batch)
+
+
+class SMTPTransport(NotificationTransport):
+    """Отправка через SMTP (например, локальный отладочный сервер).
+
+    Одно соединение на пачку; smtplib работает в отдельном потоке.
+    Письма без получателя отправляются на fallback_recipient.
+    """
+
+    def __init__(self, host: str = "localhost", port: int = 1025, sender: str = "noreply@univ.ru",
+                 fallback_recipient: str = "admin@univ.ru", subject: str = "Уведомление университета",
+                 timeout: float = 10.0):
+        self.host = host
+        self.port = port
+        self.sender = sender
+        self.fallback_recipient = fallback_recipient
+        self.subject = subject
+        self.timeout = timeout
+
+    def _send(self, batch: List[Notification]):
+        import smtplib
+        from email.message import EmailMessage
+        with smtplib.SMTP(self.host, self.port, timeout=self.timeout) as smtp:
+            for item in batch:
+                mail = EmailMessage()
+                mail['From'] = self.sender
+                mail['To'] = item.recipient or self.fallback_recipient
+                mail['Subject'] = self.subject
+                mail.set_content(item.message)
+                smtp.send_message(mail)
+
+    async def send_batch(self, batch: List[Notification]):
+        await asyncio.to_thread(self._send, batch)
+
+
+class NotificationDispatcher:
+    """Асинхронная отправка уведомлений из outbox через transport.
+
+    За один проход забирается все, что накопилось в очереди: одинаковые
+    уведомления одному получателю отбрасываются, остальные сообщения
+    получателя объединяются в одно письмо. Письма уходят пачками по
+    batch_size, одновременно отправляется не больше concurrency пачек.
+    Неудачная пачка повторяется до retries раз с задержкой
+    backoff * 2**попытка; после этого письма попадают в dead_letters.
+
+        async with NotificationDispatcher(outbox, transport) as dispatcher:
+            ...  # запись студентов; при выходе очередь отправляется целиком
+    """
+
+    def __init__(self, outbox: NotificationOutbox, transport: NotificationTransport,
+                 batch_size: int = 100, concurrency: int = 4, retries: int = 3,
+                 backoff: float = 0.05, poll_interval: float = 0.05):
+        self.outbox = outbox
+        self.transport = transport
+        self.batch_size = batch_size
+        self.concurrency = concurrency
+        self.retries = retries
+        self.backoff = backoff
+        self.poll_interval = poll_interval
+        self.dead_letters: List[Notification] = []
+        self.stats = Counter()
+        self._task: Optional[asyncio.Task] = None
+        self._stopping = False
+
+    @staticmethod
+    def coalesce(notifications: List[Notification]) -> List[Notification]:
+        """Одно письмо на получателя: уникальные сообщения в порядке поступления"""
+        by_recipient: Dict[Optional[str], Dict[str, None]] = {}
+        for recipient, message in notifications:
+            by_recipient.setdefault(recipient, {})[message] = None
+        return [Notification(recipient, "\n".join(messages)) for recipient, messages in by_recipient.items()]
+
+    async def dispatch_once(self) -> int:
+        """Отправляет все, что сейчас в очереди; возвращает число писем"""
+        pending = self.outbox.drain()
+        if not pending:
+            return 0
+        mails = self.coalesce(pending)
+        unique = len(set(pending))
+        self.stats['received'] += len(pending)
+        self.stats['deduplicated'] += len(pending) - unique
+        self.stats['coalesced'] += unique - len(mails)
+        semaphore = asyncio.Semaphore(self.concurrency)
+        await asyncio.gather(*(self._send(mails[i:i + self.batch_size], semaphore)
+                               for i in range(0, len(mails), self.batch_size)))
+        return len(mails)
+
+    async def _send(self, batch: List[Notification], semaphore: asyncio.Semaphore):
+        async with semaphore:
+            for attempt in range(self.retries + 1):
+                try:
+                    await self.transport.send_batch(batch)
+                except Exception as e:
+                    if attempt == self.retries:
+                        logger.warning("Не удалось отправить %d уведомлений: %s", len(batch), e)
+                        self.dead_letters.extend(batch)
+                        self._count('failed', len(batch))
+                        return
+                    self._count('retried', len(batch))
+                    await asyncio.sleep(self.backoff * 2 ** attempt)
+                else:
+                    self.stats['batches'] += 1
+                    self._count('sent', len(batch))
+                    return
+
+    def _count(self, result: str, count: int):
+        self.stats[result] += count
+        metrics = _metrics
+        if metrics is not None:
+            metrics.inc('notifications_total', (result,), count)
+
+    async def run(self):
+        """Отправляет уведомления, пока не вызван stop()"""
+        while not self._stopping:
+            if not await self.dispatch_once():
+                await asyncio.sleep(self.poll_interval)
+
+    async def start(self):
+        self._stopping = False
+        self._task = asyncio.create_task(self.run())
+
+    async def stop(self):
+        """Останавливает цикл и отправляет остаток очереди"""
+        self._stopping = True
+        if self._task is not None:
+            await self._task
+            self._task = None
+        await self.flush()
+
+    async def flush(self):
+        while await self.dispatch_once():
+            pass
+
+    async def __aenter__(self):
+        await self.start()
+        return self
+
+    async def __aexit__(self, *exc):
+        await self.stop()
+
+    def send_pending(self) -> int:
+        """Синхронная отправка очереди (из кода без цикла событий)"""
+        before = self.stats['sent'] + self.stats['failed']
+        asyncio.run(self.flush())
+        return self.stats['sent'] + self.stats['failed'] - before
+
+
+class EnrollmentResult(NamedTuple):
+    """Результат записи одной пары (студент, курс) в пакетном режиме"""
+    student: object
+    course: object
+    success: bool
+    reason: Optional[str] = None
 
 #/////////////////////////////////////////////////////////////////////////////////////////
 #Композиция и агрегация 
 
+class StudentRoster:
+    """Индексированный список студентов курса.
+
+    Студенты - ключи словаря (хеш по identity_key(), равенство - Student.__eq__,
+    то есть с учетом email), поэтому проверка членства, добавление и
+    удаление выполняются за O(1), а порядок записи на курс сохраняется для
+    get_students() и отчетов. Доступ по индексу идет через список
+    значений, который строится один раз и сбрасывается при изменении состава.
+    """
+
+    __slots__ = ('__members', '__values')
+
+    def __init__(self, students=()):
+        # студент -> его identity_key()
+        self.__members = {}
+        self.__values = None
+        for student in students:
+            self.add(student)
+
+    def add(self, student: Student) -> bool:
+        """Добавляет студента, возвращает False если он уже есть"""
+        if student in self.__members:
+            return False
+        self.__members[student] = student.identity_key()
+        self.__values = None
+        return True
+
+    def discard(self, student: Student) -> bool:
+        """Удаляет студента, возвращает False если его не было"""
+        if self.__members.pop(student, None) is None:
+            return False
+        self.__values = None
+        return True
+
+    def items(self):
+        """Пары (identity_key(), студент) в порядке записи"""
+        return [(key, student) for student, key in self.__members.items()]
+
+    def __contains__(self, student) -> bool:
+        if not isinstance(student, Person):
+            return False
+        return student in self.__members
+
+    def __len__(self) -> int:
+        return len(self.__members)
+
+    def __iter__(self):
+        return iter(self.__members)
+
+    def __getitem__(self, index):
+        values = self.__values
+        if values is None:
+            values = self.__values = list(self.__members)
+        return values[index]
+
+    def __repr__(self) -> str:
+        return f"StudentRoster({list(self.__members)!r})"
+
+
+#Материалы курсов: контентно-адресуемое хранилище текстов лекций
+
+class MaterialNotFoundError(Exception):
+    def __init__(self, ref: str):
+        self.ref = ref
+        super().__init__(f"Материал {ref} не найден в хранилище")
+
+
+class MaterialStore:
+    """Контентно-адресуемое хранилище текстов лекций на диске.
+
+    Текст записывается один раз в файл root/<2 символа хэша>/<sha256>,
+    курсы хранят только ссылку 'sha256:<hex>', поэтому одинаковые тексты
+    не дублируются ни в памяти, ни на диске, ни в снимках. Чтение идет
+    через LRU-кэш, ограниченный суммарным размером текстов cache_bytes;
+    прочитанный файл сверяется с хэшем из ссылки. Тексты из загружаемых
+    данных (stage) держатся в памяти и пишутся на диск только при flush(),
+    при первой записи put() или когда курс отдает их ссылки наружу.
+    """
+
+    REF_PREFIX = 'sha256:'
+
+    def __init__(self, root: str, cache_bytes: int = 32 * 1024 * 1024):
+        self.root = root
+        self.cache_bytes = cache_bytes
+        self.hits = 0
+        self.misses = 0
+        self._cache: "OrderedDict[str, str]" = OrderedDict()
+        self._cached_bytes = 0
+        self._staged: Dict[str, bytes] = {}
+        self._lock = threading.Lock()
+
+    @classmethod
+    def is_ref(cls, value) -> bool:
+        return (isinstance(value, str) and len(value) == len(cls.REF_PREFIX) + 64
+                and value.startswith(cls.REF_PREFIX))
+
+    def path(self, ref: str) -> str:
+        digest = ref[len(self.REF_PREFIX):]
+        return os.path.join(self.root, digest[:2], digest)
+
+    def _encode(self, body: str) -> tuple:
+        if not isinstance(body, str):
+            raise TypeError("Материал курса должен быть строкой")
+        data = body.encode('utf-8')
+        return self.REF_PREFIX + hashlib.sha256(data).hexdigest(), data
+
+    def _write(self, ref: str, data: bytes):
+        path = self.path(ref)
+        if not os.path.exists(path):
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            tmp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+            with open(tmp_path, 'wb') as file:
+                file.write(data)
+            os.replace(tmp_path, path)
+
+    def put(self, body: str) -> str:
+        """Сохраняет текст (если такого еще нет) и возвращает ссылку на него"""
+        ref, data = self._encode(body)
+        self._write(ref, data)
+        if self._staged:
+            self.flush()
+        return ref
+
+    def stage(self, body: str) -> str:
+        """Ссылка на текст без записи на диск: текст ждет в памяти flush() или put()"""
+        ref, data = self._encode(body)
+        with self._lock:
+            if ref not in self._staged and not os.path.exists(self.path(ref)):
+                self._staged[ref] = data
+        return ref
+
+    def flush(self, refs=None) -> int:
+        """Пишет на диск отложенные тексты (все или только из refs), возвращает их число"""
+        if not self._staged:
+            return 0
+        with self._lock:
+            if refs is None:
+                pending = list(self._staged.items())
+            else:
+                pending = [(ref, self._staged[ref]) for ref in refs if ref in self._staged]
+        for ref, data in pending:
+            self._write(ref, data)
+            with self._lock:
+                self._staged.pop(ref, None)
+        return len(pending)
+
+    def get(self, ref: str) -> str:
+        """Текст по ссылке: из кэша, из отложенных или с диска"""
+        with self._lock:
+            body = self._cache.get(ref)
+            if body is not None:
+                self._cache.move_to_end(ref)
+                self.hits += 1
+                return body
+            self.misses += 1
+            data = self._staged.get(ref)
+        if data is not None:
+            body = data.decode('utf-8')
+            self._remember(ref, body, len(data))
+            return body
+        try:
+            with open(self.path(ref), 'rb') as file:
+                data = file.read()
+        except (FileNotFoundError, NotADirectoryError):
+            raise MaterialNotFoundError(ref) from None
+        if hashlib.sha256(data).hexdigest() != ref[len(self.REF_PREFIX):]:
+            raise MaterialNotFoundError(ref)
+        body = data.decode('utf-8')
+        self._remember(ref, body, len(data))
+        return body
+
+    def _remember(self, ref: str, body: str, size: int):
+        if size > self.cache_bytes:
+            return
+        with self._lock:
+            if ref in self._cache:
+                return
+            self._cache[ref] = body
+            self._cached_bytes += size
+            while self._cached_bytes > self.cache_bytes:
+                _, evicted = self._cache.popitem(last=False)
+                self._cached_bytes -= len(evicted.encode('utf-8'))
+
+    def __contains__(self, ref) -> bool:
+        return self.is_ref(ref) and (ref in self._staged or os.path.exists(self.path(ref)))
+
+    def cache_info(self) -> Dict[str, int]:
+        with self._lock:
+            return {'hits': self.hits, 'misses': self.misses, 'items': len(self._cache),
+                    'bytes': self._cached_bytes, 'limit': self.cache_bytes}
+
+    def clear_cache(self):
+        with self._lock:
+            self._cache.clear()
+            self._cached_bytes = 0
+
+    def remove_unreferenced(self, live_refs) -> int:
+        """Удаляет с диска тексты, на которые нет ссылок из live_refs"""
+        live = {ref[len(self.REF_PREFIX):] for ref in live_refs}
+        removed = 0
+        if not os.path.isdir(self.root):
+            return removed
+        for prefix in os.listdir(self.root):
+            directory = os.path.join(self.root, prefix)
+            if not os.path.isdir(directory):
+                continue
+            for name in os.listdir(directory):
+                # .tmp - незавершенная запись put() в другом потоке или процессе
+                if name not in live and not name.endswith('.tmp'):
+                    os.remove(os.path.join(directory, name))
+                    removed += 1
+        return removed
+
+
+# Хранилище материалов по умолчанию: каталог из переменной окружения
+# MATERIALS_DIR_ENV (иначе MATERIALS_DIR), создается при первой записи
+MATERIALS_DIR = 'course_materials'
+MATERIALS_DIR_ENV = 'UNIV_MATERIALS_DIR'
+_material_store: Optional[MaterialStore] = None
+_material_store_lock = threading.Lock()
+
+
+def get_material_store() -> MaterialStore:
+    global _material_store
+    store = _material_store
+    if store is None:
+        with _material_store_lock:
+            if _material_store is None:
+                root = os.environ.get(MATERIALS_DIR_ENV) or MATERIALS_DIR
+                _material_store = MaterialStore(os.path.abspath(root))
+            store = _material_store
+    return store
+
+
+def set_material_store(store: Optional[MaterialStore]) -> Optional[MaterialStore]:
+    """Подключает хранилище материалов, возвращает прежнее.
+
+    store=None возвращает хранилище по умолчанию (каталог из MATERIALS_DIR_ENV
+    или MATERIALS_DIR).
+    """
+    global _material_store
+    with _material_store_lock:
+        previous = _material_store
+        _material_store = store
+    return previous
+
+
 class Courses(Enrollable, Reportable, LoggingMixin, NotificationMixin):
      
 
     #композиция
     class Materials:
+        """Ссылки на тексты лекций в MaterialStore; тексты читаются по запросу"""
+
+        __slots__ = ('__refs',)
+
         def __init__(self):
-            self.__lectures = []          
-        def add_lecture(self, lecture: str):
-            self.__lectures.append(lecture)
+            self.__refs = []
+
+        def add(self, item: str) -> str:
+            """Добавляет ссылку или текст лекции из загружаемых данных.
+
+            Текст только откладывается в хранилище (stage): загрузка старых
+            данных не пишет на диск, пока ссылки курса не понадобятся снаружи.
+            """
+            ref = item if MaterialStore.is_ref(item) else get_material_store().stage(item)
+            self.add_ref(ref)
+            return ref
+
+        def add_lecture(self, lecture: str) -> str:
+            ref = get_material_store().put(lecture)
+            self.add_ref(ref)
+            return ref
+
+        def add_ref(self, ref: str) -> bool:
+            """Добавляет ссылку, False если она уже есть у курса"""
+            if ref in self.__refs:
+                return False
+            self.__refs.append(ref)
+            return True
+
+        def get_refs(self) -> list:
+            """Ссылки курса; отложенные тексты по ним сначала пишутся на диск"""
+            get_material_store().flush(self.__refs)
+            return list(self.__refs)
 
-        
         def get_lectures(self) -> list:
-            return self.__lectures
+            store = get_material_store()
+            return [store.get(ref) for ref in self.__refs]
     
         
      #"""Класс для представления учебного курса."""
@@ -481,38 +2645,92 @@ class Courses(Enrollable, Reportable, LoggingMixin, NotificationMixin):
             course_name: Название курса
             teacher: Преподаватель курса
         """
+        self._init_state(courses_id, course_name, teacher)
+        if _construction_logging and logger.isEnabledFor(logging.INFO):
+            logger.info("Создан курс: %s, преподаватель: %s",
+                        course_name, teacher.get_name() if teacher else None)
+        if _change_listeners:
+            _emit_change(self, 'created')
+
+
+    def _init_state(self, courses_id, course_name, teacher, students=()):
         self.__courses_id = courses_id
         self.__course_name = course_name
         self.__teacher = teacher
-        self.__students = []
-        logging.info(f"Создан курс: {course_name}, преподаватель: {teacher.get_name()}")
-
+        self.__students = StudentRoster(students)
+        self.__schedule = {}
+        self.__course_materials = Courses.Materials()
+        # RLock: шаблонный метод EnrollmentProcess держит его, вызывая enroll_student
+        self.__lock = threading.RLock()
+        self.__waitlist = StudentRoster()
 
     def set_teacher(self, new_teacher: Teacher):
         if not isinstance(new_teacher, Teacher):
             raise TypeError("Некорректное имя преподавателя")
         self.__teacher=new_teacher
+        if _change_listeners:
+            _emit_change(self, 'set_teacher', new_teacher)
 
     def set_schedule(self, day, time):
+        """Занятие в день day (название или сокращение) с часа time.
+
+        День хранится в каноническом виде из WEEK_DAYS, поэтому 'Mon' и
+        'Пн' - одно и то же занятие.
+        """
         if not isinstance(day, str) or  not isinstance(time, int):
             raise TypeError("Некорректное значение")
+        day = normalize_day(day)
+        if not 0 <= time <= 23:
+            raise ValueError(f"Некорректный час начала занятия: {time}")
         self.__schedule[day]=time
+        if _change_listeners:
+            _emit_change(self, 'set_schedule', day, time)
 
 
     def add_student(self, st: Student):
         if not isinstance(st, Student):
             raise TypeError("Некорректное значение")
-        if st not in self.__students:
-            self.__students.append(st)
-        else :
+        with self.__lock:
+            added = self.__students.add(st)
+        if not added:
             print("Студент уже записан на курс")
+        elif _change_listeners:
+            _emit_change(self, 'add_student', st)
 
 
     def remove_student(self, st_name: Student):
          if not isinstance(st_name, Student):
             raise TypeError("Некорректное значение")
-         if st_name in self.__students:
-            self.__students.remove(st_name)
+         with self.__lock:
+            removed = self.__students.discard(st_name)
+         if removed and _change_listeners:
+            _emit_change(self, 'remove_student', st_name)
+
+
+    def get_lock(self) -> threading.RLock:
+        """Блокировка курса: под ней проверка мест и запись выполняются атомарно"""
+        return self.__lock
+
+    def add_to_waitlist(self, student: Student) -> bool:
+        """Ставит студента в лист ожидания, False если он уже записан или ждет"""
+        if not isinstance(student, Student):
+            raise TypeError("Некорректное значение")
+        with self.__lock:
+            if student in self.__students:
+                return False
+            return self.__waitlist.add(student)
+
+    def pop_waitlist(self) -> Optional[Student]:
+        """Забирает первого студента из листа ожидания (None если лист пуст)"""
+        with self.__lock:
+            student = next(iter(self.__waitlist), None)
+            if student is not None:
+                self.__waitlist.discard(student)
+            return student
+
+    def get_waitlist(self) -> List[Student]:
+        with self.__lock:
+            return list(self.__waitlist)
 
 
     def get_course_id(self):
@@ -523,12 +2741,39 @@ class Courses(Enrollable, Reportable, LoggingMixin, NotificationMixin):
     
     def get_course_teacher(self):
         return self.__teacher
-    
-    def get_students(self):
+
+    def get_students(self) -> List[Student]:
+        """Копия списка студентов в порядке записи"""
+        with self.__lock:
+            return list(self.__students)
+
+    def get_roster(self) -> StudentRoster:
+        """Индекс студентов курса (живой, не изменять): членство и размер за O(1)"""
         return self.__students
     
     def get_schedule(self):
-        return self.__schedules
+        return self.__schedule
+
+    def add_material(self, lecture: str) -> str:
+        """Сохраняет текст лекции в хранилище материалов, возвращает ссылку"""
+        ref = get_material_store().put(lecture)
+        self.attach_material(ref)
+        return ref
+
+    def attach_material(self, ref: str):
+        """Добавляет курсу материал по ссылке из хранилища"""
+        if not MaterialStore.is_ref(ref):
+            raise ValueError(f"Некорректная ссылка на материал: {ref!r}")
+        if self.__course_materials.add_ref(ref) and _change_listeners:
+            _emit_change(self, 'attach_material', ref)
+
+    def get_materials(self) -> list:
+        """Ссылки на материалы курса"""
+        return self.__course_materials.get_refs()
+
+    def get_lectures(self) -> list:
+        """Тексты лекций (читаются из хранилища через кэш)"""
+        return self.__course_materials.get_lectures()
     """
     функция до применения задания 9
     def enroll_student(self, student: Student):
@@ -541,25 +2786,64 @@ class Courses(Enrollable, Reportable, LoggingMixin, NotificationMixin):
         self.send_notification(f"Вы записаны на курс {self.get_course_name()}")
 """
 
-    def generate_report(self):
-        report=f"Отчет по курсу: {self.course_name}\n"
-        report+=f"Преподаватель {self.get_course_teacher}\n"
-        report+=f"Количество студентов {len(self.__students)}\n"
-        report+=f"Список студентов \n"
+    def report_data(self) -> tuple:
+        """Компактные данные отчета: (course_id, название, преподаватель, ((имя, ID студента), ...))"""
+        teacher = self.__teacher
+        with self.__lock:
+            students = tuple((student.get_name(), student.get_st_id()) for student in self.__students)
+        return (self.__courses_id, self.__course_name,
+                teacher.get_name() if teacher is not None else None, students)
+
+    def generate_report(self) -> str:
+        return render_course_report(self.report_data())
 
-        for i, student in enumerate(self.__students, start=1):
-         report += f"{i}. Студент {student.get_name()} ID({student.get_st_id()})\n"
+    def write_report(self, filename: str):
+        """Записывает отчет в файл построчно, не собирая его в одну строку"""
+        with open(filename, "w", encoding="utf-8") as file:
+            write_course_report(self.report_data(), file)
 
     @check_permissions(["teacher", "admin"]) 
     def enroll_student(self, student: Student):
         if not isinstance(student, Student):
             raise TypeError("Можно записывать только студентов.")
-        if student in self.__students:
-            raise ValueError("Студент уже записан на этот курс")
-        self.__students.append(student)
-        student.set_courses([self.__course_name])
+        with self.__lock:
+            if student in self.__students:
+                raise ValueError("Студент уже записан на этот курс")
+            self._register(student)
         self.log_action(f"Студент {student.get_name()} записан на курс {self.__course_name}")
 
+    @check_permissions(["teacher", "admin"])
+    def enroll_many(self, students, update_students: bool = True) -> List[EnrollmentResult]:
+        """Пакетная запись студентов на курс.
+
+        Не выбрасывает исключений для отдельных студентов: для каждого
+        возвращается EnrollmentResult. Запись в лог делается один раз на пакет.
+        update_students=False - курс не добавляется в списки курсов
+        студентов (это делает вызывающий, например EnrollmentProcess.enroll_many).
+        """
+        results = []
+        enrolled = 0
+        with self.__lock:
+            for student in students:
+                if not isinstance(student, Student):
+                    results.append(EnrollmentResult(student, self, False, "Можно записывать только студентов."))
+                elif student in self.__students:
+                    results.append(EnrollmentResult(student, self, False, "Студент уже записан на этот курс"))
+                else:
+                    self._register(student, update_students)
+                    enrolled += 1
+                    results.append(EnrollmentResult(student, self, True))
+        if enrolled:
+            self.log_action(f"На курс {self.__course_name} записано студентов: {enrolled}")
+        return results
+
+    def _register(self, student: Student, update_student: bool = True):
+        self.__students.add(student)
+        if _change_listeners:
+            _emit_change(self, 'add_student', student)
+        if update_student:
+            student.set_courses([self.__course_name])
+
 
     def to_dict(self) -> Dict:
         """Преобразует объект Courses в словарь"""
@@ -569,13 +2853,20 @@ class Courses(Enrollable, Reportable, LoggingMixin, NotificationMixin):
             'teacher': self.get_course_teacher().to_dict() if self.get_course_teacher() else None,
             'students': [student.to_dict() for student in self.get_students()],
             'schedule': self.get_schedule(),
-            'materials': [lecture for lecture in self.__course_materials.get_lectures()]
+            'materials': self.__course_materials.get_refs()
         }
 
     @classmethod
-    def from_dict(cls, data: Dict):
-        """Создает объект Courses из словаря"""
-        teacher = Teacher.from_dict(data['teacher']) if data['teacher'] else None
+    def from_dict(cls, data: Dict, identity_map: "IdentityMap" = None):
+        """Создает объект Courses из словаря.
+
+        Если передана identity_map, преподаватель и студенты берутся из нее
+        (и добавляются в нее), так что один человек загружается один раз.
+        """
+        if identity_map is None:
+            teacher = Teacher.from_dict(data['teacher']) if data['teacher'] else None
+        else:
+            teacher = identity_map.get_or_create(data['teacher'], Teacher) if data['teacher'] else None
         course = cls(
             courses_id=data['courses_id'],
             course_name=data['course_name'],
@@ -583,22 +2874,600 @@ class Courses(Enrollable, Reportable, LoggingMixin, NotificationMixin):
         )
         
         for student_data in data['students']:
-            student = Student.from_dict(student_data)
+            if identity_map is None:
+                student = Student.from_dict(student_data)
+            else:
+                student = identity_map.get_or_create(student_data, Student)
             course.add_student(student)
             
+        course._load_extras(data)
+        return course
+
+    def to_ref_dict(self) -> Dict:
+        """Нормализованный словарь: преподаватель и студенты - ссылки по person_id"""
+        teacher = self.get_course_teacher()
+        return {
+            'courses_id': self.get_course_id(),
+            'course_name': self.get_course_name(),
+            'teacher_id': teacher.get_id() if teacher else None,
+            'student_ids': [student.get_id() for student in self.get_students()],
+            'schedule': self.get_schedule(),
+            'materials': self.__course_materials.get_refs()
+        }
+
+    @classmethod
+    def from_ref_dict(cls, data: Dict, identity_map: "IdentityMap"):
+        """Создает курс из нормализованного словаря, разрешая ссылки через identity_map"""
+        teacher_id = data['teacher_id']
+        course = cls(
+            courses_id=data['courses_id'],
+            course_name=data['course_name'],
+            teacher=identity_map.resolve(teacher_id) if teacher_id is not None else None
+        )
+        for person_id in data['student_ids']:
+            course.add_student(identity_map.resolve(person_id))
+        course._load_extras(data)
+        return course
+
+    @classmethod
+    def from_dict_many(cls, data, identity_map: "IdentityMap" = None) -> list:
+        """Пакетная загрузка курсов из словарей формата to_dict.
+
+        Все преподаватели и студенты создаются пакетно (по одному разу на
+        person_id), затем курсы собираются без поштучного add_student.
+        """
+        data = list(data)
+        identity_map = identity_map if identity_map is not None else IdentityMap()
+        identity_map.get_or_create_many([item['teacher'] for item in data if item['teacher']], Teacher)
+        identity_map.get_or_create_many([student for item in data for student in item['students']], Student)
+        return cls.from_ref_dict_many([{
+            'courses_id': item['courses_id'],
+            'course_name': item['course_name'],
+            'teacher_id': item['teacher']['person_id'] if item['teacher'] else None,
+            'student_ids': [student['person_id'] for student in item['students']],
+            'schedule': item['schedule'],
+            'materials': item['materials'],
+        } for item in data], identity_map)
+
+    @classmethod
+    def from_ref_dict_many(cls, data, identity_map: "IdentityMap") -> list:
+        """Пакетная загрузка курсов из нормализованных словарей.
+
+        Ссылки разрешаются для всего пакета до создания первого курса;
+        состав курса заполняется напрямую, без поштучного add_student.
+        """
+        data = data if isinstance(data, list) else list(data)
+        resolved = []
+        for item in data:
+            teacher_id = item['teacher_id']
+            teacher = identity_map.resolve(teacher_id) if teacher_id is not None else None
+            resolved.append((teacher, [identity_map.resolve(person_id) for person_id in item['student_ids']]))
+        courses = []
+        for item, (teacher, students) in zip(data, resolved):
+            course = cls.__new__(cls)
+            course._init_state(item['courses_id'], item['course_name'], teacher, students)
+            course.__schedule.update(_normalized_schedule(item['schedule']))
+            for material in item['materials']:
+                course.__course_materials.add(material)
+            courses.append(course)
+        if _change_listeners:
+            for course in courses:
+                _emit_change(course, 'created')
+        if _construction_logging and logger.isEnabledFor(logging.INFO):
+            logger.info("Загружено курсов: %d", len(courses))
+        return courses
+
+    def _load_extras(self, data: Dict):
         for day, time in data['schedule'].items():
-            course.set_schedule(day, time)
+            self.set_schedule(day, time)
             
-        for lecture in data['materials']:
-            course.__course_materials.add_lecture(lecture)
-            
-        return course
+        for material in data['materials']:
+            self.__course_materials.add(material)
+
+#Отчеты по курсам
+
+def _report_lines(data):
+    _, course_name, teacher_name, students = data
+    yield f"Отчет по курсу: {course_name}\n"
+    yield f"Преподаватель {teacher_name}\n"
+    yield f"Количество студентов {len(students)}\n"
+    yield "Список студентов \n"
+    for i, (name, student_id) in enumerate(students, start=1):
+        yield f"{i}. Студент {name} ID({student_id})\n"
+
+
+def render_course_report(data: tuple) -> str:
+    """Текст отчета по данным Courses.report_data()"""
+    return "".join(_report_lines(data))
+
+
+def write_course_report(data: tuple, file):
+    """Пишет отчет по данным Courses.report_data() в открытый текстовый файл"""
+    file.writelines(_report_lines(data))
+
+
+def report_filename(output_dir: str, course_id) -> str:
+    return os.path.join(output_dir, f"report_{course_id}.txt")
+
+
+def _render_report_chunk(chunk, output_dir: Optional[str] = None) -> list:
+    """Обработка пачки курсов (в том числе в дочернем процессе).
+
+    Без output_dir возвращает тексты отчетов, иначе пишет каждый отчет
+    в свой файл и возвращает пути.
+    """
+    if output_dir is None:
+        return [render_course_report(data) for data in chunk]
+    paths = []
+    for data in chunk:
+        path = report_filename(output_dir, data[0])
+        with open(path, "w", encoding="utf-8") as file:
+            write_course_report(data, file)
+        paths.append(path)
+    return paths
+
+
+def generate_reports(courses, output_dir: Optional[str] = None,
+                     max_workers: Optional[int] = None, chunk_size: int = 256) -> list:
+    """Отчеты по многим курсам, параллельно в пуле процессов.
+
+    Курсы делятся на пачки по chunk_size; в процессы передаются только
+    кортежи Courses.report_data(), а не графы объектов. Без output_dir
+    возвращает тексты отчетов в порядке courses, иначе пишет файлы
+    report_<course_id>.txt и возвращает их пути. max_workers=1 или
+    одна пачка - обработка в текущем процессе.
+    """
+    data = [course.report_data() for course in courses]
+    if output_dir is not None:
+        os.makedirs(output_dir, exist_ok=True)
+    chunks = [data[i:i + chunk_size] for i in range(0, len(data), chunk_size)]
+    if max_workers == 1 or len(chunks) <= 1:
+        return [item for chunk in chunks for item in _render_report_chunk(chunk, output_dir)]
+    with ProcessPoolExecutor(max_workers=max_workers) as pool:
+        return [item for items in pool.map(_render_report_chunk, chunks, repeat(output_dir))
+                for item in items]
+
+
+#Расписание: интервальные индексы по аудиториям, преподавателям и студентам
+#
+# Расписание курса - словарь день -> час начала занятия (Courses.set_schedule).
+# Время занятия переводится в минуты от начала недели: [start, start + lesson_minutes).
+
+WEEK_DAYS = ('Пн', 'Вт', 'Ср', 'Чт', 'Пт', 'Сб', 'Вс')
+DAY_ALIASES = {}
+for _index, _names in enumerate((
+        ('пн', 'понедельник', 'mon', 'monday'), ('вт', 'вторник', 'tue', 'tuesday'),
+        ('ср', 'среда', 'wed', 'wednesday'), ('чт', 'четверг', 'thu', 'thursday'),
+        ('пт', 'пятница', 'fri', 'friday'), ('сб', 'суббота', 'sat', 'saturday'),
+        ('вс', 'воскресенье', 'sun', 'sunday'))):
+    DAY_ALIASES.update(dict.fromkeys(_names, _index))
+del _index, _names
+
+LESSON_MINUTES = 90
+_DAY_MINUTES = 24 * 60
+
+
+def day_index(day: str) -> int:
+    """Номер дня недели (0 - понедельник) по названию или сокращению"""
+    index = DAY_ALIASES.get(day.strip().lower()) if isinstance(day, str) else None
+    if index is None:
+        raise ValueError(f"Неизвестный день недели: {day!r}")
+    return index
+
+
+def normalize_day(day: str) -> str:
+    """Каноническое название дня из WEEK_DAYS ('Mon', 'понедельник' -> 'Пн')"""
+    return WEEK_DAYS[day_index(day)]
+
+
+def _normalized_schedule(schedule: Dict) -> Dict:
+    """Расписание загружаемого курса с каноническими днями (неизвестные дни не меняются)"""
+    normalized = {}
+    for day, hour in schedule.items():
+        index = DAY_ALIASES.get(day.strip().lower()) if isinstance(day, str) else None
+        normalized[WEEK_DAYS[index] if index is not None else day] = hour
+    return normalized
+
+
+def slot_interval(day: str, hour: int, lesson_minutes: int = LESSON_MINUTES) -> tuple:
+    """Занятие в день day с часа hour: полуинтервал в минутах от начала недели"""
+    start = day_index(day) * _DAY_MINUTES + hour * 60
+    return start, start + lesson_minutes
+
+
+def schedule_intervals(schedule: Dict, lesson_minutes: int = LESSON_MINUTES) -> List[tuple]:
+    return sorted(slot_interval(day, hour, lesson_minutes) for day, hour in schedule.items())
+
+
+class ScheduleConflict(NamedTuple):
+    """Пересечение занятий двух курсов у одного ресурса.
+
+    kind - 'room', 'teacher' или 'student'; resource - аудитория, Teacher
+    или Student; start/end - общий отрезок в минутах от полуночи дня day.
+    """
+    kind: str
+    resource: object
+    first: object
+    second: object
+    day: str
+    start: int
+    end: int
+
+    @classmethod
+    def from_overlap(cls, kind, resource, first, second, start, end) -> "ScheduleConflict":
+        day, offset = divmod(start, _DAY_MINUTES)
+        return cls(kind, resource, first, second, WEEK_DAYS[day], offset, offset + end - start)
+
+
+class ScheduleConflictError(Exception):
+    def __init__(self, conflicts: List[ScheduleConflict]):
+        self.conflicts = conflicts
+        first = conflicts[0]
+        super().__init__(f"Пересечение расписания ({first.kind}): курсы {first.first.get_course_name()} и "
+                         f"{first.second.get_course_name()}, {first.day} - всего конфликтов: {len(conflicts)}")
+
+
+class IntervalIndex:
+    """Непересекающиеся полуинтервалы [start, end) одного ресурса, упорядоченные по началу.
+
+    Раз интервалы не пересекаются, концы тоже упорядочены, поэтому все
+    пересечения с запросом находятся двумя двоичными поисками: O(log n + k).
+    """
+
+    __slots__ = ('starts', 'ends', 'owners')
+
+    def __init__(self):
+        self.starts: List[int] = []
+        self.ends: List[int] = []
+        self.owners: list = []
+
+    def overlapping(self, start: int, end: int) -> List[tuple]:
+        """Тройки (start, end, owner) интервалов, пересекающихся с [start, end)"""
+        lo = bisect_right(self.ends, start)
+        hi = bisect_left(self.starts, end, lo)
+        return list(zip(self.starts[lo:hi], self.ends[lo:hi], self.owners[lo:hi]))
+
+    def add(self, start: int, end: int, owner) -> bool:
+        """Добавляет интервал, если он ни с чем не пересекается"""
+        position = bisect_right(self.ends, start)
+        if position < len(self.starts) and self.starts[position] < end:
+            return False
+        self.starts.insert(position, start)
+        self.ends.insert(position, end)
+        self.owners.insert(position, owner)
+        return True
+
+    def remove(self, start: int, owner) -> bool:
+        position = bisect_left(self.starts, start)
+        if position < len(self.starts) and self.starts[position] == start and self.owners[position] is owner:
+            del self.starts[position], self.ends[position], self.owners[position]
+            return True
+        return False
+
+    def __len__(self) -> int:
+        return len(self.starts)
+
+
+def _overlapping_pairs(keys, starts, ends) -> List[tuple]:
+    """Все пары номеров (i, j) с одинаковым ключом и пересекающимися интервалами.
+
+    После сортировки по (ключ, начало) интервал i пересекается с i+1, ...,
+    i+k подряд, пока не встретится первый непересекающийся, поэтому пары
+    находятся проходами со смещением 1, 2, ... только по еще совпавшим.
+    """
+    count = len(keys)
+    if count < 2:
+        return []
+    if np is not None:
+        keys, starts, ends = (np.frombuffer(column, dtype=np.int64) for column in (keys, starts, ends))
+        order = np.lexsort((starts, keys))
+        keys, starts, ends = keys[order], starts[order], ends[order]
+        pairs = []
+        candidates = np.arange(count - 1)
+        offset = 1
+        while candidates.size:
+            candidates = candidates[candidates + offset < count]
+            following = candidates + offset
+            candidates = candidates[(keys[following] == keys[candidates]) & (starts[following] < ends[candidates])]
+            pairs.extend(zip(order[candidates].tolist(), order[candidates + offset].tolist()))
+            offset += 1
+        return pairs
+    order = sorted(range(count), key=lambda i: (keys[i], starts[i]))
+    pairs = []
+    for position, i in enumerate(order):
+        key, end = keys[i], ends[i]
+        for j in islice(order, position + 1, None):
+            if keys[j] != key or starts[j] >= end:
+                break
+            pairs.append((i, j))
+    return pairs
+
+
+def find_schedule_conflicts(courses, rooms: Optional[Dict] = None,
+                            lesson_minutes: int = LESSON_MINUTES) -> List[ScheduleConflict]:
+    """Все пересечения занятий в семестре: по аудиториям, преподавателям и студентам.
+
+    rooms - словарь courses_id -> аудитория (курсы без аудитории не
+    проверяются по аудиториям). Занятия раскладываются в колонки
+    (ресурс, начало, конец, курс), пары ищутся сортировкой колонок
+    (в numpy, если он установлен), а не попарным сравнением курсов.
+    """
+    courses = list(courses)
+    rooms = rooms or {}
+    intervals = [schedule_intervals(course.get_schedule(), lesson_minutes) for course in courses]
+    conflicts = []
+    for kind in ('room', 'teacher', 'student'):
+        resource_ids, resources = {}, []
+        keys, starts, ends, owners = array('q'), array('q'), array('q'), array('q')
+        for number, (course, slots) in enumerate(zip(courses, intervals)):
+            if not slots:
+                continue
+            if kind == 'student':
+                members = course.get_roster().items()
+            elif kind == 'teacher':
+                teacher = course.get_course_teacher()
+                members = [(teacher.identity_key(), teacher)] if teacher is not None else []
+            else:
+                room = rooms.get(course.get_course_id())
+                members = [(room, room)] if room is not None else []
+            ids = array('q')
+            for key, resource in members:
+                resource_id = resource_ids.get(key)
+                if resource_id is None:
+                    resource_id = resource_ids[key] = len(resources)
+                    resources.append(resource)
+                ids.append(resource_id)
+            if not ids:
+                continue
+            for start, end in slots:
+                keys.extend(ids)
+                starts.extend(array('q', (start,)) * len(ids))
+                ends.extend(array('q', (end,)) * len(ids))
+                owners.extend(array('q', (number,)) * len(ids))
+        for i, j in _overlapping_pairs(keys, starts, ends):
+            if owners[i] == owners[j]:
+                # занятия одного курса друг другу не мешают
+                continue
+            conflicts.append(ScheduleConflict.from_overlap(
+                kind, resources[keys[i]], courses[owners[i]], courses[owners[j]],
+                max(starts[i], starts[j]), min(ends[i], ends[j])))
+    return conflicts
+
+
+class Timetable:
+    """Расписание семестра с интервальными индексами.
+
+    Для каждой аудитории, преподавателя и студента хранится IntervalIndex
+    его занятий, поэтому проверка конфликта при записи студента стоит
+    O(log n) на занятие курса. Курсы добавляются add_course; записи
+    студентов бронируются book_student (EnrollmentProcess делает это сам,
+    если ему передан timetable). После изменения расписания курса нужно
+    вызвать update_course. validate_term - полная проверка семестра.
+    """
+
+    def __init__(self, lesson_minutes: int = LESSON_MINUTES):
+        self.lesson_minutes = lesson_minutes
+        self._rooms: Dict[object, IntervalIndex] = {}
+        self._teachers: Dict[object, IntervalIndex] = {}
+        self._students: Dict[object, IntervalIndex] = {}
+        # courses_id -> (курс, аудитория, занятия, ключи забронированных студентов)
+        self._courses: Dict[object, tuple] = {}
+        self._lock = threading.RLock()
+
+    @classmethod
+    def from_courses(cls, courses, rooms: Optional[Dict] = None,
+                     lesson_minutes: int = LESSON_MINUTES) -> "Timetable":
+        """Расписание по готовым курсам; пересечения не бронируются (см. validate_term)"""
+        timetable = cls(lesson_minutes)
+        rooms = rooms or {}
+        for course in courses:
+            timetable.add_course(course, rooms.get(course.get_course_id()), strict=False)
+        return timetable
+
+    def _course_entry(self, course) -> tuple:
+        entry = self._courses.get(course.get_course_id())
+        if entry is None or entry[0] is not course:
+            return course, None, schedule_intervals(course.get_schedule(), self.lesson_minutes), set()
+        return entry
+
+    def _conflicts(self, kind: str, index: Optional[IntervalIndex], resource, course, slots) -> list:
+        if index is None:
+            return []
+        return [ScheduleConflict.from_overlap(kind, resource, owner, course, max(start, s), min(end, e))
+                for start, end in slots for s, e, owner in index.overlapping(start, end) if owner is not course]
+
+    def course_conflicts(self, course, room=None) -> List[ScheduleConflict]:
+        """Пересечения курса по аудитории, преподавателю и студентам курса"""
+        slots = schedule_intervals(course.get_schedule(), self.lesson_minutes)
+        with self._lock:
+            conflicts = self._conflicts('room', self._rooms.get(room), room, course, slots)
+            teacher = course.get_course_teacher()
+            if teacher is not None:
+                conflicts += self._conflicts('teacher', self._teachers.get(teacher.identity_key()),
+                                             teacher, course, slots)
+            for key, student in course.get_roster().items():
+                conflicts += self._conflicts('student', self._students.get(key), student, course, slots)
+        return conflicts
+
+    def add_course(self, course, room=None, strict: bool = True) -> List[ScheduleConflict]:
+        """Добавляет курс с его аудиторией, преподавателем и записанными студентами.
+
+        strict=True: при любом пересечении курс не добавляется, выбрасывается
+        ScheduleConflictError. strict=False: бронируется все, что не
+        пересекается, пересечения возвращаются.
+        """
+        with self._lock:
+            self.remove_course(course)
+            conflicts = self.course_conflicts(course, room)
+            if conflicts and strict:
+                raise ScheduleConflictError(conflicts)
+            slots = schedule_intervals(course.get_schedule(), self.lesson_minutes)
+            booked = set()
+            self._courses[course.get_course_id()] = (course, room, slots, booked)
+            teacher = course.get_course_teacher()
+            for start, end in slots:
+                if room is not None:
+                    self._rooms.setdefault(room, IntervalIndex()).add(start, end, course)
+                if teacher is not None:
+                    self._teachers.setdefault(teacher.identity_key(), IntervalIndex()).add(start, end, course)
+            for key, student in course.get_roster().items():
+                index = self._students.setdefault(key, IntervalIndex())
+                added = [index.add(start, end, course) for start, end in slots]
+                if all(added):
+                    booked.add(key)
+                else:
+                    for (start, _), was_added in zip(slots, added):
+                        if was_added:
+                            index.remove(start, course)
+        return conflicts
+
+    def remove_course(self, course) -> bool:
+        with self._lock:
+            entry = self._courses.pop(course.get_course_id(), None)
+            if entry is None:
+                return False
+            course, room, slots, booked = entry
+            teacher = course.get_course_teacher()
+            for start, _ in slots:
+                if room is not None:
+                    self._rooms[room].remove(start, course)
+                if teacher is not None and teacher.identity_key() in self._teachers:
+                    self._teachers[teacher.identity_key()].remove(start, course)
+                for key in booked:
+                    self._students[key].remove(start, course)
+        return True
+
+    def update_course(self, course, strict: bool = True) -> List[ScheduleConflict]:
+        """Переиндексирует курс после изменения расписания или преподавателя"""
+        with self._lock:
+            entry = self._courses.get(course.get_course_id())
+            return self.add_course(course, entry[1] if entry is not None else None, strict)
+
+    def student_conflicts(self, student: Student, course) -> List[ScheduleConflict]:
+        """Пересечения занятий курса с расписанием студента"""
+        with self._lock:
+            _, _, slots, _ = self._course_entry(course)
+            return self._conflicts('student', self._students.get(student.identity_key()), student, course, slots)
+
+    def book_student(self, student: Student, course) -> bool:
+        """Бронирует занятия курса студенту; False - есть пересечение.
+
+        Повторное бронирование того же курса ничего не меняет и возвращает True.
+        """
+        key = student.identity_key()
+        with self._lock:
+            course, room, slots, booked = self._course_entry(course)
+            if key in booked:
+                return True
+            index = self._students.get(key)
+            if index is not None and any(owner is not course for start, end in slots
+                                         for _, _, owner in index.overlapping(start, end)):
+                return False
+            if course.get_course_id() not in self._courses:
+                self._courses[course.get_course_id()] = (course, room, slots, booked)
+            index = self._students.setdefault(key, IntervalIndex())
+            for start, end in slots:
+                index.add(start, end, course)
+            booked.add(key)
+        return True
+
+    def release_student(self, student: Student, course) -> bool:
+        """Снимает бронь студента (если он не остался записан на курс)"""
+        if student in course.get_roster():
+            return False
+        key = student.identity_key()
+        with self._lock:
+            entry = self._courses.get(course.get_course_id())
+            if entry is None or key not in entry[3]:
+                return False
+            for start, _ in entry[2]:
+                self._students[key].remove(start, course)
+            entry[3].discard(key)
+        return True
+
+    def student_timetable(self, student: Student) -> List[tuple]:
+        """Занятия студента: тройки (день, минута начала, курс) по порядку"""
+        index = self._students.get(student.identity_key())
+        if index is None:
+            return []
+        return [(WEEK_DAYS[start // _DAY_MINUTES], start % _DAY_MINUTES, owner)
+                for start, owner in zip(index.starts, index.owners)]
+
+    def validate_term(self) -> List[ScheduleConflict]:
+        """Все пересечения по текущему состоянию курсов (а не по индексам)"""
+        with self._lock:
+            courses = [entry[0] for entry in self._courses.values()]
+            rooms = {course_id: entry[1] for course_id, entry in self._courses.items() if entry[1] is not None}
+        return find_schedule_conflicts(courses, rooms, self.lesson_minutes)
+
+
+#задание 7 -фабричные методы
+class PersonFactory:
+    @staticmethod
+    def create_person(person_type: str, *args, **kwargs):
+        return PersonFactory.constructor(person_type)(*args, **kwargs)
+
+    @staticmethod
+    def constructor(person_type: str):
+        """Класс типа person_type из реестра PersonMeta"""
+        cls = PersonMeta.registry.get(person_type)
+        if cls is None:
+            raise ValueError(f"Класс {person_type} не найден в реестре классов")
+        return cls
+
+    @staticmethod
+    def create_many(person_type: str, rows) -> list:
+        """Пакетное создание людей одного типа.
+
+        rows - колонки (словарь: поле -> список, array или массив numpy),
+        список кортежей в порядке полей схемы или список словарей.
+        """
+        cls = PersonFactory.constructor(person_type)
+        if isinstance(rows, dict):
+            return cls.from_columns(rows)
+        rows = rows if isinstance(rows, list) else list(rows)
+        if rows and isinstance(rows[0], dict):
+            return cls.from_dict_many(rows)
+        return cls.from_records(rows)
+
+    @staticmethod
+    def iter_roster(records, batch_size: int = 10000, default_type: Optional[str] = None):
+        """Потоковое создание людей разных типов из словарей формата to_dict.
+
+        Записи читаются пачками по batch_size; внутри пачки они группируются
+        по class_name сортировкой и передаются пакетному конструктору типа
+        из PersonMeta.builders. Объекты выдаются в порядке записей.
+        """
+        records = iter(records)
+        while True:
+            batch = list(islice(records, batch_size))
+            if not batch:
+                return
+            yield from PersonFactory._build_mixed(batch, default_type)
+
+    @staticmethod
+    def create_roster(records, default_type: Optional[str] = None) -> list:
+        records = records if isinstance(records, list) else list(records)
+        return PersonFactory._build_mixed(records, default_type)
 
-#задание 7 -фабричные методы
-class PersonFactory:
     @staticmethod
-    def create_person(person_type: str, *args, **kwargs):
-        return PersonMeta.created_by_type(person_type, *args, **kwargs)
+    def _build_mixed(batch: list, default_type: Optional[str]) -> list:
+        kinds = list(map(methodcaller('get', 'class_name', default_type), batch))
+        distinct = set(kinds)
+        if None in distinct:
+            raise ValueError("Неизвестный тип записи: None")
+        order = range(len(batch))
+        if len(distinct) > 1:
+            # сортировка устойчива: внутри типа порядок записей сохраняется
+            order = sorted(order, key=kinds.__getitem__)
+        people = [None] * len(batch)
+        for kind, group in groupby(order, key=kinds.__getitem__):
+            builder = PersonMeta.builders.get(kind)
+            if builder is None:
+                raise ValueError(f"Класс {kind} не найден в реестре классов")
+            indices = list(group)
+            deque(map(people.__setitem__, indices, builder(list(map(batch.__getitem__, indices)))), maxlen=0)
+        return people
     
 
 
@@ -606,28 +3475,273 @@ class PersonFactory:
 #задание 9-Шаблонный метод
     
 class EnrollmentProcess(ABC, LoggingMixin, NotificationMixin):
+    # Лимит мест на курсе (None - без ограничений)
+    course_limit = None
+
+    NOT_ELIGIBLE = "Студент не соответствует требованиям"
+    NOT_AVAILABLE = "Курс недоступен для записи"
+    REGISTRATION_FAILED = "Ошибка при регистрации"
+    WAITLISTED = "Мест нет, студент добавлен в лист ожидания"
+    SCHEDULE_CONFLICT = "Занятия курса пересекаются с расписанием студента"
+    # Метка result в enrollment_requests_total по причине отказа
+    RESULT_LABELS = {None: 'enrolled', NOT_ELIGIBLE: 'not_eligible', NOT_AVAILABLE: 'not_available',
+                     REGISTRATION_FAILED: 'registration_failed', WAITLISTED: 'waitlisted',
+                     SCHEDULE_CONFLICT: 'schedule_conflict'}
+
+    def __init__(self, waitlist: bool = False, timetable: Optional[Timetable] = None, principal=None):
+        """waitlist: ставить студента в лист ожидания, если на курсе нет мест;
+        timetable: бронировать занятия студента и отказывать при пересечении;
+        principal: от чьего имени записывать (объект с get_role()); без него
+        действует участник из внешнего acting_as(), а если нет и его, то
+        регистрация запрещается (REGISTRATION_FAILED)"""
+        self.waitlist = waitlist
+        self.timetable = timetable
+        self.principal = principal
+
+    def _acting(self):
+        return acting_as(self.principal) if self.principal is not None else nullcontext()
+
     def enroll_student(self, student: Student, course: Courses) -> bool:
         """Шаблонный метод, определяющий общую структуру процесса записи"""
-        self.log_action(f"Начало процесса записи студента {student.get_name()} на курс {course.get_course_name()}")
+        return self.try_enroll(student, course).success
 
-        if not self._verify_student_eligibility(student):
-            self.notify("Студент не соответствует требованиям")
-            return False
+    def try_enroll(self, student: Student, course: Courses) -> EnrollmentResult:
+        """Шаблонный метод записи с причиной отказа.
 
-        if not self._check_course_availability(course):
-            self.notify("Курс недоступен для записи")
-            return False
+        Проверка мест и регистрация выполняются под блокировкой курса,
+        поэтому параллельные вызовы из разных потоков не переполняют курс.
+        При включенных метриках (set_metrics) время каждого шага пишется
+        в enrollment_step_seconds, итог - в enrollment_requests_total.
+        """
+        metrics = _metrics
+        name = started = lap = None
+        if metrics is not None:
+            name = type(self).__name__
+            started = time.perf_counter()
+        self.log_action(f"Начало процесса записи студента {student.get_name()} на курс {course.get_course_name()}")
 
-        if not self._register_student(student, course):
-            self.notify("Ошибка при регистрации")
-            return False
+        if metrics is not None:
+            lap = time.perf_counter()
+        eligible = self._verify_student_eligibility(student)
+        if metrics is not None:
+            lap = metrics.lap('enrollment_step_seconds', (name, 'eligibility'), lap)
+        if not eligible:
+            self.notify(self.NOT_ELIGIBLE, student.get_email())
+            return self._finish_enrollment(metrics, started, EnrollmentResult(student, course, False,
+                                                                              self.NOT_ELIGIBLE))
+
+        reason = None
+        with course.get_lock():
+            if metrics is not None:
+                lap = metrics.lap('enrollment_step_seconds', (name, 'lock_wait'), lap)
+            available = self._check_course_availability(course)
+            if metrics is not None:
+                lap = metrics.lap('enrollment_step_seconds', (name, 'availability'), lap)
+            if not available:
+                reason = self.NOT_AVAILABLE
+                if self.waitlist and course.add_to_waitlist(student):
+                    reason = self.WAITLISTED
+            elif not self._book_schedule(student, course):
+                reason = self.SCHEDULE_CONFLICT
+            else:
+                if metrics is not None and self.timetable is not None:
+                    lap = metrics.lap('enrollment_step_seconds', (name, 'schedule'), lap)
+                with self._acting():
+                    registered = self._register_student(student, course)
+                if metrics is not None:
+                    lap = metrics.lap('enrollment_step_seconds', (name, 'registration'), lap)
+                if not registered:
+                    reason = self.REGISTRATION_FAILED
+                    self._release_schedule(student, course)
+        if reason is not None:
+            self.notify(reason, student.get_email())
+            return self._finish_enrollment(metrics, started, EnrollmentResult(student, course, False, reason))
 
+        if metrics is not None:
+            lap = time.perf_counter()
         self._process_payment(student, course)
+        if metrics is not None:
+            lap = metrics.lap('enrollment_step_seconds', (name, 'payment'), lap)
         self._send_confirmation(student, course)
+        if metrics is not None:
+            lap = metrics.lap('enrollment_step_seconds', (name, 'confirmation'), lap)
         self._post_registration_actions(student, course)
+        if metrics is not None:
+            metrics.lap('enrollment_step_seconds', (name, 'post_registration'), lap)
 
         self.log_action(f"Студент {student.get_name()} успешно записан на курс {course.get_course_name()}")
-        return True
+        return self._finish_enrollment(metrics, started, EnrollmentResult(student, course, True))
+
+    def _finish_enrollment(self, metrics: Optional["MetricsRegistry"], started: Optional[float],
+                           result: EnrollmentResult) -> EnrollmentResult:
+        """Итог try_enroll: при включенных метриках - общее время и счетчик по итогу"""
+        if metrics is not None:
+            name = type(self).__name__
+            metrics.observe('enrollment_step_seconds', (name, 'total'), time.perf_counter() - started)
+            metrics.inc('enrollment_requests_total', (name, self.RESULT_LABELS.get(result.reason, 'failed')))
+        return result
+
+    def promote_waitlist(self, course: Courses) -> List[EnrollmentResult]:
+        """Записывает студентов из листа ожидания на освободившиеся места"""
+        results = []
+        with course.get_lock():
+            while self._check_course_availability(course):
+                student = course.pop_waitlist()
+                if student is None:
+                    break
+                if not self._book_schedule(student, course):
+                    results.append(EnrollmentResult(student, course, False, self.SCHEDULE_CONFLICT))
+                    continue
+                with self._acting():
+                    registered = self._register_student(student, course)
+                if not registered:
+                    self._release_schedule(student, course)
+                results.append(EnrollmentResult(student, course, registered,
+                                                None if registered else self.REGISTRATION_FAILED))
+        accepted = [(result.student, course) for result in results if result.success]
+        if accepted:
+            self._process_payments(accepted)
+            self._send_confirmations(accepted)
+            self._post_registration_actions_many(accepted)
+            self.log_action(f"Из листа ожидания на курс {course.get_course_name()} записано: {len(accepted)}")
+        return results
+
+    def enroll_many(self, pairs) -> List[EnrollmentResult]:
+        """Пакетная версия шаблонного метода для пар (студент, курс).
+
+        Проверки выполняются для всего пакета сразу, регистрация - одним
+        проходом по каждому курсу. Исключения не выбрасываются: для каждой
+        пары возвращается EnrollmentResult в исходном порядке (пара не из
+        Student и Courses получает отказ). Лог и уведомления пишутся один
+        раз на пакет. Итоговое состояние, включая порядок курсов у
+        студентов, совпадает с поочередным вызовом try_enroll.
+        """
+        pairs = list(pairs)
+        results: List[Optional[EnrollmentResult]] = [None] * len(pairs)
+        self.log_action(f"Начало пакетной записи: {len(pairs)} заявок")
+
+        valid = []
+        for index, (student, course) in enumerate(pairs):
+            if not isinstance(student, Student):
+                results[index] = EnrollmentResult(student, course, False, self.NOT_ELIGIBLE)
+            elif not isinstance(course, Courses):
+                results[index] = EnrollmentResult(student, course, False, self.NOT_AVAILABLE)
+            else:
+                valid.append(index)
+
+        # проверка требований: каждый студент проверяется один раз
+        unique_students = {id(pairs[index][0]): pairs[index][0] for index in valid}
+        eligible = dict(zip(unique_students,
+                            self._verify_students_eligibility(list(unique_students.values()))))
+
+        # группировка по курсам с сохранением порядка заявок
+        by_course = {}
+        for index in valid:
+            student, course = pairs[index]
+            if not eligible[id(student)]:
+                results[index] = EnrollmentResult(student, course, False, self.NOT_ELIGIBLE)
+            else:
+                by_course.setdefault(id(course), (course, []))[1].append(index)
+
+        accepted_indices = []
+        for course, indices in by_course.values():
+            with course.get_lock():
+                accepted_indices.extend(self._enroll_course_batch(pairs, indices, course, results))
+        accepted_indices.sort()
+        accepted = [pairs[index] for index in accepted_indices]
+        # курсы добавляются студентам в порядке заявок, а не курсов пакета
+        for student, course in accepted:
+            student.set_courses([course.get_course_name()])
+
+        if accepted:
+            self._process_payments(accepted)
+            self._send_confirmations(accepted)
+            self._post_registration_actions_many(accepted)
+
+        metrics = _metrics
+        if metrics is not None:
+            name = type(self).__name__
+            for reason, count in Counter(result.reason for result in results).items():
+                metrics.inc('enrollment_requests_total', (name, self.RESULT_LABELS.get(reason, 'failed')), count)
+
+        failed = [result for result in results if not result.success and isinstance(result.student, Student)]
+        if failed:
+            self.notify_many((result.student.get_email(), result.reason) for result in failed)
+        self.log_action(f"Пакетная запись завершена: успешно {len(accepted)} из {len(pairs)}")
+        return results
+
+    def _enroll_course_batch(self, pairs, indices, course: Courses, results) -> List[int]:
+        """Регистрация заявок на один курс под его блокировкой.
+
+        Итоги пишутся в results, возвращаются индексы успешных заявок.
+        Место занимает только успешная регистрация, поэтому заявки
+        регистрируются порциями: порция заканчивается, когда места
+        исчерпаны или студент порции подает заявку повторно, и следующие
+        заявки решаются уже по итогам регистрации предыдущих - как при
+        поочередной записи.
+        """
+        free = self._free_places(course)
+        roster = course.get_roster()
+        accepted = []
+        position = 0
+        while position < len(indices):
+            batch = {}
+            while position < len(indices):
+                index = indices[position]
+                student = pairs[index][0]
+                key = student.identity_key()
+                places = None if free is None else free - len(batch)
+                full = places is not None and places <= 0
+                if key in batch or (full and batch):
+                    break
+                position += 1
+                if student in roster:
+                    # повторная запись не занимает место и не попадает в лист
+                    # ожидания: как у try_enroll, отказ зависит только от мест
+                    reason = self.NOT_AVAILABLE if full else self.REGISTRATION_FAILED
+                    results[index] = EnrollmentResult(student, course, False, reason)
+                elif full:
+                    reason = self.NOT_AVAILABLE
+                    if self.waitlist and course.add_to_waitlist(student):
+                        reason = self.WAITLISTED
+                    results[index] = EnrollmentResult(student, course, False, reason)
+                elif not self._book_schedule(student, course):
+                    results[index] = EnrollmentResult(student, course, False, self.SCHEDULE_CONFLICT)
+                else:
+                    batch[key] = index
+            if not batch:
+                continue
+            candidates = list(batch.values())
+            try:
+                with self._acting():
+                    registered = course.enroll_many([pairs[index][0] for index in candidates],
+                                                    update_students=False)
+            except Exception as e:
+                self.log_action(f"Ошибка пакетной регистрации на курс {course.get_course_name()}: {str(e)}")
+                registered = [EnrollmentResult(pairs[index][0], course, False, str(e)) for index in candidates]
+            for index, result in zip(candidates, registered):
+                if result.success:
+                    results[index] = result
+                    accepted.append(index)
+                    if free is not None:
+                        free -= 1
+                else:
+                    self._release_schedule(result.student, course)
+                    results[index] = EnrollmentResult(result.student, course, False, self.REGISTRATION_FAILED)
+        return accepted
+
+    def _book_schedule(self, student: Student, course: Courses) -> bool:
+        return self.timetable is None or self.timetable.book_student(student, course)
+
+    def _release_schedule(self, student: Student, course: Courses):
+        if self.timetable is not None:
+            self.timetable.release_student(student, course)
+
+    def _free_places(self, course: Courses) -> Optional[int]:
+        """Количество свободных мест на курсе (None - без ограничений)"""
+        if self.course_limit is None:
+            return None
+        return self.course_limit - len(course.get_roster())
 
     # Шаги процесса (абстрактные методы)
     @abstractmethod
@@ -653,7 +3767,25 @@ class EnrollmentProcess(ABC, LoggingMixin, NotificationMixin):
     def _post_registration_actions(self, student: Student, course: Courses):
         pass
 
+    # Пакетные шаги процесса (по умолчанию - через поштучные)
+    def _verify_students_eligibility(self, students: List[Student]) -> List[bool]:
+        return [self._verify_student_eligibility(student) for student in students]
+
+    def _process_payments(self, pairs):
+        for student, course in pairs:
+            self._process_payment(student, course)
+
+    def _send_confirmations(self, pairs):
+        for student, course in pairs:
+            self._send_confirmation(student, course)
+
+    def _post_registration_actions_many(self, pairs):
+        for student, course in pairs:
+            self._post_registration_actions(student, course)
+
 class OnlineEnrollmentProcess(EnrollmentProcess):
+    course_limit = 100  # Лимит для онлайн-курсов
+
     def _verify_student_eligibility(self, student: Student) -> bool:
         """Проверка технических требований для онлайн-курса"""
         print("Проверка email и доступа к платформе...")
@@ -662,7 +3794,7 @@ class OnlineEnrollmentProcess(EnrollmentProcess):
     def _check_course_availability(self, course: Courses) -> bool:
         """Проверка свободных мест в онлайн-курсе"""
         print("Проверка доступности онлайн-курса...")
-        return len(course.get_students()) < 100  # Лимит для онлайн-курсов
+        return self._free_places(course) > 0
 
     def _register_student(self, student: Student, course: Courses) -> bool:
         """Онлайн-регистрация"""
@@ -681,9 +3813,23 @@ class OnlineEnrollmentProcess(EnrollmentProcess):
     def _send_confirmation(self, student: Student, course: Courses):
         """Электронное подтверждение"""
         print(f"Отправка email-подтверждения на {student.get_email()}")
-        self.notify(f"Вы записаны на онлайн-курс {course.get_course_name()}")
+        self.notify(f"Вы записаны на онлайн-курс {course.get_course_name()}", student.get_email())
+
+    def _verify_students_eligibility(self, students: List[Student]) -> List[bool]:
+        print(f"Проверка email и доступа к платформе для {len(students)} студентов...")
+        return ["@" in student.get_email() for student in students]
+
+    def _process_payments(self, pairs):
+        print(f"Перенаправление на платежный шлюз: {len(pairs)} платежей...")
+
+    def _send_confirmations(self, pairs):
+        print(f"Отправка email-подтверждений: {len(pairs)}")
+        self.notify_many((student.get_email(), f"Вы записаны на онлайн-курс {course.get_course_name()}")
+                         for student, course in pairs)
 
 class OfflineEnrollmentProcess(EnrollmentProcess):
+    course_limit = 30  # Лимит для очных курсов
+
     def _verify_student_eligibility(self, student: Student) -> bool:
         """Проверка документов для очного обучения"""
         print("Проверка документов и возраста студента...")
@@ -692,7 +3838,7 @@ class OfflineEnrollmentProcess(EnrollmentProcess):
     def _check_course_availability(self, course: Courses) -> bool:
         """Проверка мест в аудитории"""
         print("Проверка свободных мест в аудитории...")
-        return len(course.get_students()) < 30  # Лимит для очных курсов
+        return self._free_places(course) > 0
 
     def _register_student(self, student: Student, course: Courses) -> bool:
         """Очная регистрация"""
@@ -711,17 +3857,37 @@ class OfflineEnrollmentProcess(EnrollmentProcess):
     def _send_confirmation(self, student: Student, course: Courses):
         """Печатное подтверждение"""
         print(f"Печать справки о зачислении для {student.get_name()}")
-        self.notify(f"Ваша заявка на курс {course.get_course_name()} одобрена")
+        self.notify(f"Ваша заявка на курс {course.get_course_name()} одобрена", student.get_email())
 
     def _post_registration_actions(self, student: Student, course: Courses):
         """Дополнительные действия после регистрации"""
         print(f"Выдача студенческого билета {student.get_st_id()}")
 
+    def _verify_students_eligibility(self, students: List[Student]) -> List[bool]:
+        print(f"Проверка документов и возраста для {len(students)} студентов...")
+        return [student.get_age() >= 18 for student in students]
+
+    def _process_payments(self, pairs):
+        print(f"Выписка квитанций для оплаты в кассе: {len(pairs)}")
+
+    def _send_confirmations(self, pairs):
+        print(f"Печать справок о зачислении: {len(pairs)}")
+        self.notify_many((student.get_email(), f"Ваша заявка на курс {course.get_course_name()} одобрена")
+                         for student, course in pairs)
+
+    def _post_registration_actions_many(self, pairs):
+        print(f"Выдача студенческих билетов: {len(pairs)}")
+
 
 class StandardEnrollment(EnrollmentProcess):
-    def _check_availability(self, course: Courses) -> bool:
+    course_limit = 30  # Лимит 30 студентов
+
+    def _verify_student_eligibility(self, student: Student) -> bool:
+        return True
+
+    def _check_course_availability(self, course: Courses) -> bool:
         
-        return len(course.get_students()) < 30  # Лимит 30 студентов
+        return self._free_places(course) > 0
 
     def _register_student(self, student: Student, course: Courses) -> bool:
         try:
@@ -731,14 +3897,139 @@ class StandardEnrollment(EnrollmentProcess):
             self.log_action(f"Ошибка записи: {str(e)}")
             return False
 
+    def _process_payment(self, student: Student, course: Courses):
+        pass
+
     def _send_confirmation(self, student: Student, course: Courses):
-        self.notify(f"Вы записаны на курс {course.get_course_name()}")
+        self.notify(f"Вы записаны на курс {course.get_course_name()}", student.get_email())
         student.set_courses([course.get_course_name()])
 
+    def _verify_students_eligibility(self, students: List[Student]) -> List[bool]:
+        return [True] * len(students)
+
+    def _process_payments(self, pairs):
+        pass
+
+    def _send_confirmations(self, pairs):
+        for student, course in pairs:
+            student.set_courses([course.get_course_name()])
+        self.notify_many((student.get_email(), f"Вы записаны на курс {course.get_course_name()}")
+                         for student, course in pairs)
+
+
+class ConcurrentEnrollment:
+    """Параллельная запись через пул потоков.
+
+    Каждая заявка проходит шаблонный метод process.try_enroll, где проверка
+    мест и регистрация выполняются под блокировкой своего курса: заявки на
+    разные курсы не мешают друг другу, а курс не переполняется.
+    """
+
+    def __init__(self, process: EnrollmentProcess, max_workers: int = 64):
+        self.process = process
+        self.max_workers = max_workers
+
+    def run(self, pairs) -> List[EnrollmentResult]:
+        """Обрабатывает пары (студент, курс), результаты - в исходном порядке"""
+        return self._map(lambda pair: self.process.try_enroll(*pair), pairs)
+
+    def promote_all(self, courses) -> List[EnrollmentResult]:
+        """Параллельно переводит студентов из листов ожидания на свободные места"""
+        return [result for results in self._map(self.process.promote_waitlist, courses)
+                for result in results]
 
+    def _map(self, func, items) -> list:
+        # acting_as() вызывающего не наследуется потоками пула: передаем явно
+        principal = get_acting_principal()
 
+        def call(item):
+            with acting_as(principal):
+                return func(item)
+
+        with ThreadPoolExecutor(max_workers=self.max_workers) as pool:
+            return list(pool.map(call, items))
 
 # Функции для работы с JSON
+
+class IdentityMap:
+    """Карта идентичности для загрузки: person_id -> единственный объект Person"""
+
+    def __init__(self, people=()):
+        self._people: Dict[int, Person] = {}
+        for person in people:
+            self.add(person)
+
+    def add(self, person: Person) -> Person:
+        """Регистрирует человека; если id уже занят, возвращает существующий объект"""
+        return self._people.setdefault(person.get_id(), person)
+
+    def get(self, person_id, default=None):
+        return self._people.get(person_id, default)
+
+    def resolve(self, person_id) -> Person:
+        person = self._people.get(person_id)
+        if person is None:
+            raise ValueError(f"Ссылка на неизвестного человека: person_id={person_id}")
+        return person
+
+    def get_or_create_many(self, data, default_cls=None) -> list:
+        """Пакетный get_or_create: новые люди создаются через from_dict_many своего класса"""
+        data = data if isinstance(data, list) else list(data)
+        new_by_class: Dict[type, Dict[int, Dict]] = {}
+        for item in data:
+            person_id = item['person_id']
+            if person_id in self._people:
+                continue
+            cls = PersonMeta.registry.get(item.get('class_name'), default_cls)
+            if cls is None:
+                raise ValueError(f"Неизвестный тип записи: {item.get('class_name')}")
+            new_by_class.setdefault(cls, {}).setdefault(person_id, item)
+        for cls, items in new_by_class.items():
+            for person in cls.from_dict_many(items.values()):
+                self._people.setdefault(person.get_id(), person)
+        return [self._people[item['person_id']] for item in data]
+
+    def get_or_create(self, data: Dict, default_cls=None) -> Person:
+        """Возвращает уже загруженного человека или создает его из словаря"""
+        person = self._people.get(data['person_id'])
+        if person is None:
+            cls = PersonMeta.registry.get(data.get('class_name'), default_cls)
+            if cls is None:
+                raise ValueError(f"Неизвестный тип записи: {data.get('class_name')}")
+            person = self._people[data['person_id']] = cls.from_dict(data)
+        return person
+
+    def __contains__(self, person_id) -> bool:
+        return person_id in self._people
+
+    def __len__(self) -> int:
+        return len(self._people)
+
+
+def iter_normalized_records(students, teachers, courses):
+    """Генератор нормализованных записей ('student' | 'teacher' | 'course', dict).
+
+    Каждый человек выдается один раз; курсы ссылаются на людей по person_id.
+    Люди, которые есть в курсах, но не переданы в students/teachers,
+    выдаются перед первым курсом, который на них ссылается.
+    """
+    written = set()
+    for kind, people in (('student', students), ('teacher', teachers)):
+        for person in people:
+            if person.get_id() not in written:
+                written.add(person.get_id())
+                yield kind, person.to_dict()
+    for course in courses:
+        teacher = course.get_course_teacher()
+        if teacher is not None and teacher.get_id() not in written:
+            written.add(teacher.get_id())
+            yield 'teacher', teacher.to_dict()
+        for student in course.get_roster():
+            if student.get_id() not in written:
+                written.add(student.get_id())
+                yield 'student', student.to_dict()
+        yield 'course', course.to_ref_dict()
+
 def save_to_json(data, filename: str):
     with open(filename, 'w', encoding='utf-8') as f:
         json.dump(data, f, ensure_ascii=False, indent=2)
@@ -747,27 +4038,1101 @@ def load_from_json(filename: str):
     with open(filename, 'r', encoding='utf-8') as f:
         return json.load(f)
 
+# Потоковый формат JSON Lines: первая строка - заголовок, далее одна
+# сущность на строку (студенты, преподаватели, курсы). Тип сущности
+# определяется полем class_name.
+# Версия 1 хранила курсы с вложенными людьми, версия 2 - со ссылками.
+JSONL_FORMAT = {'format': 'university-jsonl', 'version': 2}
+
+
+def iter_jsonl_lines(students, teachers, courses):
+    """Генератор строк JSON Lines; принимает любые итерируемые, в том числе генераторы"""
+    dumps = json.JSONEncoder(ensure_ascii=False, separators=(',', ':')).encode
+    yield dumps(JSONL_FORMAT) + '\n'
+    for kind, record in iter_normalized_records(students, teachers, courses):
+        if kind == 'course':
+            record['class_name'] = 'Courses'
+        yield dumps(record) + '\n'
+
+
+def save_to_jsonl(students, teachers, courses, filename: str):
+    with open(filename, 'w', encoding='utf-8') as f:
+        f.writelines(iter_jsonl_lines(students, teachers, courses))
+
+
+def iter_load_jsonl(filename: str):
+    """Читает файл JSON Lines построчно и по одному отдает Student/Teacher/Courses.
+
+    Каждый человек создается и выдается один раз, курсы получают ссылки
+    на те же объекты.
+    """
+    identity_map = IdentityMap()
+    with open(filename, 'r', encoding='utf-8') as f:
+        header = json.loads(f.readline() or 'null')
+        if not isinstance(header, dict) or header.get('format') != JSONL_FORMAT['format']:
+            raise ValueError(f"Файл {filename} не в формате {JSONL_FORMAT['format']}")
+        normalized = header.get('version', 1) >= 2
+        for line in f:
+            if not line.strip():
+                continue
+            record = json.loads(line)
+            class_name = record.get('class_name')
+            if class_name != 'Courses' and record.get('person_id') in identity_map:
+                continue
+            # объект создается без логирования, но выдается вне quiet_construction:
+            # иначе флаг остается выключенным, пока вызывающий держит генератор
+            with quiet_construction():
+                if class_name != 'Courses':
+                    obj = identity_map.get_or_create(record)
+                elif normalized:
+                    obj = Courses.from_ref_dict(record, identity_map)
+                else:
+                    obj = Courses.from_dict(record, identity_map)
+            yield obj
+
+
+# Бинарный снимок системы: заголовок с таблицей секций, записи
+# фиксированной длины, общая таблица строк и отсортированный индекс
+# person_id -> номер записи. Файл открывается через mmap за O(1),
+# объекты Student/Teacher/Courses создаются лениво при обращении.
+SNAPSHOT_SUFFIX = '.usnap'
+SNAPSHOT_MAGIC = b'UNIVSNAP'
+SNAPSHOT_VERSION = 1
+_NO_REF = -2 ** 63
+
+_SNAPSHOT_SECTIONS = ('strings', 'students', 'teachers', 'courses', 'items',
+                      'strrefs', 'ids', 'student_index', 'teacher_index')
+# magic, версия, затем (смещение, количество) для каждой секции
+_SNAPSHOT_HEADER = struct.Struct('<8sH' + 'QQ' * len(_SNAPSHOT_SECTIONS))
+# строки задаются парой (смещение в таблице строк, длина в байтах)
+# person_id, student_id/teacher_id, class_name, name, age, email, (начало, длина) списка
+_PERSON_RECORD = struct.Struct('<qqQIQIiQIQI')
+# courses_id, course_name, person_id преподавателя, студенты, расписание, материалы
+_COURSE_RECORD = struct.Struct('<qQIqQIQIQI')
+_ITEM_RECORD = struct.Struct('<QIi')      # строка + число (курс и оценка, день и время)
+_STRREF_RECORD = struct.Struct('<QI')
+_ID_RECORD = struct.Struct('<q')
+_INDEX_RECORD = struct.Struct('<qQ')      # person_id, номер записи
+
+
+class _SnapshotSection:
+    """Секция снимка при записи: временный файл и число записей"""
+
+    def __init__(self):
+        self.file = tempfile.TemporaryFile()
+        self.count = 0
+        self.size = 0
+
+    def append(self, data: bytes, count: int = 1) -> int:
+        """Дописывает записи, возвращает номер первой из них"""
+        start = self.count
+        self.file.write(data)
+        self.count += count
+        self.size += len(data)
+        return start
+
+
+class _SnapshotWriter:
+    """Собирает нормализованные записи в секции бинарного снимка"""
+
+    def __init__(self):
+        self.sections = {name: _SnapshotSection() for name in _SNAPSHOT_SECTIONS[:-2]}
+        self._interned: Dict[str, tuple] = {}
+        self._index = {'students': (array('q'), array('Q')), 'teachers': (array('q'), array('Q'))}
+
+    def _string(self, text: str, intern: bool = False) -> tuple:
+        """Добавляет строку в таблицу; повторяющиеся строки (intern=True) хранятся один раз"""
+        if intern:
+            ref = self._interned.get(text)
+            if ref is not None:
+                return ref
+        data = text.encode('utf-8')
+        strings = self.sections['strings']
+        ref = (strings.size, len(data))
+        strings.append(data, len(data))
+        if intern:
+            self._interned[text] = ref
+        return ref
+
+    def _items(self, pairs) -> tuple:
+        data = b''.join(_ITEM_RECORD.pack(*self._string(text, intern=True), value) for text, value in pairs)
+        return self.sections['items'].append(data, len(data) // _ITEM_RECORD.size), len(data) // _ITEM_RECORD.size
+
+    def _strrefs(self, texts, intern: bool) -> tuple:
+        data = b''.join(_STRREF_RECORD.pack(*self._string(text, intern)) for text in texts)
+        return self.sections['strrefs'].append(data, len(data) // _STRREF_RECORD.size), len(data) // _STRREF_RECORD.size
+
+    def add(self, kind: str, record: Dict):
+        if kind == 'course':
+            students = record['student_ids']
+            teacher_id = record['teacher_id']
+            self.sections['courses'].append(_COURSE_RECORD.pack(
+                record['courses_id'],
+                *self._string(record['course_name'], intern=True),
+                _NO_REF if teacher_id is None else teacher_id,
+                self.sections['ids'].append(b''.join(_ID_RECORD.pack(pid) for pid in students), len(students)),
+                len(students),
+                *self._items(record['schedule'].items()),
+                *self._strrefs(record['materials'], intern=True)))
+            return
+
+        if kind == 'student':
+            section = 'students'
+            grades = record['grades']
+            courses = list(record['courses']) + [c for c in grades if c not in record['courses']]
+            extra = self._items((course, grades.get(course, GradeStore.MISSING)) for course in courses)
+            own_id = record['student_id']
+        else:
+            section = 'teachers'
+            extra = self._strrefs(record['subjects'], intern=True)
+            own_id = record['teacher_id']
+        number = self.sections[section].append(_PERSON_RECORD.pack(
+            record['person_id'], own_id,
+            *self._string(record['class_name'], intern=True),
+            *self._string(record['name']),
+            record['age'],
+            *self._string(record['email']),
+            *extra))
+        ids, numbers = self._index[section]
+        ids.append(record['person_id'])
+        numbers.append(number)
+
+    def write(self, filename: str):
+        with open(filename, 'wb') as f:
+            f.write(b'\0' * _SNAPSHOT_HEADER.size)
+            table = []
+            for name in _SNAPSHOT_SECTIONS[:-2]:
+                section = self.sections[name]
+                table += [f.tell(), section.count]
+                section.file.seek(0)
+                shutil.copyfileobj(section.file, f)
+                section.file.close()
+            for name in ('students', 'teachers'):
+                ids, numbers = self._index[name]
+                order = sorted(range(len(ids)), key=ids.__getitem__)
+                table += [f.tell(), len(order)]
+                f.write(b''.join(_INDEX_RECORD.pack(ids[i], numbers[i]) for i in order))
+            f.seek(0)
+            f.write(_SNAPSHOT_HEADER.pack(SNAPSHOT_MAGIC, SNAPSHOT_VERSION, *table))
+
+
+def save_binary_snapshot(students, teachers, courses, filename: str):
+    """Записывает бинарный снимок; данные читаются потоково из iter_normalized_records"""
+    writer = _SnapshotWriter()
+    for kind, record in iter_normalized_records(students, teachers, courses):
+        writer.add(kind, record)
+    writer.write(filename)
+
+
+class _IndexKeys:
+    """Последовательность person_id из индекса снимка (для bisect)"""
+
+    def __init__(self, mm, offset: int, count: int):
+        self._mm, self._offset, self._count = mm, offset, count
+
+    def __len__(self):
+        return self._count
+
+    def __getitem__(self, i):
+        return _INDEX_RECORD.unpack_from(self._mm, self._offset + i * _INDEX_RECORD.size)[0]
+
+
+class _SnapshotIdentityMap(IdentityMap):
+    """Карта идентичности, которая при промахе ищет человека в снимке"""
+
+    def __init__(self, snapshot: "BinarySnapshot"):
+        super().__init__()
+        self._snapshot = snapshot
+
+    def resolve(self, person_id) -> Person:
+        person = self.get(person_id)
+        if person is None:
+            person = self._snapshot.find_person(person_id)
+            if person is None:
+                raise ValueError(f"Ссылка на неизвестного человека: person_id={person_id}")
+        return person
+
+
+class SnapshotRecords:
+    """Ленивая последовательность объектов одной секции снимка"""
+
+    def __init__(self, snapshot: "BinarySnapshot", section: str):
+        self._snapshot = snapshot
+        self._section = section
+
+    def __len__(self) -> int:
+        return self._snapshot.count(self._section)
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return [self[i] for i in range(*index.indices(len(self)))]
+        if index < 0:
+            index += len(self)
+        return self._snapshot.materialize(self._section, index)
+
+    def __iter__(self):
+        for i in range(len(self)):
+            yield self._snapshot.materialize(self._section, i)
+
+
+class BinarySnapshot:
+    """Бинарный снимок, открытый через mmap.
+
+    Открытие читает только заголовок. Объекты создаются при первом
+    обращении и кэшируются: люди - в карте идентичности, поэтому курсы
+    ссылаются на те же объекты Student/Teacher.
+    """
+
+    def __init__(self, filename: str, grade_store: Optional[GradeStore] = None):
+        self._grade_store = grade_store
+        with open(filename, 'rb') as f:
+            self._mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        header = _SNAPSHOT_HEADER.unpack_from(self._mm, 0)
+        if header[0] != SNAPSHOT_MAGIC or header[1] != SNAPSHOT_VERSION:
+            self._mm.close()
+            raise ValueError(f"Файл {filename} не является снимком версии {SNAPSHOT_VERSION}")
+        self._sections = {name: (header[2 + 2 * i], header[3 + 2 * i])
+                          for i, name in enumerate(_SNAPSHOT_SECTIONS)}
+        self._strings = self._sections['strings'][0]
+        self.identity_map = _SnapshotIdentityMap(self)
+        self._courses: Dict[int, Courses] = {}
+        self.students = SnapshotRecords(self, 'students')
+        self.teachers = SnapshotRecords(self, 'teachers')
+        self.courses = SnapshotRecords(self, 'courses')
+
+    def count(self, section: str) -> int:
+        return self._sections[section][1]
+
+    def _unpack(self, section: str, record: struct.Struct, index: int) -> tuple:
+        offset, count = self._sections[section]
+        if not 0 <= index < count:
+            raise IndexError(f"{section}: индекс {index} вне диапазона")
+        return record.unpack_from(self._mm, offset + index * record.size)
+
+    def _string(self, offset: int, length: int) -> str:
+        start = self._strings + offset
+        return str(self._mm[start:start + length], 'utf-8')
+
+    def _list(self, section: str, record: struct.Struct, start: int, count: int) -> list:
+        offset = self._sections[section][0] + start * record.size
+        return list(record.iter_unpack(self._mm[offset:offset + count * record.size]))
+
+    def person_dict(self, section: str, index: int) -> Dict:
+        """Словарь в формате to_dict() для записи человека"""
+        (person_id, own_id, cls_off, cls_len, name_off, name_len, age,
+         email_off, email_len, start, count) = self._unpack(section, _PERSON_RECORD, index)
+        data = {
+            'person_id': person_id,
+            'name': self._string(name_off, name_len),
+            'age': age,
+            'email': self._string(email_off, email_len),
+            'class_name': self._string(cls_off, cls_len),
+        }
+        if section == 'students':
+            items = [(self._string(off, length), value)
+                     for off, length, value in self._list('items', _ITEM_RECORD, start, count)]
+            data['student_id'] = own_id
+            data['courses'] = [course for course, _ in items]
+            data['grades'] = {course: grade for course, grade in items if grade != GradeStore.MISSING}
+        else:
+            data['teacher_id'] = own_id
+            data['subjects'] = [self._string(off, length)
+                                for off, length in self._list('strrefs', _STRREF_RECORD, start, count)]
+        return data
+
+    def course_ref_dict(self, index: int) -> Dict:
+        """Словарь в формате to_ref_dict() для записи курса"""
+        (courses_id, name_off, name_len, teacher_id, students_start, students_count,
+         schedule_start, schedule_count, materials_start, materials_count) = \
+            self._unpack('courses', _COURSE_RECORD, index)
+        return {
+            'courses_id': courses_id,
+            'course_name': self._string(name_off, name_len),
+            'teacher_id': None if teacher_id == _NO_REF else teacher_id,
+            'student_ids': [pid for pid, in self._list('ids', _ID_RECORD, students_start, students_count)],
+            'schedule': {self._string(off, length): value for off, length, value
+                         in self._list('items', _ITEM_RECORD, schedule_start, schedule_count)},
+            'materials': [self._string(off, length) for off, length
+                          in self._list('strrefs', _STRREF_RECORD, materials_start, materials_count)],
+        }
+
+    def materialize(self, section: str, index: int):
+        """Объект записи index секции section (создается при первом обращении)"""
+        if section == 'courses':
+            course = self._courses.get(index)
+            if course is None:
+                with quiet_construction():
+                    course = Courses.from_ref_dict(self.course_ref_dict(index), self.identity_map)
+                self._courses[index] = course
+            return course
+        person_id = self._unpack(section, _PERSON_RECORD, index)[0]
+        person = self.identity_map.get(person_id)
+        if person is None:
+            with quiet_construction(), grade_store_scope(self._grade_store):
+                person = self.identity_map.get_or_create(self.person_dict(section, index))
+        return person
+
+    def find_person(self, person_id) -> Optional[Person]:
+        """Ищет человека по person_id двоичным поиском по индексу снимка"""
+        person = self.identity_map.get(person_id)
+        if person is not None:
+            return person
+        for section, index in (('students', 'student_index'), ('teachers', 'teacher_index')):
+            offset, count = self._sections[index]
+            position = bisect_left(_IndexKeys(self._mm, offset, count), person_id)
+            if position < count:
+                found_id, number = _INDEX_RECORD.unpack_from(self._mm, offset + position * _INDEX_RECORD.size)
+                if found_id == person_id:
+                    return self.materialize(section, number)
+        return None
+
+    def close(self):
+        self._mm.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+def open_snapshot(filename: str, grade_store: Optional[GradeStore] = None) -> BinarySnapshot:
+    return BinarySnapshot(filename, grade_store)
+
+
+def _is_jsonl(filename: str) -> bool:
+    return filename.endswith('.jsonl')
+
+
 def save_system_data(students: list[Student], teachers: list[Teacher], courses: list[Courses], filename: str):
+    """Сохраняет систему; для файлов .jsonl - потоково, для .usnap - в бинарный снимок"""
+    if _is_jsonl(filename):
+        save_to_jsonl(students, teachers, courses, filename)
+        return
+    if filename.endswith(SNAPSHOT_SUFFIX):
+        save_binary_snapshot(students, teachers, courses, filename)
+        return
     data = {
-        'students': [s.to_dict() for s in students],
-        'teachers': [t.to_dict() for t in teachers],
-        'courses': [c.to_dict() for c in courses]
+        'format': 'university',
+        'version': 2,
+        'students': [],
+        'teachers': [],
+        'courses': []
     }
+    for kind, record in iter_normalized_records(students, teachers, courses):
+        data[kind + 's'].append(record)
     save_to_json(data, filename)
 
-def load_system_data(filename: str) -> tuple:
+def load_system_data(filename: str, grade_store: Optional[GradeStore] = None) -> tuple:
+    """Загружает систему: списки студентов, преподавателей и курсов.
+
+    Снимок .usnap читается целиком и закрывается до возврата; для
+    ленивого доступа без загрузки всех объектов - open_snapshot() (его
+    закрывает вызывающий: close() или with). grade_store - хранилище оценок загруженных студентов (по умолчанию
+    Student.grade_store); повторная загрузка тех же студентов заменяет
+    их прежние строки, а не добавляет новые.
+    """
+    if filename.endswith(SNAPSHOT_SUFFIX):
+        with open_snapshot(filename, grade_store) as snapshot:
+            return list(snapshot.students), list(snapshot.teachers), list(snapshot.courses)
+    if _is_jsonl(filename):
+        students, teachers, courses = [], [], []
+        with grade_store_scope(grade_store):
+            for obj in iter_load_jsonl(filename):
+                if isinstance(obj, Student):
+                    students.append(obj)
+                elif isinstance(obj, Teacher):
+                    teachers.append(obj)
+                else:
+                    courses.append(obj)
+        return students, teachers, courses
+
     data = load_from_json(filename)
+    identity_map = IdentityMap()
     
-    students = [Student.from_dict(s) for s in data['students']]
-    teachers = [Teacher.from_dict(t) for t in data['teachers']]
-    courses = [Courses.from_dict(c) for c in data['courses']]
+    with quiet_construction(), grade_store_scope(grade_store):
+        students = identity_map.get_or_create_many(data['students'], Student)
+        teachers = identity_map.get_or_create_many(data['teachers'], Teacher)
+        if data.get('version', 1) >= 2:
+            courses = Courses.from_ref_dict_many(data['courses'], identity_map)
+        else:
+            courses = Courses.from_dict_many(data['courses'], identity_map)
     
     return students, teachers, courses
 
 
 
+#Инкрементальное сохранение: журнал изменений
+
+def _encode_change_arg(value):
+    if isinstance(value, Person):
+        return {'ref': value.get_id()}
+    return value
+
+
+class ChangeJournal:
+    """Журнал изменений поверх полного снимка системы.
+
+    Подключенный журнал (attach) получает события от сеттеров и мутаторов
+    курсов, копит их в памяти и помечает измененные сущности как грязные.
+    commit() дописывает накопленные записи в файл JSON Lines и делает fsync,
+    поэтому периодическое сохранение стоит O(изменений). Каждая строка
+    снабжена CRC32: поврежденные строки при воспроизведении пропускаются,
+    а оборванный после сбоя хвост обрезается (recover) перед первой
+    дозаписью, чтобы новые записи не склеивались с ним. Все операции идемпотентны, так что повторное
+    воспроизведение поверх свежего снимка (сбой во время compact)
+    безопасно. compact() пишет полный снимок и очищает журнал.
+    """
+
+    def __init__(self, path: str, fsync: bool = True):
+        self.path = path
+        self.fsync = fsync
+        self._pending: List[str] = []
+        self._dirty = set()
+        self._recovered = False
+        self._encode = json.JSONEncoder(ensure_ascii=False, separators=(',', ':')).encode
+
+    def attach(self) -> "ChangeJournal":
+        add_change_listener(self._record)
+        return self
+
+    def detach(self):
+        remove_change_listener(self._record)
+
+    def __enter__(self):
+        return self.attach()
+
+    def __exit__(self, *exc):
+        self.detach()
+        self.commit()
+
+    def _record(self, obj, op: str, args: tuple):
+        if isinstance(obj, Person):
+            kind, key = 'person', obj.get_id()
+        elif isinstance(obj, Courses):
+            kind, key = 'course', obj.get_course_id()
+        else:
+            return
+        if op == 'created':
+            args = [obj.to_ref_dict() if kind == 'course' else obj.to_dict()]
+        else:
+            args = [_encode_change_arg(arg) for arg in args]
+        self._dirty.add((kind, key))
+        self._pending.append(self._encode({'kind': kind, 'id': key, 'op': op, 'args': args}))
+
+    @property
+    def dirty(self) -> frozenset:
+        """Сущности (kind, id), измененные после последнего commit()"""
+        return frozenset(self._dirty)
+
+    @property
+    def pending(self) -> int:
+        return len(self._pending)
+
+    def commit(self) -> int:
+        """Дописывает накопленные изменения в журнал, возвращает их количество"""
+        if not self._pending:
+            return 0
+        if not self._recovered:
+            self.recover(self.path, self.fsync)
+            self._recovered = True
+        data = ''.join(f"{zlib.crc32(line.encode('utf-8')):08x} {line}\n" for line in self._pending)
+        with open(self.path, 'a', encoding='utf-8') as f:
+            f.write(data)
+            f.flush()
+            if self.fsync:
+                os.fsync(f.fileno())
+        written = len(self._pending)
+        self._pending.clear()
+        self._dirty.clear()
+        return written
+
+    def compact(self, students, teachers, courses, snapshot_path: str):
+        """Сохраняет полный снимок (атомарно через os.replace) и очищает журнал"""
+        self.commit()
+        root, ext = os.path.splitext(snapshot_path)
+        tmp_path = f"{root}.tmp{ext}"
+        save_system_data(students, teachers, courses, tmp_path)
+        if self.fsync:
+            with open(tmp_path, 'rb') as f:
+                os.fsync(f.fileno())
+        os.replace(tmp_path, snapshot_path)
+        with open(self.path, 'w', encoding='utf-8') as f:
+            if self.fsync:
+                os.fsync(f.fileno())
+        self._recovered = True
+
+    @staticmethod
+    def _decode_line(line: bytes) -> Optional[Dict]:
+        """Запись из строки журнала или None, если строка оборвана или повреждена"""
+        if not line.endswith(b'\n') or len(line) < 10 or line[8:9] != b' ':
+            return None
+        body = line[9:-1]
+        try:
+            if int(line[:8], 16) != zlib.crc32(body):
+                return None
+            return json.loads(body)
+        except ValueError:
+            return None
+
+    @staticmethod
+    def _scan(path: str):
+        """Пары (смещение конца строки, запись или None) по всему файлу"""
+        with open(path, 'rb') as f:
+            offset = 0
+            for line in f:
+                offset += len(line)
+                yield offset, ChangeJournal._decode_line(line)
+
+    @staticmethod
+    def iter_entries(path: str):
+        """Целые записи журнала; поврежденные строки пропускаются с предупреждением"""
+        if not os.path.exists(path):
+            return
+        for _, entry in ChangeJournal._scan(path):
+            if entry is None:
+                logger.warning("Журнал %s: поврежденная запись пропущена", path)
+                continue
+            yield entry
+
+    @staticmethod
+    def recover(path: str, fsync: bool = True) -> int:
+        """Обрезает журнал по концу последней целой записи, возвращает число отброшенных байт.
+
+        После сбоя в конце файла может остаться оборванная запись; без
+        обрезки следующий commit() дописал бы свои записи в ту же строку.
+        """
+        if not os.path.exists(path):
+            return 0
+        good = 0
+        for end, entry in ChangeJournal._scan(path):
+            if entry is not None:
+                good = end
+        size = os.path.getsize(path)
+        if good < size:
+            logger.warning("Журнал %s: отброшен поврежденный хвост (%d байт)", path, size - good)
+            with open(path, 'r+b') as f:
+                f.truncate(good)
+                if fsync:
+                    os.fsync(f.fileno())
+        return size - good
+
+    @staticmethod
+    def replay(path: str, students: list, teachers: list, courses: list) -> int:
+        """Применяет журнал к загруженным спискам (новые сущности дописываются в них)"""
+        people = IdentityMap(students)
+        for teacher in teachers:
+            people.add(teacher)
+        courses_by_id = {course.get_course_id(): course for course in courses}
+
+        def decode(value):
+            if isinstance(value, dict) and set(value) == {'ref'}:
+                return people.resolve(value['ref'])
+            return value
+
+        applied = 0
+        with suspend_change_tracking(), quiet_construction():
+            for entry in ChangeJournal.iter_entries(path):
+                op, args = entry['op'], entry['args']
+                if entry['kind'] == 'course':
+                    if op == 'created':
+                        if entry['id'] not in courses_by_id:
+                            course = Courses.from_ref_dict(args[0], people)
+                            courses_by_id[entry['id']] = course
+                            courses.append(course)
+                        applied += 1
+                        continue
+                    course = courses_by_id.get(entry['id'])
+                    if course is None:
+                        raise ValueError(f"Журнал ссылается на неизвестный курс: {entry['id']}")
+                    args = [decode(arg) for arg in args]
+                    if op == 'add_student':
+                        if args[0] not in course.get_roster():
+                            course.add_student(args[0])
+                    elif op == 'remove_student':
+                        course.remove_student(args[0])
+                    else:
+                        getattr(course, op)(*args)
+                else:
+                    if op == 'created':
+                        if entry['id'] not in people:
+                            person = people.get_or_create(args[0])
+                            (students if isinstance(person, Student) else teachers).append(person)
+                        applied += 1
+                        continue
+                    person = people.resolve(entry['id'])
+                    if op == 'set_courses':
+                        for course_name in args[0]:
+                            if course_name not in person.get_courses():
+                                person._add_course(course_name)
+                    elif op == 'set_subjects':
+                        if args[0] not in person.get_subjects():
+                            person.set_subjects(args[0])
+                    else:
+                        getattr(person, op)(*args)
+                applied += 1
+        return applied
+
+
+def load_with_journal(snapshot_path: str, journal_path: str) -> tuple:
+    """Загружает снимок и воспроизводит поверх него журнал изменений.
+
+    Оборванный хвост журнала обрезается, так что после загрузки в журнал
+    можно сразу дописывать.
+    """
+    if os.path.exists(snapshot_path):
+        students, teachers, courses = load_system_data(snapshot_path)
+    else:
+        students, teachers, courses = [], [], []
+    ChangeJournal.recover(journal_path)
+    ChangeJournal.replay(journal_path, students, teachers, courses)
+    return students, teachers, courses
+
+
+#Каталог со вторичными индексами
+
+class UniversityCatalog:
+    """Каталог людей и курсов со вторичными индексами.
+
+    Индексы: person_id, email -> человек, student_id -> Student,
+    название/id курса -> Courses, преподаватель -> его курсы,
+    студент -> его курсы. Подключенный каталог (attach) получает события
+    изменений: новые объекты, созданные через PersonMeta и Courses,
+    индексируются автоматически, а set_email, add_student, remove_student
+    и set_teacher обновляют индексы. Все запросы выполняются за O(1).
+    """
+
+    def __init__(self, students=(), teachers=(), courses=()):
+        self._people: Dict[int, Person] = {}
+        self._by_email: Dict[str, Person] = {}
+        self._email_of: Dict[int, str] = {}
+        self._students: Dict[int, Student] = {}
+        self._courses: Dict[int, Courses] = {}
+        self._course_by_name: Dict[str, Courses] = {}
+        self._teacher_of: Dict[int, Optional[int]] = {}
+        self._teacher_courses: Dict[int, Dict[int, Courses]] = {}
+        self._student_courses: Dict[object, Dict[int, Courses]] = {}
+        self.index(students, teachers, courses)
+
+    def attach(self) -> "UniversityCatalog":
+        add_change_listener(self._on_change)
+        return self
+
+    def detach(self):
+        remove_change_listener(self._on_change)
+
+    def __enter__(self):
+        return self.attach()
+
+    def __exit__(self, *exc):
+        self.detach()
+
+    #наполнение
+    def index(self, students=(), teachers=(), courses=()):
+        for person in students:
+            self.add_person(person)
+        for person in teachers:
+            self.add_person(person)
+        for course in courses:
+            self.add_course(course)
+
+    def add_person(self, person: Person):
+        person_id = person.get_id()
+        if self._people.get(person_id) is person:
+            return
+        self.discard_person(person_id)
+        self._people[person_id] = person
+        self._set_email(person, person.get_email())
+        if isinstance(person, Student):
+            self._students[person.get_st_id()] = person
+
+    def discard_person(self, person_id: int):
+        person = self._people.pop(person_id, None)
+        if person is None:
+            return
+        email = self._email_of.pop(person_id, None)
+        if self._by_email.get(email) is person:
+            del self._by_email[email]
+        if isinstance(person, Student) and self._students.get(person.get_st_id()) is person:
+            del self._students[person.get_st_id()]
+
+    def add_course(self, course: Courses):
+        course_id = course.get_course_id()
+        if self._courses.get(course_id) is not course:
+            self.discard_course(course_id)
+        self._courses[course_id] = course
+        self._course_by_name[course.get_course_name()] = course
+        teacher = course.get_course_teacher()
+        if teacher is not None:
+            self.add_person(teacher)
+        self._set_teacher(course, teacher)
+        for student in course.get_roster():
+            self.add_person(student)
+            self._student_courses.setdefault(student.identity_key(), {})[course_id] = course
+
+    def discard_course(self, course_id: int):
+        course = self._courses.pop(course_id, None)
+        if course is None:
+            return
+        if self._course_by_name.get(course.get_course_name()) is course:
+            del self._course_by_name[course.get_course_name()]
+        self._set_teacher(course, None)
+        self._teacher_of.pop(course_id, None)
+        for student in course.get_roster():
+            self._student_courses.get(student.identity_key(), {}).pop(course_id, None)
+
+    def _set_email(self, person: Person, email: str):
+        person_id = person.get_id()
+        old = self._email_of.get(person_id)
+        if old is not None and self._by_email.get(old) is person:
+            del self._by_email[old]
+        self._email_of[person_id] = email
+        self._by_email[email] = person
+
+    def _set_teacher(self, course: Courses, teacher: Optional[Teacher]):
+        course_id = course.get_course_id()
+        old = self._teacher_of.get(course_id)
+        if old is not None:
+            self._teacher_courses.get(old, {}).pop(course_id, None)
+        new = teacher.get_id() if teacher is not None else None
+        self._teacher_of[course_id] = new
+        if new is not None:
+            self._teacher_courses.setdefault(new, {})[course_id] = course
+
+    def _on_change(self, obj, op: str, args: tuple):
+        if isinstance(obj, Person):
+            if op == 'created':
+                self.add_person(obj)
+            elif op == 'set_email' and self._people.get(obj.get_id()) is obj:
+                self._set_email(obj, args[0])
+        elif isinstance(obj, Courses):
+            if op == 'created':
+                self.add_course(obj)
+            elif self._courses.get(obj.get_course_id()) is not obj:
+                return
+            elif op == 'add_student':
+                self.add_person(args[0])
+                self._student_courses.setdefault(args[0].identity_key(), {})[obj.get_course_id()] = obj
+            elif op == 'remove_student':
+                self._student_courses.get(args[0].identity_key(), {}).pop(obj.get_course_id(), None)
+            elif op == 'set_teacher':
+                self.add_person(args[0])
+                self._set_teacher(obj, args[0])
+
+    #запросы
+    def person(self, person_id: int) -> Optional[Person]:
+        return self._people.get(person_id)
+
+    def by_email(self, email: str) -> Optional[Person]:
+        return self._by_email.get(email)
+
+    def student(self, student_id: int) -> Optional[Student]:
+        return self._students.get(student_id)
+
+    def course(self, course_name: str) -> Optional[Courses]:
+        return self._course_by_name.get(course_name)
+
+    def course_by_id(self, course_id: int) -> Optional[Courses]:
+        return self._courses.get(course_id)
+
+    def courses_of_teacher(self, teacher: Teacher) -> List[Courses]:
+        return list(self._teacher_courses.get(teacher.get_id(), {}).values())
+
+    def courses_of_student(self, student: Student) -> List[Courses]:
+        return list(self._student_courses.get(student.identity_key(), {}).values())
+
+    def __len__(self) -> int:
+        return len(self._people)
+
+
+#Хранилище на SQLite
+
+class SQLiteRepository:
+    """Репозиторий Student/Teacher/Courses поверх sqlite3.
+
+    Люди лежат в таблице persons (класс восстанавливается через
+    PersonMeta.registry), оценки - в grades с индексом (course_name, grade),
+    записи на курсы - в enrollments. Запись выполняется пакетами через
+    executemany внутри транзакций. SQL-тексты постоянные, поэтому sqlite3
+    компилирует каждый запрос один раз и дальше берет его из кэша
+    подготовленных выражений. Чтение идет страницами по ключу, без
+    загрузки всей базы в память.
+    """
+
+    SCHEMA = """
+    CREATE TABLE IF NOT EXISTS persons (
+        person_id  INTEGER PRIMARY KEY,
+        class_name TEXT    NOT NULL,
+        name       TEXT    NOT NULL,
+        age        INTEGER NOT NULL,
+        email      TEXT    NOT NULL,
+        role_id    INTEGER,
+        items      TEXT    NOT NULL DEFAULT '[]'
+    );
+    CREATE INDEX IF NOT EXISTS persons_email ON persons(email);
+    CREATE INDEX IF NOT EXISTS persons_class ON persons(class_name, person_id);
+    CREATE TABLE IF NOT EXISTS grades (
+        person_id   INTEGER NOT NULL,
+        course_name TEXT    NOT NULL,
+        grade       INTEGER NOT NULL,
+        PRIMARY KEY (person_id, course_name)
+    );
+    CREATE INDEX IF NOT EXISTS grades_course ON grades(course_name, grade);
+    CREATE TABLE IF NOT EXISTS courses (
+        courses_id  INTEGER PRIMARY KEY,
+        course_name TEXT NOT NULL,
+        teacher_id  INTEGER,
+        schedule    TEXT NOT NULL DEFAULT '{}',
+        materials   TEXT NOT NULL DEFAULT '[]'
+    );
+    CREATE INDEX IF NOT EXISTS courses_name ON courses(course_name);
+    CREATE INDEX IF NOT EXISTS courses_teacher ON courses(teacher_id);
+    CREATE TABLE IF NOT EXISTS enrollments (
+        courses_id INTEGER NOT NULL,
+        person_id  INTEGER NOT NULL,
+        position   INTEGER NOT NULL,
+        PRIMARY KEY (courses_id, person_id)
+    );
+    CREATE INDEX IF NOT EXISTS enrollments_person ON enrollments(person_id);
+    """
+
+    _UPSERT_PERSON = """
+    INSERT INTO persons (person_id, class_name, name, age, email, role_id, items)
+    VALUES (?, ?, ?, ?, ?, ?, ?)
+    ON CONFLICT(person_id) DO UPDATE SET
+        class_name = excluded.class_name, name = excluded.name, age = excluded.age,
+        email = excluded.email, role_id = excluded.role_id, items = excluded.items
+    """
+    _DELETE_GRADES = "DELETE FROM grades WHERE person_id = ?"
+    _INSERT_GRADE = "INSERT INTO grades (person_id, course_name, grade) VALUES (?, ?, ?)"
+    _UPSERT_COURSE = """
+    INSERT INTO courses (courses_id, course_name, teacher_id, schedule, materials)
+    VALUES (?, ?, ?, ?, ?)
+    ON CONFLICT(courses_id) DO UPDATE SET
+        course_name = excluded.course_name, teacher_id = excluded.teacher_id,
+        schedule = excluded.schedule, materials = excluded.materials
+    """
+    _DELETE_ENROLLMENTS = "DELETE FROM enrollments WHERE courses_id = ?"
+    _INSERT_ENROLLMENT = "INSERT INTO enrollments (courses_id, person_id, position) VALUES (?, ?, ?)"
+    _PERSON_COLUMNS = "person_id, class_name, name, age, email, role_id, items"
+
+    def __init__(self, path: str = ':memory:'):
+        self._conn = sqlite3.connect(path, cached_statements=256)
+        self._conn.executescript(self.SCHEMA)
+
+    def close(self):
+        self._conn.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    #запись
+    @staticmethod
+    def _batches(items, batch_size: int):
+        batch = []
+        for item in items:
+            batch.append(item)
+            if len(batch) >= batch_size:
+                yield batch
+                batch = []
+        if batch:
+            yield batch
+
+    def upsert_people(self, people, batch_size: int = 1000) -> int:
+        """Вставляет или обновляет людей пакетами, каждый пакет - одна транзакция"""
+        return self._upsert_person_records((person.to_dict() for person in people), batch_size)
+
+    def _upsert_person_records(self, records, batch_size: int) -> int:
+        total = 0
+        for batch in self._batches(records, batch_size):
+            rows, grades = [], []
+            for data in batch:
+                if 'student_id' in data:
+                    role_id, items = data['student_id'], data['courses']
+                    grades.extend((data['person_id'], course, grade) for course, grade in data['grades'].items())
+                else:
+                    role_id, items = data.get('teacher_id'), data.get('subjects', [])
+                rows.append((data['person_id'], data['class_name'], data['name'], data['age'],
+                             data['email'], role_id, json.dumps(items, ensure_ascii=False)))
+            with self._conn:
+                self._conn.executemany(self._UPSERT_PERSON, rows)
+                self._conn.executemany(self._DELETE_GRADES, ((row[0],) for row in rows))
+                self._conn.executemany(self._INSERT_GRADE, grades)
+            total += len(batch)
+        return total
+
+    def upsert_courses(self, courses, batch_size: int = 1000) -> int:
+        """Вставляет или обновляет курсы и их списки студентов (люди сохраняются отдельно)"""
+        return self._upsert_course_records((course.to_ref_dict() for course in courses), batch_size)
+
+    def _upsert_course_records(self, records, batch_size: int) -> int:
+        total = 0
+        for batch in self._batches(records, batch_size):
+            rows, enrollments = [], []
+            for data in batch:
+                rows.append((data['courses_id'], data['course_name'], data['teacher_id'],
+                             json.dumps(data['schedule'], ensure_ascii=False),
+                             json.dumps(data['materials'], ensure_ascii=False)))
+                enrollments.extend((data['courses_id'], person_id, position)
+                                   for position, person_id in enumerate(data['student_ids']))
+            with self._conn:
+                self._conn.executemany(self._UPSERT_COURSE, rows)
+                self._conn.executemany(self._DELETE_ENROLLMENTS, ((row[0],) for row in rows))
+                self._conn.executemany(self._INSERT_ENROLLMENT, enrollments)
+            total += len(batch)
+        return total
+
+    def save_system(self, students, teachers, courses, batch_size: int = 1000):
+        """Сохраняет всю систему (включая людей, которые есть только в курсах)"""
+        people, course_records = [], []
+        for kind, record in iter_normalized_records(students, teachers, courses):
+            (course_records if kind == 'course' else people).append(record)
+            if len(people) >= batch_size:
+                self._upsert_person_records(people, batch_size)
+                people = []
+        self._upsert_person_records(people, batch_size)
+        self._upsert_course_records(course_records, batch_size)
+
+    #чтение
+    def _hydrate(self, rows, identity_map: Optional[IdentityMap] = None) -> list:
+        """Создает объекты из строк persons; оценки студентов читаются одним запросом"""
+        identity_map = identity_map if identity_map is not None else IdentityMap()
+        student_ids = [row[0] for row in rows
+                       if row[0] not in identity_map and self._is_student(row[1])]
+        grades: Dict[int, Dict[str, int]] = {}
+        for start in range(0, len(student_ids), 500):
+            chunk = student_ids[start:start + 500]
+            query = (f"SELECT person_id, course_name, grade FROM grades "
+                     f"WHERE person_id IN ({','.join('?' * len(chunk))})")
+            for person_id, course_name, grade in self._conn.execute(query, chunk):
+                grades.setdefault(person_id, {})[course_name] = grade
+        records = []
+        for person_id, class_name, name, age, email, role_id, items in rows:
+            if person_id in identity_map:
+                records.append({'person_id': person_id})
+                continue
+            data = {'person_id': person_id, 'class_name': class_name,
+                    'name': name, 'age': age, 'email': email}
+            if self._is_student(class_name):
+                courses = json.loads(items)
+                own_grades = grades.get(person_id, {})
+                # оценки в порядке списка курсов студента
+                ordered = {course: own_grades[course] for course in courses if course in own_grades}
+                ordered.update(own_grades)
+                data.update(student_id=role_id, courses=courses, grades=ordered)
+            else:
+                data.update(teacher_id=role_id, subjects=json.loads(items))
+            records.append(data)
+        return identity_map.get_or_create_many(records)
+
+    @staticmethod
+    def _is_student(class_name: str) -> bool:
+        cls = PersonMeta.registry.get(class_name)
+        if cls is None:
+            raise ValueError(f"Класс {class_name} не найден в реестре классов")
+        return issubclass(cls, Student)
+
+    def get_person(self, person_id: int) -> Optional[Person]:
+        row = self._conn.execute(
+            f"SELECT {self._PERSON_COLUMNS} FROM persons WHERE person_id = ?", (person_id,)).fetchone()
+        return self._hydrate([row])[0] if row else None
+
+    def find_by_email(self, email: str) -> List[Person]:
+        rows = self._conn.execute(
+            f"SELECT {self._PERSON_COLUMNS} FROM persons WHERE email = ?", (email,)).fetchall()
+        return self._hydrate(rows)
+
+    def iter_people(self, class_name: Optional[str] = None, page_size: int = 500):
+        """Постранично отдает людей (по возрастанию person_id), при желании одного класса"""
+        last_id = None
+        while True:
+            conditions, params = [], []
+            if class_name is not None:
+                conditions.append("class_name = ?")
+                params.append(class_name)
+            if last_id is not None:
+                conditions.append("person_id > ?")
+                params.append(last_id)
+            where = f"WHERE {' AND '.join(conditions)}" if conditions else ""
+            rows = self._conn.execute(
+                f"SELECT {self._PERSON_COLUMNS} FROM persons {where} ORDER BY person_id LIMIT ?",
+                params + [page_size]).fetchall()
+            if not rows:
+                return
+            yield from self._hydrate(rows)
+            last_id = rows[-1][0]
+
+    def iter_courses(self, page_size: int = 100):
+        """Постранично отдает курсы; люди внутри одной итерации не дублируются"""
+        identity_map = IdentityMap()
+        last_id = None
+        while True:
+            rows = self._conn.execute(
+                "SELECT courses_id, course_name, teacher_id, schedule, materials FROM courses "
+                "WHERE ? IS NULL OR courses_id > ? ORDER BY courses_id LIMIT ?",
+                (last_id, last_id, page_size)).fetchall()
+            if not rows:
+                return
+            for courses_id, course_name, teacher_id, schedule, materials in rows:
+                student_ids = [person_id for person_id, in self._conn.execute(
+                    "SELECT person_id FROM enrollments WHERE courses_id = ? ORDER BY position", (courses_id,))]
+                self._load_people([teacher_id] + student_ids if teacher_id is not None else student_ids,
+                                  identity_map)
+                # выдается вне quiet_construction: флаг логирования глобальный
+                with quiet_construction():
+                    course = Courses.from_ref_dict({
+                        'courses_id': courses_id, 'course_name': course_name, 'teacher_id': teacher_id,
+                        'student_ids': student_ids, 'schedule': json.loads(schedule),
+                        'materials': json.loads(materials)}, identity_map)
+                yield course
+            last_id = rows[-1][0]
+
+    def _load_people(self, person_ids, identity_map: IdentityMap):
+        missing = [person_id for person_id in person_ids if person_id not in identity_map]
+        for start in range(0, len(missing), 500):
+            chunk = missing[start:start + 500]
+            rows = self._conn.execute(
+                f"SELECT {self._PERSON_COLUMNS} FROM persons WHERE person_id IN ({','.join('?' * len(chunk))})",
+                chunk).fetchall()
+            self._hydrate(rows, identity_map)
+
+    def students_in_course(self, course_name: str, grade_below: Optional[int] = None,
+                           page_size: int = 500):
+        """Студенты курса (в порядке записи), при grade_below - только с оценкой ниже порога"""
+        columns = ', '.join('p.' + column for column in self._PERSON_COLUMNS.split(', '))
+        sql = (f"SELECT c.courses_id, {columns}, e.position "
+               "FROM courses c JOIN enrollments e ON e.courses_id = c.courses_id "
+               "JOIN persons p ON p.person_id = e.person_id ")
+        params: list = [course_name]
+        if grade_below is not None:
+            sql += "JOIN grades g ON g.person_id = e.person_id AND g.course_name = c.course_name "
+        sql += "WHERE c.course_name = ? "
+        if grade_below is not None:
+            sql += "AND g.grade < ? "
+            params.append(grade_below)
+        sql += "AND (c.courses_id, e.position) > (?, ?) ORDER BY c.courses_id, e.position LIMIT ?"
+        identity_map = IdentityMap()
+        last = (-2 ** 63, -1)
+        while True:
+            rows = self._conn.execute(sql, params + list(last) + [page_size]).fetchall()
+            if not rows:
+                return
+            yield from self._hydrate([row[1:-1] for row in rows], identity_map)
+            last = (rows[-1][0], rows[-1][-1])
+
+    def count(self, class_name: Optional[str] = None) -> int:
+        if class_name is None:
+            return self._conn.execute("SELECT COUNT(*) FROM persons").fetchone()[0]
+        return self._conn.execute("SELECT COUNT(*) FROM persons WHERE class_name = ?",
+                                  (class_name,)).fetchone()[0]
+
+
 def main():
     """Основная функция для демонстрации работы системы."""
+    configure_logging()
     try:
         # Инициализация данных
         teacher = Teacher(1, "Иванова Мария Петровна", 45, "ivanova@univ.ru", 101)
@@ -778,7 +5143,7 @@ def main():
         math_course = Courses(1, "Математика", teacher)
         
         # Запись студентов на курс
-        enrollment = StandardEnrollment()
+        enrollment = StandardEnrollment(principal=teacher)
         enrollment.enroll_student(student1, math_course)
         enrollment.enroll_student(student2, math_course)
         
@@ -814,7 +5179,7 @@ def main():
             print(f"- {student.get_name()}, курсы: {student.get_courses()}")
             
     except Exception as e:
-        logging.error(f"Ошибка в работе системы: {str(e)}")
+        logger.error("Ошибка в работе системы: %s", e)
         raise
 
 if __name__ == "__main__":
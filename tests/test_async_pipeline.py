@@ -0,0 +1,36 @@
+import asyncio
+
+import pytest
+
+from oop_arabov import (AsyncGradeApprovalPipeline, DeanHandler, DepartmentHeadHandler, Student, TeacherHandler,
+                        quiet_construction)
+
+
+def make_chain():
+    chain = TeacherHandler()
+    chain.set_next(DepartmentHeadHandler()).set_next(DeanHandler())
+    return chain
+
+
+def make_student():
+    with quiet_construction():
+        student = Student(1, 'Анна', 20, 'anna@uni.ru', 1)
+    student.set_grade(3, 'Математика')
+    return student
+
+
+def test_submit_requires_a_started_pipeline():
+    student = make_student()
+    pipeline = AsyncGradeApprovalPipeline(make_chain())
+
+    async def scenario():
+        with pytest.raises(RuntimeError):
+            await pipeline.submit(student, 'Математика', 4)
+        async with pipeline:
+            outcome = await pipeline.change_grade(student, 'Математика', 5)
+        with pytest.raises(RuntimeError):
+            await pipeline.submit(student, 'Математика', 4)
+        return outcome
+
+    outcome = asyncio.run(scenario())
+    assert outcome.approved and student.get_grade('Математика') == 5
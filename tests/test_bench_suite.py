@@ -0,0 +1,73 @@
+import json
+
+import pytest
+
+import bench_arabov
+from bench_arabov import compare_results, generate_university, run_suite
+
+
+def summary(university):
+    students, teachers, courses = university
+    return ([student.to_dict() for student in students], [teacher.to_dict() for teacher in teachers],
+            [course.to_ref_dict() for course in courses])
+
+
+def test_generator_is_seeded_and_consistent():
+    with bench_arabov._silenced(), bench_arabov._scratch_material_store():
+        first = generate_university(200, 5, 20, seed=1)
+        again = generate_university(200, 5, 20, seed=1)
+        other = generate_university(200, 5, 20, seed=2)
+    assert summary(first) == summary(again) != summary(other)
+    students, teachers, courses = first
+    assert (len(students), len(teachers), len(courses)) == (200, 5, 20)
+    assert all(2 <= len(student.get_courses()) <= 6 for student in students)
+    assert all(set(student.get_grades()) == set(student.get_courses()) for student in students)
+    for course in courses:
+        assert all(course.get_course_name() in student.get_courses() for student in course.get_students())
+
+
+def test_enrollment_cases_enroll_through_their_process(tmp_path):
+    with bench_arabov._silenced(), bench_arabov._scratch_material_store(str(tmp_path)):
+        university = generate_university(100, 2, 5)
+        cases = dict(bench_arabov._suite_cases(*university, 0, str(tmp_path)))
+        for process_cls in ('OnlineEnrollmentProcess', 'OfflineEnrollmentProcess', 'StandardEnrollment'):
+            ops, run, setup = cases[f'enroll_{process_cls}']
+            process, pairs = setup()
+            run(process, pairs)
+            assert type(process).__name__ == process_cls and len(pairs) == ops
+            # очная запись только для совершеннолетних
+            eligible = [student for student, _ in pairs
+                        if process_cls != 'OfflineEnrollmentProcess' or student.get_age() >= 18]
+            courses = {id(course): course for _, course in pairs}.values()
+            assert sum(len(course.get_students()) for course in courses) == len(eligible) > 0
+
+
+def test_suite_report_is_json():
+    report = json.loads(json.dumps(run_suite(100, repeat=1, cases={'construct_student', 'save_json'})))
+    assert report['format'] == 'university-bench' and report['params']['students'] == 100
+    assert set(report['results']) == {'construct_student', 'save_json'}
+    assert all(stats['seconds'] > 0 and stats['ops'] > 0 for stats in report['results'].values())
+
+
+def run(**seconds):
+    return {'params': {}, 'results': {name: {'seconds': value} for name, value in seconds.items()}}
+
+
+def test_compare_flags_regressions_at_threshold():
+    rows = compare_results(run(same=1.0, edge=1.0, slow=1.0, fast=1.0, gone=1.0),
+                           run(same=1.05, edge=1.1, slow=1.2, fast=0.5, new=1.0), threshold=0.10)
+    assert {row['name']: row['status'] for row in rows} == {
+        'same': 'ok', 'edge': 'ok', 'slow': 'regression', 'fast': 'improvement',
+        'gone': 'removed', 'new': 'added'}
+    assert compare_results(run(), run()) == []
+
+
+def test_compare_cli_fails_on_regression(tmp_path, capsys):
+    base, new = tmp_path / 'base.json', tmp_path / 'new.json'
+    base.write_text(json.dumps(run(case=1.0)), encoding='utf-8')
+    new.write_text(json.dumps(run(case=2.0)), encoding='utf-8')
+    bench_arabov.main(['compare', str(base), str(base)])
+    with pytest.raises(SystemExit) as error:
+        bench_arabov.main(['compare', str(base), str(new)])
+    assert error.value.code == 1
+    assert 'regression' in capsys.readouterr().out
@@ -0,0 +1,51 @@
+from oop_arabov import Courses, Student, Teacher, UniversityCatalog, quiet_construction
+
+
+def make_system():
+    with quiet_construction():
+        teachers = [Teacher(100 + i, f'Преподаватель {i}', 45, f't{i}@uni.ru', i) for i in range(2)]
+        students = [Student(i, f'Студент {i}', 20, f's{i}@uni.ru', 10 + i) for i in range(3)]
+        courses = [Courses(200 + i, f'Курс {i}', teachers[i % 2]) for i in range(3)]
+    courses[0].add_student(students[0])
+    courses[2].add_student(students[0])
+    courses[1].add_student(students[1])
+    return students, teachers, courses
+
+
+def test_queries_over_indexed_system():
+    students, teachers, courses = make_system()
+    catalog = UniversityCatalog(students, teachers, courses)
+    assert len(catalog) == 5
+    assert catalog.by_email('s1@uni.ru') is students[1]
+    assert catalog.student(12) is students[2] and catalog.person(100) is teachers[0]
+    assert catalog.course('Курс 1') is courses[1] and catalog.course_by_id(202) is courses[2]
+    assert catalog.courses_of_teacher(teachers[0]) == [courses[0], courses[2]]
+    assert catalog.courses_of_student(students[0]) == [courses[0], courses[2]]
+    assert catalog.courses_of_student(students[2]) == []
+
+
+def test_empty_catalog_finds_nothing():
+    catalog = UniversityCatalog()
+    assert len(catalog) == 0
+    assert catalog.by_email('nobody@uni.ru') is None and catalog.student(1) is None
+    assert catalog.course('Курс') is None
+
+
+def test_attached_catalog_follows_mutations():
+    students, teachers, courses = make_system()
+    with UniversityCatalog(students, teachers, courses) as catalog:
+        with quiet_construction():
+            newcomer = Student(5, 'Новичок', 19, 'new@uni.ru', 15)
+            course = Courses(205, 'Курс 5', teachers[1])
+        assert catalog.by_email('new@uni.ru') is newcomer and catalog.course('Курс 5') is course
+        students[1].set_email('renamed@uni.ru')
+        assert catalog.by_email('s1@uni.ru') is None and catalog.by_email('renamed@uni.ru') is students[1]
+        courses[1].add_student(newcomer)
+        courses[0].remove_student(students[0])
+        courses[0].set_teacher(teachers[1])
+        assert catalog.courses_of_student(newcomer) == [courses[1]]
+        assert catalog.courses_of_student(students[0]) == [courses[2]]
+        assert catalog.courses_of_teacher(teachers[0]) == [courses[2]]
+        assert courses[0] in catalog.courses_of_teacher(teachers[1])
+    courses[2].add_student(newcomer)
+    assert catalog.courses_of_student(newcomer) == [courses[1]]
@@ -0,0 +1,65 @@
+import os
+from itertools import count
+
+from oop_arabov import ChangeJournal, Student, load_with_journal, quiet_construction
+
+
+person_ids = count(1)
+
+
+def write_changes(journal, *names):
+    with journal, quiet_construction():
+        for name in names:
+            person_id = next(person_ids)
+            Student(person_id, name, 20, f'{name}@uni.ru', person_id)
+
+
+def names(path):
+    students, _, _ = load_with_journal(str(path) + '.json', str(path))
+    return [student.get_name() for student in students]
+
+
+def test_commit_after_torn_tail_keeps_later_records(tmp_path):
+    path = tmp_path / 'changes.jsonl'
+    write_changes(ChangeJournal(str(path), fsync=False), 'anna')
+    # сбой посреди записи: строка оборвана без перевода строки
+    with open(path, 'ab') as f:
+        f.write(b'0badc0de {"kind":"person","id":')
+    write_changes(ChangeJournal(str(path), fsync=False), 'boris')
+    write_changes(ChangeJournal(str(path), fsync=False), 'vera')
+    assert names(path) == ['anna', 'boris', 'vera']
+    with open(path, 'rb') as f:
+        assert b'0badc0de' not in f.read()
+
+
+def test_recover_truncates_to_last_good_record(tmp_path):
+    path = tmp_path / 'changes.jsonl'
+    write_changes(ChangeJournal(str(path), fsync=False), 'anna')
+    size = os.path.getsize(path)
+    with open(path, 'ab') as f:
+        f.write(b'ffffffff {"op"')
+    assert ChangeJournal.recover(str(path), fsync=False) == len(b'ffffffff {"op"')
+    assert os.path.getsize(path) == size
+    assert ChangeJournal.recover(str(path), fsync=False) == 0
+
+
+def test_replay_skips_corrupted_lines(tmp_path):
+    path = tmp_path / 'changes.jsonl'
+    journal = ChangeJournal(str(path), fsync=False)
+    write_changes(journal, 'anna')
+    # испорченная, но целая строка в середине файла
+    with open(path, 'ab') as f:
+        f.write(b'00000000 {"kind":"person"}\n')
+    write_changes(journal, 'boris')
+    assert [entry['args'][0]['name'] for entry in ChangeJournal.iter_entries(str(path))] == ['anna', 'boris']
+    assert names(path) == ['anna', 'boris']
+
+
+def test_load_with_journal_recovers_before_append(tmp_path):
+    path = tmp_path / 'changes.jsonl'
+    write_changes(ChangeJournal(str(path), fsync=False), 'anna')
+    with open(path, 'ab') as f:
+        f.write('d00d {"имя'.encode('utf-8')[:-1])
+    assert names(path) == ['anna']
+    with open(path, 'rb') as f:
+        assert f.read().endswith(b'\n')
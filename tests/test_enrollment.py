@@ -0,0 +1,93 @@
+import pytest
+
+import bench_arabov
+from oop_arabov import Courses, EnrollmentResult, StandardEnrollment, Student, Teacher, quiet_construction
+
+
+class SmallEnrollment(StandardEnrollment):
+    course_limit = 2
+
+
+class Admin:
+    def get_role(self):
+        return 'admin'
+
+
+ADMIN = Admin()
+
+
+def make_world():
+    with quiet_construction():
+        teacher = Teacher(100, 'Иван', 45, 'ivan@uni.ru', 1)
+        courses = [Courses(i, f'Курс {i}', teacher) for i in range(2)]
+        students = [Student(i, f'Студент {i}', 20, f's{i}@uni.ru', i) for i in range(5)]
+    return students, courses
+
+
+# заявки (номер студента, номер курса): повторы внутри пакета и сверх лимита
+REQUESTS = [(0, 0), (1, 0), (0, 0), (2, 0), (0, 1), (0, 1), (3, 0), (1, 1), (4, 1), (2, 1)]
+
+
+def outcome(results, students, courses):
+    return ([(result.success, result.reason) for result in results],
+            [[student.get_id() for student in course.get_students()] for course in courses],
+            [[student.get_id() for student in course.get_waitlist()] for course in courses],
+            [student.get_courses() for student in students])
+
+
+@pytest.mark.parametrize('waitlist', [False, True])
+def test_batch_matches_per_pair_enrollment(capsys, waitlist):
+    students, courses = make_world()
+    process = SmallEnrollment(waitlist=waitlist, principal=ADMIN)
+    expected = outcome([process.try_enroll(students[s], courses[c]) for s, c in REQUESTS], students, courses)
+
+    students, courses = make_world()
+    process = SmallEnrollment(waitlist=waitlist, principal=ADMIN)
+    actual = outcome(process.enroll_many([(students[s], courses[c]) for s, c in REQUESTS]), students, courses)
+    assert actual == expected
+
+
+def test_duplicate_in_full_course_is_not_waitlisted(capsys):
+    students, courses = make_world()
+    process = SmallEnrollment(waitlist=True, principal=ADMIN)
+    results = process.enroll_many([(students[0], courses[0]), (students[1], courses[0]),
+                                   (students[0], courses[0])])
+    assert results[2] == EnrollmentResult(students[0], courses[0], False, process.NOT_AVAILABLE)
+    assert list(courses[0].get_waitlist()) == []
+
+
+def test_concurrent_stress_keeps_courses_consistent():
+    limit = bench_arabov.univ.OfflineEnrollmentProcess.course_limit
+    # 1000 заявок на курс при лимите 30: каждый курс переполнен многократно
+    report = bench_arabov.stress_enrollment(n=4000, workers=64, courses_count=4)
+    assert report['workers'] == 64
+    assert report['violations'] == []
+    assert report['enrolled'] == 4 * limit
+    assert report['waitlisted'] == 4000 - 4 * limit
+
+
+def test_failed_registration_does_not_take_places(capsys):
+    # без участника (principal или acting_as) регистрация запрещена
+    students, courses = make_world()
+    process = SmallEnrollment(waitlist=True)
+    expected = [process.try_enroll(student, courses[0]).reason for student in students]
+
+    students, courses = make_world()
+    results = process.enroll_many([(student, courses[0]) for student in students])
+    assert [result.reason for result in results] == expected == [process.REGISTRATION_FAILED] * len(students)
+    assert list(courses[0].get_waitlist()) == [] and len(courses[0].get_students()) == 0
+
+
+def test_courses_keep_request_order(capsys):
+    students, courses = make_world()
+    SmallEnrollment(principal=ADMIN).enroll_many([(students[1], courses[0]), (students[0], courses[1]),
+                                   (students[0], courses[0])])
+    assert students[0].get_courses() == ['Курс 1', 'Курс 0']
+
+
+def test_invalid_items_get_a_result(capsys):
+    students, courses = make_world()
+    process = SmallEnrollment(principal=ADMIN)
+    results = process.enroll_many([('не студент', courses[0]), (students[0], 'не курс'),
+                                   (students[1], courses[0])])
+    assert [result.reason for result in results] == [process.NOT_ELIGIBLE, process.NOT_AVAILABLE, None]
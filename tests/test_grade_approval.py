@@ -0,0 +1,70 @@
+import pytest
+
+import oop_arabov
+from oop_arabov import (DeanHandler, DepartmentHeadHandler, GradeApprovalEngine, Student, TeacherHandler,
+                        quiet_construction)
+
+DIFFS = [0, 1, -1, 2, -2, 3, -4]
+
+
+def full_chain():
+    chain = TeacherHandler()
+    chain.set_next(DepartmentHeadHandler()).set_next(DeanHandler())
+    return chain
+
+
+@pytest.fixture(params=['numpy', 'python'])
+def backend(request, monkeypatch):
+    if request.param == 'numpy':
+        pytest.importorskip('numpy')
+    else:
+        monkeypatch.setattr(oop_arabov, 'np', None)
+    return request.param
+
+
+def test_thresholds_are_inclusive(backend):
+    engine = GradeApprovalEngine(full_chain())
+    assert engine.levels == ['teacher', 'department_head', 'dean']
+    assert engine.approval_levels(DIFFS) == [0, 0, 0, 1, 1, 2, 2]
+    assert engine.approval_levels([]) == []
+
+
+def test_chain_without_catch_all_rejects(backend):
+    chain = TeacherHandler()
+    chain.set_next(DepartmentHeadHandler())
+    engine = GradeApprovalEngine(chain)
+    assert engine.approval_levels(DIFFS) == [0, 0, 0, 1, 1, 2, 2]
+    requests = [(student, 'M', 1 + diff) for student, diff in zip(make_students(), [0, 3])]
+    groups = engine.evaluate(requests)
+    assert [len(groups[level]) for level in ('teacher', 'department_head', engine.REJECTED)] == [1, 0, 1]
+
+
+def test_earlier_link_with_larger_threshold_wins(backend):
+    # заведующий кафедрой раньше преподавателя: он же одобряет и разницу 1
+    chain = DepartmentHeadHandler()
+    chain.set_next(TeacherHandler())
+    assert GradeApprovalEngine(chain).approval_levels([1, 2, 3]) == [0, 0, 2]
+
+
+def make_students(count=2):
+    with quiet_construction():
+        students = [Student(i, f'Студент {i}', 20, f's{i}@uni.ru', i) for i in range(count)]
+    for student in students:
+        student.set_grade(1, 'M')
+    return students
+
+
+def test_process_groups_and_applies_in_bulk(backend):
+    first, second = make_students()
+    engine = GradeApprovalEngine(full_chain())
+    groups = engine.process([(first, 'M', 2), (second, 'M', 5), (first, 'F', 3)])
+    assert [change.student for change in groups['teacher']] == [first]
+    assert [change.student for change in groups['dean']] == [second]
+    assert groups['department_head'] == [] and groups[engine.REJECTED] == []
+    assert groups[engine.NOT_FOUND][0].course == 'F'
+    assert first.get_grades() == {'M': 2} and second.get_grades() == {'M': 5}
+
+
+def test_empty_batch(backend):
+    groups = GradeApprovalEngine(full_chain()).process([])
+    assert all(changes == [] for changes in groups.values())
@@ -0,0 +1,90 @@
+import gc
+import threading
+
+import pytest
+
+from oop_arabov import (GradeStore, Student, grade_store_scope, load_system_data,
+                        quiet_construction, save_system_data)
+
+
+def make_students(store):
+    with quiet_construction(), grade_store_scope(store):
+        first = Student(1, 'Анна', 20, 'anna@uni.ru', 10)
+        first.set_grade(3, 'M')
+        second = Student(2, 'Борис', 21, 'boris@uni.ru', 11)
+        second.set_grade(5, 'M')
+    return [first, second]
+
+
+@pytest.mark.parametrize('suffix', ['.json', '.jsonl', '.usnap'])
+def test_reload_overwrites_rows(tmp_path, suffix):
+    store = GradeStore()
+    students = make_students(store)
+    filename = str(tmp_path / ('university' + suffix))
+    save_system_data(students, [], [], filename)
+    for _ in range(2):
+        loaded, _, _ = load_system_data(filename, store)
+        loaded = list(loaded)
+        assert store.course_histogram('M') == {3: 1, 5: 1}
+        assert store.top_k(5) == [((2, 11), 5.0), ((1, 10), 3.0)]
+        assert [student.get_grades() for student in loaded] == [{'M': 3}, {'M': 5}]
+
+
+def test_deleted_students_free_rows():
+    store = GradeStore()
+    students = make_students(store)
+    assert len(store) == 2
+    del students
+    gc.collect()
+    assert len(store) == 0
+    assert store.course_histogram('M') == {}
+    assert store.top_k(3) == []
+
+
+def test_released_row_is_reused_clean():
+    store = GradeStore()
+    first, second = make_students(store)
+    first.release_grades()
+    assert first.get_grades() == {}
+    with quiet_construction(), grade_store_scope(store):
+        third = Student(3, 'Вера', 22, 'vera@uni.ru', 12)
+        third.set_grade(4, 'F')
+    assert third.get_grades() == {'F': 4}
+    assert store.course_histogram('M') == {5: 1}
+    assert dict(store.top_k(5)) == {(2, 11): 5.0, (3, 12): 4.0}
+
+
+def test_stores_are_independent():
+    store = GradeStore()
+    make_students(store)
+    other = GradeStore()
+    kept = make_students(other)
+    kept[0].set_grade(4, 'M')
+    Student.set_grades_many([(kept[1], 'M', 2)])
+    assert other.course_histogram('M') == {2: 1, 4: 1}
+    assert len(store) == 0
+
+
+class CollectingKey:
+    """Ключ, чей __hash__ запускает сборку мусора под блокировкой add_rows"""
+
+    def __hash__(self):
+        gc.collect()
+        return id(self)
+
+
+def test_gc_inside_add_rows_does_not_deadlock():
+    store = GradeStore()
+    with quiet_construction(), grade_store_scope(store):
+        student = Student(1, 'Анна', 20, 'anna@uni.ru', 10)
+        student.set_grade(4, 'M')
+    holder = [student]
+    holder.append(holder)
+    del student, holder
+
+    worker = threading.Thread(target=store.add_rows, args=([CollectingKey()],), daemon=True)
+    worker.start()
+    worker.join(5)
+    assert not worker.is_alive()
+    assert len(store) == 1
+    assert store.course_histogram('M') == {}
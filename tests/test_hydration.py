@@ -0,0 +1,71 @@
+from array import array
+
+import pytest
+
+from oop_arabov import (InvalidPersonError, PersonFactory, Student, Teacher, add_change_listener,
+                        quiet_construction, remove_change_listener)
+
+RECORDS = [
+    {'person_id': 1, 'name': 'Анна', 'age': 20, 'email': 'anna@uni.ru', 'student_id': 10,
+     'courses': ['Алгебра'], 'grades': {'Алгебра': 5}},
+    {'person_id': 2, 'name': 'Борис', 'age': 21, 'email': 'boris@uni.ru', 'student_id': 11,
+     'courses': ['Алгебра', 'Физика'], 'grades': {'Физика': 3, 'Химия': 4}},
+    {'person_id': 3, 'name': 'Вера', 'age': 22, 'email': 'vera@uni.ru', 'student_id': 12},
+]
+
+
+def test_bulk_path_matches_from_dict():
+    with quiet_construction():
+        one_by_one = [Student.from_dict(record).to_dict() for record in RECORDS[:2]]
+        bulk = [student.to_dict() for student in Student.from_dict_many(RECORDS)]
+    assert bulk[:2] == one_by_one
+    # один курс в списке не теряется
+    assert bulk[0]['courses'] == ['Алгебра'] and bulk[0]['grades'] == {'Алгебра': 5}
+    assert bulk[2]['courses'] == [] and bulk[2]['grades'] == {}
+
+
+def test_records_and_columns():
+    rows = [(1, 'Иван', 40, 'ivan@uni.ru', 7, ['Алгебра']), (2, 'Петр', 50, 'petr@uni.ru', 8, [])]
+    teachers = Teacher.from_records(rows)
+    assert [teacher.get_subjects() for teacher in teachers] == [['Алгебра'], []]
+    columns = {'person_id': array('q', [1, 2]), 'name': ['Анна', 'Борис'], 'age': [20, 21],
+               'email': ['a@uni.ru', 'b@uni.ru'], 'student_id': range(2)}
+    students = Student.from_columns(columns)
+    assert [student.get_st_id() for student in students] == [0, 1]
+    assert all(type(student.get_id()) is int for student in students)
+    assert Student.from_dict_many([]) == [] and Teacher.from_records([]) == []
+
+
+def test_whole_batch_is_validated_before_creation():
+    created = []
+
+    def listener(obj, op, args):
+        created.append(obj)
+
+    add_change_listener(listener)
+    try:
+        with pytest.raises(InvalidPersonError) as error:
+            Student.from_dict_many(RECORDS + [dict(RECORDS[0], age=0), dict(RECORDS[1], email='нет')])
+    finally:
+        remove_change_listener(listener)
+    assert created == []
+    assert [(index, field) for index, field, _ in error.value.errors] == [(3, 'age'), (4, 'email')]
+
+
+def test_malformed_batches():
+    with pytest.raises(InvalidPersonError):
+        Teacher.from_records([(1, 'Иван', 40, 'ivan@uni.ru')])
+    with pytest.raises(InvalidPersonError):
+        Student.from_columns({'person_id': [1, 2], 'name': ['А'], 'age': [20], 'email': ['a@uni.ru'],
+                              'student_id': [1]})
+
+
+def test_mixed_roster_keeps_order():
+    records = [dict(RECORDS[0], class_name='Student'),
+               {'class_name': 'Teacher', 'person_id': 5, 'name': 'Иван', 'age': 40, 'email': 'i@uni.ru',
+                'teacher_id': 1},
+               dict(RECORDS[1], class_name='Student')]
+    with quiet_construction():
+        people = list(PersonFactory.iter_roster(records, batch_size=2))
+    assert [(type(person).__name__, person.get_id()) for person in people] == [
+        ('Student', 1), ('Teacher', 5), ('Student', 2)]
@@ -0,0 +1,56 @@
+import threading
+
+import pytest
+
+from oop_arabov import BufferedLogSink, LogSink
+
+
+def run_threads(targets):
+    threads = [threading.Thread(target=target) for target in targets]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join(timeout=10)
+    assert not any(thread.is_alive() for thread in threads)
+
+
+def test_writes_racing_close_are_not_lost(tmp_path):
+    path = str(tmp_path / 'log.txt')
+    sink = BufferedLogSink(path, max_buffer=64, flush_size=16, flush_interval=0.01)
+    start = threading.Barrier(5)
+
+    def writer(number):
+        def target():
+            start.wait()
+            for i in range(500):
+                sink.write(f'{number} {i}\n')
+        return target
+
+    def closer():
+        start.wait()
+        sink.close()
+
+    run_threads([writer(number) for number in range(4)] + [closer])
+    with open(path, encoding='utf-8') as f:
+        lines = f.read().splitlines()
+    assert len(lines) == 2000
+    for number in range(4):
+        assert [line for line in lines if line.startswith(f'{number} ')] == [f'{number} {i}' for i in range(500)]
+
+
+def test_flush_racing_close_returns(tmp_path):
+    sink = BufferedLogSink(str(tmp_path / 'log.txt'), flush_interval=10)
+    sink.write('строка\n')
+    run_threads([sink.flush for _ in range(8)] + [sink.close] + [sink.flush for _ in range(8)])
+    sink.write('после закрытия\n')
+    sink.flush()
+    with open(tmp_path / 'log.txt', encoding='utf-8') as f:
+        assert f.read() == 'строка\nпосле закрытия\n'
+
+
+def test_log_sink_requires_write():
+    class Incomplete(LogSink):
+        pass
+
+    with pytest.raises(TypeError):
+        Incomplete()
@@ -0,0 +1,61 @@
+import logging
+import os
+import subprocess
+import sys
+
+import pytest
+
+import oop_arabov
+from oop_arabov import Courses, Student, Teacher, quiet_construction, set_construction_logging
+
+
+class CountingName(str):
+    """Имя, которое считает, сколько раз его форматировали для лога"""
+    formatted = 0
+
+    def __str__(self):
+        CountingName.formatted += 1
+        return str.__str__(self)
+
+
+def test_import_installs_no_handlers(tmp_path):
+    code = ("import logging, oop_arabov; "
+            "print(len(logging.getLogger().handlers), "
+            "[type(handler).__name__ for handler in oop_arabov.logger.handlers])")
+    output = subprocess.run([sys.executable, '-c', code], cwd=tmp_path, capture_output=True, text=True,
+                            env={'PYTHONPATH': os.path.dirname(oop_arabov.__file__)}, check=True)
+    assert output.stdout.split(None, 1) == ['0', "['NullHandler']\n"]
+    assert not (tmp_path / 'university.log').exists()
+
+
+def test_message_is_not_formatted_when_info_is_off(caplog):
+    caplog.set_level(logging.WARNING, logger=oop_arabov.logger.name)
+    CountingName.formatted = 0
+    Student(1, CountingName('Анна'), 20, 'anna@uni.ru', 1)
+    assert CountingName.formatted == 0 and caplog.records == []
+
+
+def test_constructors_log_at_info(caplog):
+    caplog.set_level(logging.INFO, logger=oop_arabov.logger.name)
+    teacher = Teacher(1, 'Иван', 40, 'ivan@uni.ru', 1)
+    Student(2, 'Анна', 20, 'anna@uni.ru', 2)
+    Courses(1, 'Алгебра', teacher)
+    messages = [record.getMessage() for record in caplog.records]
+    assert messages == ['Создан человек: Иван', 'Создан преподаватель: Иван, ID: 1',
+                        'Создан человек: Анна', 'Создан студент: Анна, ID: 2',
+                        'Создан курс: Алгебра, преподаватель: Иван']
+
+
+def test_quiet_construction_silences_and_restores(caplog):
+    caplog.set_level(logging.INFO, logger=oop_arabov.logger.name)
+    with pytest.raises(RuntimeError), quiet_construction():
+        Student(1, 'Анна', 20, 'anna@uni.ru', 1)
+        raise RuntimeError
+    assert caplog.records == []
+    assert oop_arabov._construction_logging
+    assert set_construction_logging(False) is True
+    try:
+        Student(2, 'Борис', 20, 'boris@uni.ru', 2)
+    finally:
+        set_construction_logging(True)
+    assert caplog.records == []
@@ -0,0 +1,50 @@
+import os
+
+import pytest
+
+import oop_arabov
+from oop_arabov import (Courses, IdentityMap, MaterialStore, Teacher, get_material_store, quiet_construction,
+                        set_material_store)
+
+
+@pytest.fixture
+def default_store(monkeypatch):
+    monkeypatch.setattr(oop_arabov, '_material_store', None)
+    yield
+    set_material_store(None)
+
+
+def load_legacy_course(lectures):
+    with quiet_construction():
+        teacher = Teacher(1, 'Иван', 40, 'ivan@uni.ru', 1)
+    [course] = Courses.from_ref_dict_many([{'courses_id': 1, 'course_name': 'Алгебра', 'teacher_id': 1,
+                                            'student_ids': [], 'schedule': {}, 'materials': lectures}],
+                                          IdentityMap([teacher]))
+    return course
+
+
+def test_remove_unreferenced_keeps_tmp_files(tmp_path):
+    store = MaterialStore(str(tmp_path))
+    kept = store.put('Лекция 1')
+    stale = store.put('Лекция 2')
+    in_flight = store.path(stale) + '.123.456.tmp'
+    with open(in_flight, 'wb') as file:
+        file.write(b'partial')
+    assert store.remove_unreferenced([kept]) == 1
+    assert os.path.exists(in_flight)
+    assert kept in store and stale not in store
+
+
+def test_default_root_comes_from_environment(tmp_path, monkeypatch, default_store):
+    monkeypatch.setenv(oop_arabov.MATERIALS_DIR_ENV, str(tmp_path / 'blobs'))
+    assert get_material_store().root == str(tmp_path / 'blobs')
+
+
+def test_loading_legacy_lectures_does_not_touch_disk(tmp_path, monkeypatch, default_store):
+    monkeypatch.delenv(oop_arabov.MATERIALS_DIR_ENV, raising=False)
+    course = load_legacy_course(['Лекция 1', 'Лекция 2'])
+    assert not os.path.exists(oop_arabov.MATERIALS_DIR)
+    assert course.get_lectures() == ['Лекция 1', 'Лекция 2']
+    assert not os.path.exists(oop_arabov.MATERIALS_DIR)
+    refs = course.get_materials()
+    assert all(os.path.exists(get_material_store().path(ref)) for ref in refs)
@@ -0,0 +1,36 @@
+import pytest
+
+from oop_arabov import (Courses, InMemoryMetricsExporter, MetricsExporter, MetricsRegistry, PrometheusFileExporter,
+                        StandardEnrollment, Student, Teacher, collect_metrics, quiet_construction)
+
+
+def test_exporter_requires_export():
+    class Incomplete(MetricsExporter):
+        pass
+
+    with pytest.raises(TypeError):
+        Incomplete()
+
+
+def test_registry_exports_to_every_exporter(tmp_path):
+    memory = InMemoryMetricsExporter()
+    registry = MetricsRegistry(exporters=[memory, PrometheusFileExporter(str(tmp_path / 'metrics.prom'))])
+    registry.inc('enrollment_requests_total', ('StandardEnrollment', 'enrolled'), 2)
+    registry.observe('enrollment_step_seconds', ('StandardEnrollment', 'total'), 0.002)
+    snapshot = registry.export()
+    assert memory.last is snapshot
+    assert snapshot['counters']['enrollment_requests_total'][0]['value'] == 2
+    text = (tmp_path / 'metrics.prom').read_text(encoding='utf-8')
+    assert 'enrollment_requests_total{process="StandardEnrollment",result="enrolled"} 2' in text
+    assert 'enrollment_step_seconds_count{process="StandardEnrollment",step="total"} 1' in text
+
+
+def test_enrollment_records_steps():
+    with quiet_construction():
+        teacher = Teacher(1, 'Иван', 40, 'ivan@uni.ru', 1)
+        course = Courses(1, 'Алгебра', teacher)
+        student = Student(2, 'Анна', 20, 'anna@uni.ru', 1)
+    with collect_metrics() as registry:
+        assert StandardEnrollment(principal=teacher).enroll_student(student, course)
+    counters = registry.snapshot()['counters']['enrollment_requests_total']
+    assert counters == [{'labels': {'process': 'StandardEnrollment', 'result': 'enrolled'}, 'value': 1}]
@@ -0,0 +1,53 @@
+import asyncio
+import threading
+
+import pytest
+
+from oop_arabov import (MemoryTransport, NotificationDispatcher, NotificationOutbox, NotificationTransport,
+                        collect_metrics)
+
+
+def test_transport_requires_send_batch():
+    class Incomplete(NotificationTransport):
+        pass
+
+    with pytest.raises(TypeError):
+        Incomplete()
+
+
+def test_dispatcher_sends_queued_notifications():
+    outbox = NotificationOutbox()
+    outbox.enqueue_many([('a@uni.ru', 'первое'), ('b@uni.ru', 'второе')])
+    transport = MemoryTransport()
+    asyncio.run(NotificationDispatcher(outbox, transport).flush())
+    assert sorted(item.recipient for item in transport.sent) == ['a@uni.ru', 'b@uni.ru']
+    assert len(outbox) == 0
+
+
+def test_overflow_is_counted_and_reported(caplog):
+    outbox = NotificationOutbox(max_size=3)
+    with collect_metrics() as registry:
+        for number in range(5):
+            outbox.enqueue('a@uni.ru', f'письмо {number}')
+        outbox.enqueue_many(('b@uni.ru', f'пачка {number}') for number in range(4))
+    assert outbox.dropped == 6
+    assert [item.message for item in outbox.drain()] == ['пачка 1', 'пачка 2', 'пачка 3']
+    [series] = registry.snapshot()['counters']['notifications_total']
+    assert series == {'labels': {'result': 'dropped'}, 'value': 6}
+    warnings = [record for record in caplog.records if record.levelname == 'WARNING']
+    assert 1 <= len(warnings) < 6
+
+
+def test_concurrent_enqueue_counts_every_drop():
+    outbox = NotificationOutbox(max_size=100)
+
+    def producer():
+        for number in range(2000):
+            outbox.enqueue(None, str(number))
+
+    threads = [threading.Thread(target=producer) for _ in range(4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert outbox.dropped + len(outbox) == 8000
@@ -0,0 +1,76 @@
+import pytest
+
+from oop_arabov import (ConcurrentEnrollment, Courses, PermissionDeniedError, StandardEnrollment, Student,
+                        Teacher, acting_as, get_acting_principal, quiet_construction)
+
+
+def make_course():
+    with quiet_construction():
+        teacher = Teacher(100, 'Иван', 45, 'ivan@uni.ru', 1)
+        course = Courses(1, 'Алгебра', teacher)
+        student = Student(1, 'Анна', 20, 'anna@uni.ru', 1)
+    return teacher, course, student
+
+
+def test_course_does_not_grant_its_teacher_role_to_callers():
+    _, course, student = make_course()
+    with pytest.raises(PermissionDeniedError):
+        course.enroll_student(student)
+    assert course.get_students() == []
+
+
+def test_student_principal_is_denied():
+    _, course, student = make_course()
+    with acting_as(student), pytest.raises(PermissionDeniedError):
+        course.enroll_many([student])
+    assert course.get_students() == []
+
+
+def test_teacher_principal_is_allowed():
+    teacher, course, student = make_course()
+    with acting_as(teacher):
+        course.enroll_student(student)
+    assert course.get_students() == [student]
+    assert get_acting_principal() is None
+
+
+def enroll(process, student, course, batch):
+    if batch:
+        return process.enroll_many([(student, course)])[0]
+    return process.try_enroll(student, course)
+
+
+@pytest.mark.parametrize('batch', [False, True])
+def test_student_principal_is_rejected_on_template_path(capsys, batch):
+    _, course, student = make_course()
+    process = StandardEnrollment(principal=student)
+    assert enroll(process, student, course, batch).reason == process.REGISTRATION_FAILED
+    with acting_as(student):
+        assert enroll(StandardEnrollment(), student, course, batch).reason == process.REGISTRATION_FAILED
+    assert course.get_students() == []
+
+
+@pytest.mark.parametrize('batch', [False, True])
+def test_process_does_not_impersonate_course_teacher(capsys, batch):
+    teacher, course, student = make_course()
+    process = StandardEnrollment()
+    assert enroll(process, student, course, batch).reason == process.REGISTRATION_FAILED
+    with acting_as(teacher):
+        assert enroll(process, student, course, batch).success
+    assert course.get_students() == [student]
+
+
+def test_process_principal_overrides_ambient_one(capsys):
+    teacher, course, student = make_course()
+    with acting_as(student):
+        assert StandardEnrollment(principal=teacher).try_enroll(student, course).success
+
+
+def test_concurrent_enrollment_passes_ambient_principal(capsys):
+    teacher, course, student = make_course()
+    driver = ConcurrentEnrollment(StandardEnrollment(), max_workers=4)
+    [denied] = driver.run([(student, course)])
+    assert not denied.success
+    with acting_as(teacher):
+        [result] = driver.run([(student, course)])
+    assert result.success
@@ -0,0 +1,82 @@
+import pytest
+
+import oop_arabov
+from oop_arabov import (Courses, Student, Teacher, iter_load_jsonl, load_system_data, open_snapshot,
+                        quiet_construction, save_system_data)
+
+FORMATS = ['.json', '.jsonl', '.usnap']
+
+
+def make_system():
+    with quiet_construction():
+        teachers = [Teacher(100 + i, f'Преподаватель {i}', 40 + i, f't{i}@uni.ru', i) for i in range(2)]
+        teachers[0].set_subjects('Алгебра')
+        students = [Student(i, f'Студент {i}', 18 + i, f's{i}@uni.ru', 10 + i) for i in range(4)]
+        courses = [Courses(200 + i, f'Курс {i}', teachers[i % 2]) for i in range(3)]
+        courses.append(Courses(299, 'Без преподавателя', None))
+    for number, student in enumerate(students):
+        for course in courses[number % 2:number % 2 + 2]:
+            course.add_student(student)
+            student.set_courses([course.get_course_name()])
+            student.set_grade(1 + number, course.get_course_name())
+    courses[0].set_schedule('Пн', 9)
+    return students, teachers, courses
+
+
+def dump(students, teachers, courses):
+    return ([student.to_dict() for student in students], [teacher.to_dict() for teacher in teachers],
+            [course.to_ref_dict() for course in courses])
+
+
+@pytest.mark.parametrize('suffix', FORMATS)
+def test_round_trip_keeps_data(tmp_path, suffix):
+    system = make_system()
+    filename = str(tmp_path / ('university' + suffix))
+    save_system_data(*system, filename)
+    loaded = load_system_data(filename)
+    assert all(isinstance(items, list) for items in loaded)
+    assert dump(*loaded) == dump(*system)
+
+
+@pytest.mark.parametrize('suffix', FORMATS)
+def test_round_trip_shares_person_objects(tmp_path, suffix):
+    filename = str(tmp_path / ('university' + suffix))
+    save_system_data(*make_system(), filename)
+    students, teachers, courses = load_system_data(filename)
+    by_id = {person.get_id(): person for person in students + teachers}
+    for course in courses:
+        teacher = course.get_course_teacher()
+        assert teacher is None or teacher is by_id[teacher.get_id()]
+        assert all(student is by_id[student.get_id()] for student in course.get_students())
+
+
+def test_lazy_snapshot_is_closed_by_its_owner(tmp_path):
+    system = make_system()
+    filename = str(tmp_path / 'university.usnap')
+    save_system_data(*system, filename)
+    with open_snapshot(filename) as snapshot:
+        assert len(snapshot.students) == 4
+        assert snapshot.find_person(2).to_dict() == system[0][2].to_dict()
+        assert snapshot.courses[0].get_students()[0] is snapshot.find_person(0)
+    with pytest.raises(ValueError):
+        snapshot.students[1]
+
+
+def test_jsonl_streams_each_person_once(tmp_path):
+    filename = str(tmp_path / 'university.jsonl')
+    save_system_data(*make_system(), filename)
+    objects = list(iter_load_jsonl(filename))
+    people = [obj for obj in objects if not isinstance(obj, Courses)]
+    assert len(people) == len({person.get_id() for person in people}) == 6
+
+
+def test_jsonl_iteration_keeps_construction_logging(tmp_path):
+    filename = str(tmp_path / 'university.jsonl')
+    save_system_data(*make_system(), filename)
+    first, second = iter_load_jsonl(filename), iter_load_jsonl(filename)
+    next(first)
+    assert oop_arabov._construction_logging
+    next(second)
+    assert oop_arabov._construction_logging
+    assert list(first) and list(second)
+    assert oop_arabov._construction_logging
@@ -0,0 +1,26 @@
+import pytest
+
+from oop_arabov import PersonFactory, PersonMeta, Student, Teacher, quiet_construction
+
+
+def test_constructor_follows_the_registry(monkeypatch):
+    monkeypatch.setattr(PersonMeta, 'registry', dict(PersonMeta.registry))
+    monkeypatch.setattr(PersonMeta, 'builders', dict(PersonMeta.builders))
+    assert PersonFactory.constructor('Student') is Student
+    with pytest.raises(ValueError):
+        PersonFactory.constructor('Assistant')
+
+    class Assistant(Teacher):
+        pass
+
+    assert PersonFactory.constructor('Assistant') is Assistant
+
+    replacement = PersonMeta('Student', (Teacher,), {'__module__': __name__})
+    assert PersonFactory.constructor('Student') is replacement
+
+
+def test_create_many_uses_the_resolved_class():
+    with quiet_construction():
+        people = PersonFactory.create_many('Student', [(1, 'Анна', 20, 'anna@uni.ru', 1, [], {})])
+        person = PersonFactory.create_person('Teacher', 2, 'Иван', 40, 'ivan@uni.ru', 2)
+    assert type(people[0]) is Student and type(person) is Teacher
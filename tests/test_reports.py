@@ -0,0 +1,45 @@
+import pytest
+
+from oop_arabov import Courses, Student, Teacher, generate_reports, quiet_construction, report_filename
+
+
+def make_courses(count):
+    with quiet_construction():
+        teacher = Teacher(100, 'Иван', 45, 'ivan@uni.ru', 1)
+        students = [Student(i, f'Студент {i}', 20, f's{i}@uni.ru', 10 + i) for i in range(3)]
+        courses = [Courses(i, f'Курс {i}', teacher if i % 3 else None) for i in range(count)]
+    for number, course in enumerate(courses):
+        for student in students[:number % 4]:
+            course.add_student(student)
+    return courses
+
+
+def test_report_text():
+    [_, course] = make_courses(2)
+    assert course.generate_report() == ("Отчет по курсу: Курс 1\n"
+                                        "Преподаватель Иван\n"
+                                        "Количество студентов 1\n"
+                                        "Список студентов \n"
+                                        "1. Студент Студент 0 ID(10)\n")
+
+
+def test_pool_matches_serial_output():
+    courses = make_courses(25)
+    serial = generate_reports(courses, max_workers=1)
+    assert serial == [course.generate_report() for course in courses]
+    assert generate_reports(courses, max_workers=2, chunk_size=4) == serial
+
+
+def test_pool_writes_the_same_files(tmp_path):
+    courses = make_courses(10)
+    paths = generate_reports(courses, str(tmp_path / 'pool'), max_workers=2, chunk_size=3)
+    assert paths == [report_filename(str(tmp_path / 'pool'), course.get_course_id()) for course in courses]
+    for path, course in zip(paths, courses):
+        with open(path, encoding='utf-8') as file:
+            assert file.read() == course.generate_report()
+
+
+@pytest.mark.parametrize('max_workers', [1, 2])
+def test_no_courses(tmp_path, max_workers):
+    assert generate_reports([], str(tmp_path / 'empty'), max_workers=max_workers) == []
+    assert list((tmp_path / 'empty').iterdir()) == []
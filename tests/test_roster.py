@@ -0,0 +1,45 @@
+from oop_arabov import Courses, Student, StudentRoster, Teacher, quiet_construction
+
+
+def make_students(count):
+    with quiet_construction():
+        return [Student(i, f'Студент {i}', 20, f's{i}@uni.ru', i) for i in range(count)]
+
+
+def test_roster_index_follows_changes():
+    students = make_students(4)
+    roster = StudentRoster(students[:3])
+    assert [roster[i] for i in range(len(roster))] == students[:3]
+    roster.discard(students[1])
+    roster.add(students[3])
+    assert [roster[i] for i in range(len(roster))] == [students[0], students[2], students[3]]
+    assert roster[-1] is students[3] and roster[:1] == [students[0]]
+    assert students[3] in roster and students[1] not in roster
+
+
+def test_get_students_returns_a_copy():
+    students = make_students(2)
+    with quiet_construction():
+        course = Courses(1, 'Алгебра', Teacher(10, 'Иван', 40, 'ivan@uni.ru', 1))
+    course.add_student(students[0])
+    copy = course.get_students()
+    assert isinstance(copy, list) and copy == [students[0]]
+    copy.append(students[1])
+    assert course.get_students() == [students[0]]
+    assert students[0] in course.get_roster() and len(course.get_roster()) == 1
+
+
+def test_membership_matches_student_equality():
+    [student] = make_students(1)
+    with quiet_construction():
+        same = Student(0, 'Студент 0', 20, 's0@uni.ru', 0)
+        other_email = Student(0, 'Студент 0', 20, 'other@uni.ru', 0)
+        course = Courses(1, 'Алгебра', Teacher(10, 'Иван', 40, 'ivan@uni.ru', 1))
+    assert same == student and other_email != student
+    course.add_student(student)
+    roster = course.get_roster()
+    assert same in roster and other_email not in roster
+    course.add_student(other_email)
+    assert course.get_students() == [student, other_email]
+    assert not roster.add(same)
+    assert roster.discard(same) and course.get_students() == [other_email]
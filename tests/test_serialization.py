@@ -0,0 +1,61 @@
+import json
+
+import pytest
+
+from oop_arabov import (Courses, IdentityMap, Student, Teacher, load_system_data, quiet_construction,
+                        save_system_data)
+
+
+def make_system():
+    with quiet_construction():
+        teacher = Teacher(100, 'Иван', 45, 'ivan@uni.ru', 1)
+        students = [Student(i, f'Студент {i}', 20, f's{i}@uni.ru', i) for i in range(3)]
+        courses = [Courses(200 + i, f'Курс {i}', teacher) for i in range(4)]
+    for course in courses:
+        for student in students:
+            course.add_student(student)
+    return students, [teacher], courses
+
+
+def test_courses_reference_people_by_id():
+    students, _, courses = make_system()
+    assert courses[0].to_ref_dict() == {'courses_id': 200, 'course_name': 'Курс 0', 'teacher_id': 100,
+                                        'student_ids': [0, 1, 2], 'schedule': {}, 'materials': []}
+
+
+def test_each_person_is_saved_once(tmp_path):
+    filename = tmp_path / 'university.json'
+    # люди, которые есть только в курсах, тоже сохраняются
+    _, _, courses = make_system()
+    save_system_data([], [], courses, str(filename))
+    data = json.loads(filename.read_text(encoding='utf-8'))
+    assert data['version'] == 2
+    assert [person['person_id'] for person in data['students']] == [0, 1, 2]
+    assert [person['person_id'] for person in data['teachers']] == [100]
+    assert all(course['student_ids'] == [0, 1, 2] for course in data['courses'])
+
+
+def test_legacy_embedded_courses_load_one_object_per_person(tmp_path):
+    students, teachers, courses = make_system()
+    filename = tmp_path / 'legacy.json'
+    filename.write_text(json.dumps({
+        'students': [student.to_dict() for student in students],
+        'teachers': [teacher.to_dict() for teacher in teachers],
+        'courses': [course.to_dict() for course in courses],
+    }, ensure_ascii=False), encoding='utf-8')
+    loaded_students, loaded_teachers, loaded_courses = load_system_data(str(filename))
+    for course in loaded_courses:
+        assert course.get_course_teacher() is loaded_teachers[0]
+        assert all(a is b for a, b in zip(course.get_students(), loaded_students))
+
+
+def test_empty_system_round_trip(tmp_path):
+    filename = str(tmp_path / 'empty.json')
+    save_system_data([], [], [], filename)
+    assert load_system_data(filename) == ([], [], [])
+
+
+def test_unknown_reference_is_an_error():
+    with pytest.raises(ValueError):
+        Courses.from_ref_dict({'courses_id': 1, 'course_name': 'Курс', 'teacher_id': None, 'student_ids': [7],
+                               'schedule': {}, 'materials': []}, IdentityMap())
@@ -0,0 +1,78 @@
+import pytest
+
+import oop_arabov
+from oop_arabov import Courses, SQLiteRepository, Student, Teacher, quiet_construction
+
+
+def make_system():
+    with quiet_construction():
+        teacher = Teacher(100, 'Иван', 45, 'ivan@uni.ru', 1)
+        teacher.set_subjects('Алгебра')
+        students = [Student(i, f'Студент {i}', 18 + i, f's{i}@uni.ru', 10 + i) for i in range(5)]
+        courses = [Courses(200 + i, f'Курс {i}', teacher if i else None) for i in range(3)]
+    for number, student in enumerate(students):
+        course = courses[number % 3]
+        course.add_student(student)
+        student.set_courses([course.get_course_name()])
+        student.set_grade(1 + number, course.get_course_name())
+    courses[1].set_schedule('Пн', 9)
+    return students, [teacher], courses
+
+
+@pytest.fixture
+def repository():
+    with SQLiteRepository() as repository:
+        yield repository
+
+
+def test_round_trip(repository):
+    students, teachers, courses = make_system()
+    repository.save_system(students, teachers, courses)
+    assert repository.count() == 6 and repository.count('Student') == 5
+    assert repository.get_person(3).to_dict() == students[3].to_dict()
+    assert repository.get_person(999) is None
+    assert [person.get_id() for person in repository.find_by_email('ivan@uni.ru')] == [100]
+    loaded = list(repository.iter_courses())
+    assert [course.to_ref_dict() for course in loaded] == [course.to_ref_dict() for course in courses]
+    # люди внутри одной итерации не дублируются
+    assert loaded[1].get_course_teacher() is loaded[2].get_course_teacher()
+
+
+@pytest.mark.parametrize('page_size', [1, 2, 500])
+def test_paging_returns_every_row_once(repository, page_size):
+    students, teachers, courses = make_system()
+    repository.save_system(students, teachers, courses)
+    assert [person.get_id() for person in repository.iter_people('Student', page_size)] == list(range(5))
+    assert [course.get_course_id() for course in repository.iter_courses(page_size)] == [200, 201, 202]
+    assert [student.get_id() for student in repository.students_in_course('Курс 0', page_size=page_size)] == [0, 3]
+    assert [student.get_id() for student in repository.students_in_course('Курс 0', grade_below=3,
+                                                                          page_size=page_size)] == [0]
+
+
+def test_empty_repository(repository):
+    assert repository.count() == 0
+    assert list(repository.iter_people()) == []
+    assert list(repository.iter_courses()) == []
+
+
+def test_upsert_updates_rows(repository):
+    students, teachers, courses = make_system()
+    repository.save_system(students, teachers, courses)
+    students[0].set_grade(5, 'Курс 0')
+    students[0].set_name('Анна')
+    courses[0].add_student(students[1])
+    repository.upsert_people([students[0]])
+    repository.upsert_courses([courses[0]])
+    assert repository.count() == 6
+    assert repository.get_person(0).to_dict() == students[0].to_dict()
+    assert [student.get_id() for student in repository.students_in_course('Курс 0')] == [0, 3, 1]
+
+
+def test_course_iteration_keeps_construction_logging(repository):
+    repository.save_system(*make_system())
+    first, second = repository.iter_courses(1), repository.iter_courses(1)
+    next(first)
+    next(second)
+    assert oop_arabov._construction_logging
+    assert len(list(first)) == len(list(second)) == 2
+    assert oop_arabov._construction_logging
@@ -0,0 +1,50 @@
+from oop_arabov import (Courses, IdentityMap, Student, Teacher, Timetable, find_schedule_conflicts,
+                        quiet_construction)
+
+
+def make_course(course_id, teacher, schedule, students=()):
+    with quiet_construction():
+        course = Courses(course_id, f'Курс {course_id}', teacher)
+    for day, hour in schedule:
+        course.set_schedule(day, hour)
+    for student in students:
+        course.add_student(student)
+    return course
+
+
+def test_day_aliases_share_one_schedule_entry():
+    with quiet_construction():
+        teacher = Teacher(1, 'Иван', 40, 'ivan@uni.ru', 1)
+    course = make_course(1, teacher, [('Пн', 9), ('Mon', 10), ('friday', 12)])
+    assert course.get_schedule() == {'Пн': 10, 'Пт': 12}
+
+
+def test_loaded_schedules_are_normalized():
+    with quiet_construction():
+        teacher = Teacher(1, 'Иван', 40, 'ivan@uni.ru', 1)
+    identity_map = IdentityMap([teacher])
+    [course] = Courses.from_ref_dict_many([{'courses_id': 1, 'course_name': 'Алгебра', 'teacher_id': 1,
+                                            'student_ids': [], 'schedule': {'Mon': 9, 'Пн': 11},
+                                            'materials': []}], identity_map)
+    assert course.get_schedule() == {'Пн': 11}
+    assert find_schedule_conflicts([course], {1: 'A-1'}) == []
+
+
+def test_conflicts_only_between_different_courses():
+    with quiet_construction():
+        teacher = Teacher(1, 'Иван', 40, 'ivan@uni.ru', 1)
+        student = Student(2, 'Анна', 20, 'anna@uni.ru', 1)
+    first = make_course(1, teacher, [('Пн', 9), ('Ср', 9)], [student])
+    second = make_course(2, teacher, [('Ср', 10)], [student])
+    conflicts = find_schedule_conflicts([first, second], {1: 'A-1', 2: 'A-1'})
+    assert sorted(conflict.kind for conflict in conflicts) == ['room', 'student', 'teacher']
+    assert all({conflict.first, conflict.second} == {first, second} for conflict in conflicts)
+    assert Timetable.from_courses([first, second], {1: 'A-1', 2: 'A-1'}).validate_term() == conflicts
+
+
+def test_long_lessons_of_one_course_do_not_conflict():
+    with quiet_construction():
+        teacher = Teacher(1, 'Иван', 40, 'ivan@uni.ru', 1)
+        student = Student(2, 'Анна', 20, 'anna@uni.ru', 1)
+    course = make_course(1, teacher, [('Пн', 9), ('Вт', 9)], [student])
+    assert find_schedule_conflicts([course], {1: 'A-1'}, lesson_minutes=3 * 24 * 60) == []
@@ -0,0 +1,68 @@
+import pytest
+
+from oop_arabov import InvalidPersonError, Student, Teacher
+
+GOOD = {'person_id': 1, 'name': 'Анна', 'age': 20, 'email': 'anna@uni.ru', 'student_id': 1}
+
+
+def test_validate_many_collects_every_error():
+    records = [GOOD,
+               {'person_id': 2, 'name': 'Борис', 'email': 'boris', 'student_id': 2},
+               {'name': 'Вера', 'age': 0, 'email': 'vera@uni.ru', 'grades': {'M': 7}}]
+    with pytest.raises(InvalidPersonError) as error:
+        Student.validate_many(records)
+    assert error.value.errors == [
+        (1, 'age', 'нет поля'),
+        (1, 'email', Student.schema['email'].message),
+        (2, 'person_id', 'нет поля'),
+        (2, 'age', Student.schema['age'].message),
+        (2, 'student_id', 'нет поля'),
+        (2, 'grades', Student.schema['grades'].message),
+    ]
+
+
+def test_from_dict_many_reports_missing_fields():
+    with pytest.raises(InvalidPersonError) as error:
+        Teacher.from_dict_many([{'person_id': 1, 'name': 'Иван', 'age': 40, 'email': 'ivan@uni.ru'}])
+    assert error.value.errors == [(0, 'teacher_id', 'нет поля')]
+
+
+def test_validate_single_record():
+    Student.validate(GOOD)
+    with pytest.raises(InvalidPersonError, match='нет поля'):
+        Student.validate({key: value for key, value in GOOD.items() if key != 'name'})
+
+
+def test_valid_batch_loads_with_defaults():
+    [student] = Student.from_dict_many([GOOD])
+    assert student.get_courses() == [] and student.get_grades() == {}
+
+
+@pytest.mark.parametrize('grade', [True, False])
+def test_bool_is_not_a_grade(grade):
+    student = Student(1, 'Анна', 20, 'anna@uni.ru', 1)
+    with pytest.raises(InvalidPersonError):
+        student.set_grade(grade, 'M')
+    assert student.get_grades() == {}
+
+
+def test_bool_is_rejected_in_int_fields():
+    with pytest.raises(InvalidPersonError):
+        Student(True, 'Анна', 20, 'anna@uni.ru', 1)
+    with pytest.raises(InvalidPersonError):
+        Student.validate_many([dict(GOOD, grades={'M': True})])
+    with pytest.raises(InvalidPersonError):
+        Student.from_columns({name: [value] for name, value in dict(GOOD, age=True).items()})
+
+
+def test_setter_type_errors_stay_type_errors():
+    teacher = Teacher(1, 'Иван', 40, 'ivan@uni.ru', 1)
+    student = Student(2, 'Анна', 20, 'anna@uni.ru', 1)
+    with pytest.raises(TypeError):
+        teacher.set_subjects(42)
+    with pytest.raises(TypeError):
+        student.set_courses([42])
+    with pytest.raises(ValueError):
+        student.set_grade(7, 'M')
+    with pytest.raises(TypeError):
+        student.set_grade('5', 'M')